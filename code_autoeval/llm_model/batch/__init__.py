@@ -0,0 +1,33 @@
+from code_autoeval.llm_model.batch.batch_models import (
+    BatchConfig,
+    BatchSummary,
+    BatchTarget,
+    Priority,
+    TargetResult,
+)
+from code_autoeval.llm_model.batch.batch_progress import BatchProgress
+from code_autoeval.llm_model.batch.batch_runner import BatchRunner
+from code_autoeval.llm_model.batch.find_targets import FindBatchTargets
+from code_autoeval.llm_model.batch.job_manifest import (
+    JobManifest,
+    ManifestEntry,
+    ManifestState,
+)
+from code_autoeval.llm_model.batch.parallel_verifier import ParallelVerifier
+from code_autoeval.llm_model.batch.pytest_durations import PytestDurations
+
+__all__ = [
+    "BatchConfig",
+    "BatchProgress",
+    "BatchRunner",
+    "BatchSummary",
+    "BatchTarget",
+    "FindBatchTargets",
+    "JobManifest",
+    "ManifestEntry",
+    "ManifestState",
+    "ParallelVerifier",
+    "Priority",
+    "PytestDurations",
+    "TargetResult",
+]
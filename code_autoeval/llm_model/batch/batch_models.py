@@ -0,0 +1,114 @@
+"""Models for batch runs of code_generator over a package."""
+
+import json
+from typing import Any, Callable, Dict, List, Literal, Optional
+
+from multiuse.model import class_data_model
+from pydantic import BaseModel, Field, computed_field
+
+from code_autoeval.llm_model.utils import model
+from code_autoeval.llm_model.utils.base_llm_class import BaseModelConfig
+
+# discovery: the order FindClassesInDir found them in.
+# shortest: lowest FunctionComplexity score first - quick wins early.
+# uncovered: targets without a test file first, then shortest.
+Priority = Literal["discovery", "shortest", "uncovered"]
+
+TargetStatus = Literal["green", "failed", "error"]
+
+
+class BatchConfig(BaseModel):
+    """Settings of a batch run."""
+
+    jobs: int = Field(default=4, ge=1, description="code_generator jobs at once.")
+    priority: Priority = "discovery"
+    max_retries: int = 3
+    num_candidates: int = 1
+    goal: str = "Refactor code to handle edge cases and improve efficiency."
+    debug: bool = False
+    skip_generate_fake_data: bool = True
+    resume: bool = Field(
+        default=True, description="Skip the targets already green in the manifest."
+    )
+    verify: bool = Field(
+        default=False,
+        description="Run the tests of targets unchanged since they were fully covered.",
+    )
+    class_sessions: bool = Field(
+        default=False,
+        description="Verify the existing tests of each class in one pytest session first.",
+    )
+    progress_interval: float = Field(
+        default=30, description="Seconds between progress lines while jobs run."
+    )
+
+
+class BatchTarget(BaseModelConfig):
+    """A method to generate code and tests for."""
+
+    class_model: class_data_model.ClassDataModel
+    method_name: str
+    func: Callable[..., Any]
+    function_attributes: model.FunctionAttributes
+    complexity: model.FunctionComplexity
+    discovery_index: int = 0
+
+    @property
+    def target_id(self) -> str:
+        return self.function_attributes.target_id
+
+    @property
+    def has_tests(self) -> bool:
+        test_path = self.function_attributes.test_absolute_file_path
+        return bool(test_path) and test_path.exists()
+
+    @property
+    def query(self) -> str:
+        return f"Implement the {self.method_name} method for the {self.class_model.class_name} class."
+
+
+class TargetResult(BaseModel):
+    """Outcome of one target."""
+
+    target_id: str
+    status: TargetStatus
+    attempts: int = 0
+    duration: float = Field(default=0, description="Seconds the job ran for.")
+    error: Optional[str] = None
+
+
+class BatchSummary(BaseModel):
+    """Machine-readable outcome of a batch run."""
+
+    package: str
+    config: BatchConfig
+    wall_time: float = 0
+    results: List[TargetResult] = Field(default_factory=list)
+    # Targets already green in the manifest - not run again.
+    skipped: List[str] = Field(default_factory=list)
+
+    @computed_field
+    def total(self) -> int:
+        return len(self.results)
+
+    @computed_field
+    def counts(self) -> Dict[str, int]:
+        counts = {"green": 0, "failed": 0, "error": 0}
+        for result in self.results:
+            counts[result.status] += 1
+        return counts
+
+    @computed_field
+    def success_rate(self) -> float:
+        return round(self.counts["green"] / self.total, 4) if self.total else 0.0
+
+    @computed_field
+    def targets_per_minute(self) -> float:
+        return round(60 * self.total / self.wall_time, 2) if self.wall_time else 0.0
+
+    @property
+    def all_green(self) -> bool:
+        return self.counts["green"] == self.total
+
+    def to_json(self) -> str:
+        return json.dumps(self.model_dump(mode="json"), indent=2)
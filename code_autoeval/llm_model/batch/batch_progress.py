@@ -0,0 +1,61 @@
+"""Live progress of a batch run."""
+
+import time
+from typing import List, Optional
+
+from code_autoeval.llm_model.batch.batch_models import TargetResult
+
+
+class BatchProgress:
+    """Counts finished targets and prints throughput / ETA.
+
+    A line is printed every time a target finishes, e.g.
+    [12/40] green MyClass.my_method (3 attempts, 41.2s) | ok 10 failed 2 | 4.1 targets/min | ETA 6.8 min
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.start_time = time.perf_counter()
+        self.results: List[TargetResult] = []
+        self.running = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start_time
+
+    @property
+    def targets_per_minute(self) -> float:
+        return 60 * len(self.results) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def eta_minutes(self) -> Optional[float]:
+        if not self.results:
+            return None
+        remaining = self.total - len(self.results)
+        return remaining / self.targets_per_minute if self.targets_per_minute else None
+
+    def status_line(self) -> str:
+        green = sum(result.status == "green" for result in self.results)
+        failed = len(self.results) - green
+        eta = self.eta_minutes
+        return (
+            f"ok {green} failed {failed} | running {self.running} | "
+            f"{self.targets_per_minute:.1f} targets/min | "
+            f"ETA {f'{eta:.1f} min' if eta is not None else '?'}"
+        )
+
+    def started(self, target_id: str) -> None:
+        self.running += 1
+
+    def finished(self, result: TargetResult) -> None:
+        self.running -= 1
+        self.results.append(result)
+        error = f" - {result.error}" if result.error else ""
+        print(
+            f"[{len(self.results)}/{self.total}] {result.status} {result.target_id} "
+            f"({result.attempts} attempts, {result.duration:.1f}s){error} | "
+            f"{self.status_line()}"
+        )
+
+    def heartbeat(self) -> None:
+        print(f"[{len(self.results)}/{self.total}] {self.status_line()}")
@@ -0,0 +1,266 @@
+"""Run code_generator over many targets with a bounded number of jobs."""
+
+import asyncio
+import contextlib
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from code_autoeval.llm_model import imports
+from code_autoeval.llm_model.batch.batch_models import (
+    BatchConfig,
+    BatchSummary,
+    BatchTarget,
+    TargetResult,
+    TargetStatus,
+)
+from code_autoeval.llm_model.batch.batch_progress import BatchProgress
+from code_autoeval.llm_model.batch.job_manifest import JobManifest
+from code_autoeval.llm_model.llm_model_client import LLMModelClient
+from code_autoeval.llm_model.utils import extraction, job_context
+
+# Characters of a failed target's last error kept in the summary / manifest.
+MAX_ERROR_LENGTH = 500
+
+
+class BatchRunner:
+    """Run code_generator for every target - at most config.jobs at once.
+
+    Targets start in the order given (see FindBatchTargets.order_targets).
+    The project imports are found once and shared by every job. A target
+    that raises is recorded as an error and doesn't stop the batch.
+
+    With a manifest, each target's state is written as it starts and
+    finishes. Targets green in the manifest - and unchanged since, per the
+    client's skip ledger - are skipped, so a run that was interrupted (or
+    had failures) picks up where it stopped.
+
+    With config.class_sessions, the existing tests of each class are first
+    run in one pytest session (LLMModelClient.run_class_tests). Methods they
+    fully cover are green without a code_generator call; the others start
+    generating from that session's coverage instead of running pytest again.
+
+    Example
+    -------
+    >>> runner = BatchRunner(LLMModelClient(), fixture_parser, BatchConfig(jobs=4))
+    >>> summary = asyncio.run(runner.run(targets, package="code_autoeval"))
+    >>> print(summary.to_json())
+    """
+
+    def __init__(
+        self,
+        client: LLMModelClient,
+        fixture_parser: extraction.fixture_parser.FixtureParser,
+        config: Optional[BatchConfig] = None,
+        manifest: Optional[JobManifest] = None,
+    ) -> None:
+        self.client = client
+        self.fixture_parser = fixture_parser
+        self.config = config or BatchConfig()
+        self.manifest = manifest
+
+    async def run(self, targets: List[BatchTarget], package: str = "") -> BatchSummary:
+        skipped: List[str] = []
+        if self.manifest:
+            if not self.config.resume:
+                self.manifest.reset()
+            elif self.manifest.interrupted:
+                print(f"Resuming {len(self.manifest.interrupted)} interrupted targets")
+            self.manifest.add_targets(target.target_id for target in targets)
+
+            if not self.config.verify:
+                skipped = [
+                    target.target_id for target in targets if self.is_unchanged(target)
+                ]
+                targets = [
+                    target for target in targets if target.target_id not in skipped
+                ]
+            if skipped:
+                print(f"Skipping {len(skipped)} targets green and unchanged")
+
+        unique_imports_dict = await asyncio.to_thread(
+            imports.FindImportsFromDir.find_unique_imports_from_dir
+        )
+        jobs = {
+            target.target_id: self.create_job(target, unique_imports_dict)
+            for target in targets
+        }
+
+        verified: List[TargetResult] = []
+        if self.config.class_sessions:
+            verified = await self.verify_classes(targets, jobs)
+            verified_ids = {result.target_id for result in verified}
+            targets = [
+                target for target in targets if target.target_id not in verified_ids
+            ]
+
+        progress = BatchProgress(len(targets))
+        semaphore = asyncio.Semaphore(self.config.jobs)
+
+        async def run_limited(target: BatchTarget) -> TargetResult:
+            async with semaphore:
+                progress.started(target.target_id)
+                if self.manifest:
+                    self.manifest.mark(target.target_id, "in_progress")
+                result = await self.run_target(target, jobs[target.target_id])
+                if self.manifest:
+                    self.manifest.mark(
+                        target.target_id,
+                        result.status,
+                        attempts=result.attempts,
+                        error=result.error,
+                    )
+                progress.finished(result)
+                return result
+
+        heartbeat = asyncio.create_task(self._heartbeat(progress))
+        try:
+            # gather keeps the results in target order.
+            results = await asyncio.gather(*(run_limited(t) for t in targets))
+        finally:
+            heartbeat.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await heartbeat
+
+        return BatchSummary(
+            package=package,
+            config=self.config,
+            wall_time=round(progress.elapsed, 2),
+            results=[*verified, *results],
+            skipped=skipped,
+        )
+
+    def is_unchanged(self, target: BatchTarget) -> bool:
+        """Green in the manifest, and unchanged since it was fully covered."""
+        if not self.manifest or self.manifest.needs_run(target.target_id):
+            return False
+
+        return self.client.is_verified(
+            target.function_attributes, self.fixture_paths(target)
+        )
+
+    def fixture_paths(self, target: BatchTarget) -> List[Path]:
+        class_fixtures = self.client.find_class_fixtures(
+            target.class_model, self.fixture_parser
+        )
+        return [fixture.module_path for fixture in class_fixtures.values()]
+
+    def create_job(
+        self, target: BatchTarget, unique_imports_dict: dict
+    ) -> job_context.JobContext:
+        return job_context.JobContext.create(
+            target.function_attributes,
+            target.class_model,
+            debug=self.config.debug,
+            verbose=self.config.debug,
+            unique_imports_dict=unique_imports_dict,
+        )
+
+    async def verify_classes(
+        self,
+        targets: List[BatchTarget],
+        jobs: Dict[str, job_context.JobContext],
+    ) -> List[TargetResult]:
+        """Run the existing tests of each class in one session.
+
+        Returns the targets they fully cover - recorded as green in the
+        manifest and the skip ledger.
+        """
+        classes: Dict[Tuple[str, str], List[BatchTarget]] = {}
+        for target in targets:
+            if target.has_tests:
+                class_key = (
+                    target.class_model.coverage_file_path,
+                    target.class_model.class_name,
+                )
+                classes.setdefault(class_key, []).append(target)
+
+        semaphore = asyncio.Semaphore(self.config.jobs)
+
+        async def verify_class(class_targets: List[BatchTarget]) -> List[TargetResult]:
+            async with semaphore:
+                start_time = time.perf_counter()
+                try:
+                    summaries = await self.client.run_class_tests(
+                        [jobs[target.target_id] for target in class_targets]
+                    )
+                except Exception as e:
+                    # The methods are verified one by one by code_generator instead.
+                    print(f"Class session failed: {type(e).__name__}: {e}")
+                    return []
+                # The session's time, shared by its methods.
+                duration = (time.perf_counter() - start_time) / len(class_targets)
+
+            results: List[TargetResult] = []
+            for target in class_targets:
+                summary = summaries.get(target.target_id)
+                if summary and summary.is_fully_covered and not summary.tests_failed:
+                    jobs[target.target_id].fully_covered = True
+                    self.client.record_verified(
+                        target.function_attributes, self.fixture_paths(target), summary
+                    )
+                    results.append(
+                        TargetResult(
+                            target_id=target.target_id,
+                            status="green",
+                            duration=round(duration, 2),
+                        )
+                    )
+            return results
+
+        verified = [
+            result
+            for class_results in await asyncio.gather(
+                *(verify_class(class_targets) for class_targets in classes.values())
+            )
+            for result in class_results
+        ]
+        if self.manifest:
+            for result in verified:
+                self.manifest.mark(result.target_id, result.status)
+        print(
+            f"{len(verified)} targets fully covered by their existing tests "
+            f"({len(classes)} class sessions)"
+        )
+        return verified
+
+    async def run_target(
+        self, target: BatchTarget, job: job_context.JobContext
+    ) -> TargetResult:
+        start_time = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            await self.client.code_generator(
+                target.query,
+                target.func,
+                goal=self.config.goal,
+                max_retries=self.config.max_retries,
+                skip_generate_fake_data=self.config.skip_generate_fake_data,
+                class_model=target.class_model,
+                fixture_parser=self.fixture_parser,
+                num_candidates=self.config.num_candidates,
+                job=job,
+                verify=self.config.verify,
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        status: TargetStatus = (
+            "error" if error else "green" if job.fully_covered else "failed"
+        )
+        if status == "failed" and job.error_message:
+            # The last error the model was asked to fix.
+            error = job.error_message.strip()[:MAX_ERROR_LENGTH]
+
+        return TargetResult(
+            target_id=target.target_id,
+            status=status,
+            attempts=job.attempts,
+            duration=round(time.perf_counter() - start_time, 2),
+            error=error,
+        )
+
+    async def _heartbeat(self, progress: BatchProgress) -> None:
+        while True:
+            await asyncio.sleep(self.config.progress_interval)
+            progress.heartbeat()
@@ -0,0 +1,261 @@
+"""Command line entry point: code-autoeval run|verify <package>."""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import List, Optional, get_args
+
+from code_autoeval.llm_model.batch.batch_models import (
+    BatchConfig,
+    BatchSummary,
+    BatchTarget,
+    Priority,
+)
+from code_autoeval.llm_model.batch.batch_runner import BatchRunner
+from code_autoeval.llm_model.batch.find_targets import FindBatchTargets
+from code_autoeval.llm_model.batch.job_manifest import JobManifest
+from code_autoeval.llm_model.batch.parallel_verifier import ParallelVerifier
+from code_autoeval.llm_model.batch.pytest_durations import PytestDurations
+from code_autoeval.llm_model.llm_model_client import LLMModelClient
+from code_autoeval.llm_model.utils import code_cleaning, extraction
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="code-autoeval",
+        description="Generate and verify code and tests with the backend LLM.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run", help="Run code_generator for every method of a package."
+    )
+    run_parser.add_argument(
+        "package",
+        help="Package directory - absolute or relative to the project root.",
+    )
+    run_parser.add_argument(
+        "--jobs", "-j", type=int, default=4, help="Targets to run at once."
+    )
+    run_parser.add_argument(
+        "--priority",
+        choices=get_args(Priority),
+        default="discovery",
+        help="shortest: simplest methods first. uncovered: methods without tests first.",
+    )
+    run_parser.add_argument("--max-retries", type=int, default=3)
+    run_parser.add_argument("--num-candidates", type=int, default=1)
+    run_parser.add_argument(
+        "--generate-fake-data",
+        action="store_true",
+        help="Generate a fake dataframe for every target.",
+    )
+    run_parser.add_argument("--debug", action="store_true")
+    run_parser.add_argument(
+        "--warm-pytest",
+        action="store_true",
+        help="Run the tests in processes forked from a warm server, not a pytest subprocess.",
+    )
+    run_parser.add_argument(
+        "--branch-coverage",
+        action="store_true",
+        help="Measure branch coverage too - a branch never taken is uncovered.",
+    )
+    run_parser.add_argument(
+        "--class-sessions",
+        action="store_true",
+        help="First run the existing tests of each class in one pytest session.",
+    )
+    run_parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ignore the job manifest and run every target again.",
+    )
+    run_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Run the tests even for methods unchanged since they were fully covered.",
+    )
+    run_parser.add_argument(
+        "--manifest-path",
+        type=Path,
+        help="Defaults to generated_code_logs/batch_manifest/<package>.jsonl.",
+    )
+    run_parser.add_argument(
+        "--summary-path",
+        type=Path,
+        help="Also write the JSON summary to this file.",
+    )
+
+    verify_parser = subparsers.add_parser(
+        "verify",
+        help="Run the existing tests of a package in parallel and report each method's coverage.",
+    )
+    verify_parser.add_argument(
+        "package",
+        help="Package directory - absolute or relative to the project root.",
+    )
+    verify_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="pytest processes at once - the test files are split into this many shards.",
+    )
+    verify_parser.add_argument("--debug", action="store_true")
+    verify_parser.add_argument(
+        "--warm-pytest",
+        action="store_true",
+        help="Run the shards in processes forked from a warm server, not pytest subprocesses.",
+    )
+    verify_parser.add_argument(
+        "--branch-coverage",
+        action="store_true",
+        help="Measure branch coverage too - a branch never taken is uncovered.",
+    )
+    verify_parser.add_argument(
+        "--durations-path",
+        type=Path,
+        help="Defaults to generated_code_logs/test_durations.json.",
+    )
+    verify_parser.add_argument(
+        "--summary-path",
+        type=Path,
+        help="Also write the JSON summary to this file.",
+    )
+    return parser
+
+
+def create_client(args: argparse.Namespace) -> LLMModelClient:
+    client = LLMModelClient()
+    if args.warm_pytest:
+        client.pytest_worker_pool = code_cleaning.PytestWorkerPool(
+            code_cleaning.PytestWorkerPoolConfig(enabled=True, workers=args.jobs)
+        )
+    client.coverage_branch = args.branch_coverage
+    return client
+
+
+def find_package_targets(
+    client: LLMModelClient, package: str, priority: Priority = "discovery"
+) -> Optional[List[BatchTarget]]:
+    """The targets of the package directory - None if there's no such directory."""
+    project_root = client.common.project_root
+    package_dir = Path(package)
+    if not package_dir.is_absolute():
+        package_dir = project_root.joinpath(package_dir)
+    if not package_dir.is_dir():
+        print(f"No such package directory: {package_dir}", file=sys.stderr)
+        return None
+
+    targets = FindBatchTargets.order_targets(
+        FindBatchTargets.find_targets(
+            package_dir, project_root, client.common.generated_base_dir
+        ),
+        priority,
+    )
+    print(f"Found {len(targets)} targets in {package_dir}")
+    return targets
+
+
+def load_fixture_parser(project_root: Path) -> extraction.fixture_parser.FixtureParser:
+    fixture_parser = extraction.fixture_parser.FixtureParser()
+    fixture_parser.parse_directory(
+        project_root.joinpath("generated_code/fixtures/fixtures")
+    )
+    return fixture_parser
+
+
+def report(summary: BatchSummary, summary_path: Optional[Path]) -> int:
+    """Print (and write) the summary - the exit code is 0 only if all green."""
+    summary_json = summary.to_json()
+    if summary_path:
+        summary_path.write_text(summary_json)
+    print(summary_json)
+
+    return 0 if summary.all_green else 1
+
+
+def run(args: argparse.Namespace) -> int:
+    client = create_client(args)
+    config = BatchConfig(
+        jobs=args.jobs,
+        priority=args.priority,
+        max_retries=args.max_retries,
+        num_candidates=args.num_candidates,
+        debug=args.debug,
+        skip_generate_fake_data=not args.generate_fake_data,
+        resume=not args.fresh,
+        verify=args.verify,
+        class_sessions=args.class_sessions,
+    )
+    targets = find_package_targets(client, args.package, config.priority)
+    if targets is None:
+        return 2
+
+    manifest = (
+        JobManifest(args.manifest_path)
+        if args.manifest_path
+        else JobManifest.for_package(client.common.generated_base_log_dir, args.package)
+    )
+    fixture_parser = load_fixture_parser(client.common.project_root)
+
+    async def run_batch() -> BatchSummary:
+        # Closes the pooled HTTP client and preloads on the loop they belong to.
+        async with client:
+            return await BatchRunner(client, fixture_parser, config, manifest).run(
+                targets, package=args.package
+            )
+
+    try:
+        summary = asyncio.run(run_batch())
+    finally:
+        client.pytest_worker_pool.close()
+
+    return report(summary, args.summary_path)
+
+
+def verify(args: argparse.Namespace) -> int:
+    client = create_client(args)
+    config = BatchConfig(jobs=args.jobs, debug=args.debug, verify=True)
+    targets = find_package_targets(client, args.package)
+    if targets is None:
+        return 2
+
+    durations = (
+        PytestDurations(args.durations_path, client.common.project_root)
+        if args.durations_path
+        else None
+    )
+    fixture_parser = load_fixture_parser(client.common.project_root)
+
+    # Only the existing tests run - the model isn't needed.
+    client.keep_alive_policy.preload_on_enter = False
+
+    async def run_verify() -> BatchSummary:
+        async with client:
+            return await ParallelVerifier(
+                client, fixture_parser, config, durations
+            ).run(targets, package=args.package)
+
+    try:
+        summary = asyncio.run(run_verify())
+    finally:
+        client.pytest_worker_pool.close()
+
+    return report(summary, args.summary_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    if args.command == "verify":
+        return verify(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Discover the methods of a package to run code_generator on."""
+
+from pathlib import Path
+from typing import List
+
+from multiuse.filepaths.find_classes_in_dir import FindClassesInDir
+from multiuse.model import class_data_model
+
+from code_autoeval.llm_model.batch.batch_models import BatchTarget, Priority
+from code_autoeval.llm_model.utils import model
+
+
+class FindBatchTargets:
+    """Find every method of every class in a directory, then order them.
+
+    Example
+    -------
+    >>> targets = FindBatchTargets.find_targets(project_root / "code_autoeval", project_root, generated_base_dir)
+    >>> targets = FindBatchTargets.order_targets(targets, "uncovered")
+    """
+
+    @classmethod
+    def find_targets(
+        cls, directory: Path, project_root: Path, generated_base_dir: Path
+    ) -> List[BatchTarget]:
+        class_info_list = FindClassesInDir.find_classes_in_dir(str(directory))
+        class_data_factory = class_data_model.ClassDataModelFactory(project_root)
+        class_data_models = class_data_factory.create_from_class_info(class_info_list)
+
+        targets: List[BatchTarget] = []
+        for class_model in class_data_models:
+            for method_name in class_model.class_methods or []:
+                try:
+                    func = getattr(class_model.class_object, method_name)
+                    function_attributes = model.FunctionAttributesFactory.create(
+                        func, generated_base_dir, class_model
+                    )
+                except (AttributeError, OSError, TypeError) as e:
+                    print(f"Skipping {class_model.class_name}.{method_name}: {e}")
+                    continue
+
+                targets.append(
+                    BatchTarget(
+                        class_model=class_model,
+                        method_name=method_name,
+                        func=func,
+                        function_attributes=function_attributes,
+                        complexity=model.FunctionComplexity.from_function_attributes(
+                            function_attributes
+                        ),
+                        discovery_index=len(targets),
+                    )
+                )
+
+        return targets
+
+    @staticmethod
+    def order_targets(
+        targets: List[BatchTarget], priority: Priority = "discovery"
+    ) -> List[BatchTarget]:
+        """Return the targets in the order their jobs should start."""
+        if priority == "shortest":
+            return sorted(
+                targets, key=lambda t: (t.complexity.score, t.discovery_index)
+            )
+        if priority == "uncovered":
+            return sorted(
+                targets,
+                key=lambda t: (t.has_tests, t.complexity.score, t.discovery_index),
+            )
+        return sorted(targets, key=lambda t: t.discovery_index)
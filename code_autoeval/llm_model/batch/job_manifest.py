@@ -0,0 +1,116 @@
+"""Durable record of the state of every target in a batch run."""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Literal, Optional
+
+from pydantic import BaseModel
+
+# in_progress entries found on load belong to a run that was killed.
+ManifestState = Literal["pending", "in_progress", "green", "failed", "error"]
+
+
+class ManifestEntry(BaseModel):
+    """State of one target."""
+
+    target_id: str
+    state: ManifestState = "pending"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    updated_at: float = 0
+
+
+class JobManifest:
+    """Keep the state of each target in a JSON lines file so runs can resume.
+
+    The whole file is rewritten on every change - to a temp file that is
+    fsynced and then os.replace'd over the manifest - so a crash or kill -9
+    leaves either the previous or the new manifest on disk, never half of one.
+
+    Example
+    -------
+    >>> manifest = JobManifest(generated_code_logs / "batch_manifest" / "code_autoeval.jsonl")
+    >>> manifest.add_targets(["my_pkg/my_module.py:MyClass.my_method"])
+    >>> manifest.mark("my_pkg/my_module.py:MyClass.my_method", "in_progress")
+    >>> manifest.mark("my_pkg/my_module.py:MyClass.my_method", "green", attempts=2)
+    >>> manifest.needs_run("my_pkg/my_module.py:MyClass.my_method")
+    False
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.entries: Dict[str, ManifestEntry] = self.load()
+
+    @classmethod
+    def for_package(cls, base_log_dir: Path, package: str) -> "JobManifest":
+        """The manifest of a package, under <generated_code_logs>/batch_manifest."""
+        name = package.strip("/").replace("/", ".") or "package"
+        return cls(Path(base_log_dir).joinpath("batch_manifest", f"{name}.jsonl"))
+
+    def load(self) -> Dict[str, ManifestEntry]:
+        if not self.path.exists():
+            return {}
+
+        entries: Dict[str, ManifestEntry] = {}
+        for line in self.path.read_text().splitlines():
+            if line.strip():
+                entry = ManifestEntry.model_validate_json(line)
+                entries[entry.target_id] = entry
+        return entries
+
+    def save(self) -> None:
+        """Atomically write every entry to the manifest."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as temp_file:
+            for entry in self.entries.values():
+                temp_file.write(entry.model_dump_json() + "\n")
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+            temp_file_path = temp_file.name
+
+        os.replace(temp_file_path, self.path)
+
+    def add_targets(self, target_ids: Iterable[str]) -> None:
+        """Add new targets as pending - existing entries are kept."""
+        for target_id in target_ids:
+            self.entries.setdefault(target_id, ManifestEntry(target_id=target_id))
+        self.save()
+
+    def mark(
+        self,
+        target_id: str,
+        state: ManifestState,
+        attempts: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        entry = self.entries.setdefault(target_id, ManifestEntry(target_id=target_id))
+        entry.state = state
+        if attempts is not None:
+            entry.attempts = attempts
+        entry.last_error = error
+        entry.updated_at = time.time()
+        self.save()
+
+    def needs_run(self, target_id: str) -> bool:
+        """Everything but green targets - failed, error, pending and interrupted."""
+        entry = self.entries.get(target_id)
+        return entry is None or entry.state != "green"
+
+    def reset(self) -> None:
+        """Forget every entry - the next run starts from scratch."""
+        self.entries = {}
+        self.save()
+
+    @property
+    def interrupted(self) -> List[str]:
+        """Targets that were running when the previous run stopped."""
+        return [
+            entry.target_id
+            for entry in self.entries.values()
+            if entry.state == "in_progress"
+        ]
@@ -0,0 +1,243 @@
+"""Verify the existing tests of many targets across parallel pytest processes."""
+
+import asyncio
+import heapq
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from code_autoeval.llm_model.batch.batch_models import (
+    BatchConfig,
+    BatchSummary,
+    BatchTarget,
+    TargetResult,
+)
+from code_autoeval.llm_model.batch.pytest_durations import PytestDurations
+from code_autoeval.llm_model.llm_model_client import LLMModelClient
+from code_autoeval.llm_model.utils import extraction, job_context, model
+
+# Seconds assumed for each test file when none has been timed yet.
+DEFAULT_TEST_FILE_DURATION = 1.0
+
+
+class ParallelVerifier:
+    """Run the existing tests of every target in config.jobs pytest sessions at once.
+
+    The test files are split into shards of about equal expected time,
+    from the durations of earlier runs: longest first, each file to the
+    shard with the least time so far. Each shard is one pytest session -
+    a process of its own - writing its own coverage data file, with each
+    test in its own coverage context. The data files are then combined, so
+    a module tested from several shards gets the union of their coverage,
+    and each target is summarized from the tests in its own test file.
+
+    Fully covered targets are recorded in the client's skip ledger, and the
+    duration of every test file whose tests ran is saved for the next run's
+    shards - files that failed to collect, or of shards that raised, keep
+    their earlier duration.
+
+    Example
+    -------
+    >>> verifier = ParallelVerifier(LLMModelClient(), fixture_parser, BatchConfig(jobs=16))
+    >>> summary = asyncio.run(verifier.run(targets, package="code_autoeval"))
+    >>> summary.all_green
+    """
+
+    def __init__(
+        self,
+        client: LLMModelClient,
+        fixture_parser: extraction.fixture_parser.FixtureParser,
+        config: Optional[BatchConfig] = None,
+        durations: Optional[PytestDurations] = None,
+    ) -> None:
+        self.client = client
+        self.fixture_parser = fixture_parser
+        self.config = config or BatchConfig()
+        self.durations = durations or PytestDurations.in_dir(
+            client.common.generated_base_log_dir, client.common.project_root
+        )
+
+    async def run(self, targets: List[BatchTarget], package: str = "") -> BatchSummary:
+        start_time = time.perf_counter()
+        skipped = [target.target_id for target in targets if not target.has_tests]
+        targets = [target for target in targets if target.has_tests]
+
+        test_file_paths = list(dict.fromkeys(self._test_file_path(t) for t in targets))
+        coverage_sources = list(
+            dict.fromkeys(target.class_model.coverage_file_path for target in targets)
+        )
+        shards = self.make_shards(test_file_paths)
+        print(
+            f"Verifying {len(test_file_paths)} test files of {len(targets)} targets "
+            f"in {len(shards)} shards"
+        )
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            data_files = [
+                Path(data_dir).joinpath(f".coverage.shard{index}")
+                for index in range(len(shards))
+            ]
+            sessions = await asyncio.gather(
+                *(
+                    self.run_shard(index, shard, coverage_sources, data_file)
+                    for index, (shard, data_file) in enumerate(zip(shards, data_files))
+                ),
+                return_exceptions=True,
+            )
+            coverage_report = model.CoverageReport.combine(
+                [data_file for data_file in data_files if data_file.exists()],
+                Path(data_dir).joinpath(".coverage"),
+                root=Path.cwd(),
+            )
+
+        results: Dict[str, TargetResult] = {}
+        durations: Dict[Path, float] = {}
+        for shard, session in zip(shards, sessions):
+            shard_targets = [
+                target for target in targets if self._test_file_path(target) in shard
+            ]
+            if isinstance(session, BaseException):
+                for target in shard_targets:
+                    results[target.target_id] = TargetResult(
+                        target_id=target.target_id,
+                        status="error",
+                        error=(
+                            f"{type(session).__name__}: {session} - durations of "
+                            "its shard's test files not updated"
+                        ),
+                    )
+                continue
+
+            # Each target is summarized from the combined coverage of every shard.
+            session = session.model_copy(update={"coverage_report": coverage_report})
+            for result in self.summarize(shard_targets, session):
+                results[result.target_id] = result
+            for test_file_path in shard:
+                if session.ran_tests(test_file_path):
+                    durations[test_file_path] = session.duration_of(test_file_path)
+
+        self.durations.update(durations)
+
+        return BatchSummary(
+            package=package,
+            config=self.config,
+            wall_time=round(time.perf_counter() - start_time, 2),
+            # In target order.
+            results=[results[target.target_id] for target in targets],
+            skipped=skipped,
+        )
+
+    def make_shards(self, test_file_paths: List[Path]) -> List[List[Path]]:
+        """Split the test files into config.jobs shards of about equal expected time.
+
+        Files never timed are expected to take the average of those timed.
+        Within a shard, the files are in longest first order.
+        """
+        timed = [
+            duration
+            for test_file_path in test_file_paths
+            if (duration := self.durations.get(test_file_path)) is not None
+        ]
+        default_duration = (
+            sum(timed) / len(timed) if timed else DEFAULT_TEST_FILE_DURATION
+        )
+        expected = {
+            test_file_path: (
+                duration
+                if (duration := self.durations.get(test_file_path)) is not None
+                else default_duration
+            )
+            for test_file_path in test_file_paths
+        }
+
+        shard_count = min(self.config.jobs, len(test_file_paths))
+        shards: List[List[Path]] = [[] for _ in range(shard_count)]
+        # (expected seconds of the shard, shard index) - the least loaded first.
+        loads = [(0.0, index) for index in range(shard_count)]
+        for test_file_path in sorted(
+            test_file_paths, key=lambda path: expected[path], reverse=True
+        ):
+            load, index = heapq.heappop(loads)
+            shards[index].append(test_file_path)
+            heapq.heappush(loads, (load + expected[test_file_path], index))
+
+        return shards
+
+    async def run_shard(
+        self,
+        index: int,
+        shard: List[Path],
+        coverage_sources: List[str],
+        data_file: Path,
+    ) -> model.PytestSessionResult:
+        start_time = time.perf_counter()
+        session = await self.client.run_test_session(
+            shard, coverage_sources, data_file=data_file, show_output=self.config.debug
+        )
+        print(
+            f"Shard {index + 1}: {len(shard)} test files in "
+            f"{time.perf_counter() - start_time:.1f}s - pytest exit status "
+            f"{session.coverage_result.returncode}"
+        )
+        return session
+
+    def summarize(
+        self, targets: List[BatchTarget], session: model.PytestSessionResult
+    ) -> List[TargetResult]:
+        jobs = {
+            target.target_id: job_context.JobContext.create(
+                target.function_attributes,
+                target.class_model,
+                debug=self.config.debug,
+                verbose=self.config.debug,
+            )
+            for target in targets
+        }
+        summaries = self.client.summarize_session(list(jobs.values()), session)
+
+        results: List[TargetResult] = []
+        for target in targets:
+            summary = summaries.get(target.target_id)
+            duration = round(session.duration_of(self._test_file_path(target)), 2)
+            if summary is None:
+                results.append(
+                    TargetResult(
+                        target_id=target.target_id,
+                        status="error",
+                        duration=duration,
+                        error="No coverage data for its module",
+                    )
+                )
+            elif summary.is_fully_covered and not summary.tests_failed:
+                self.client.record_verified(
+                    target.function_attributes, self.fixture_paths(target), summary
+                )
+                results.append(
+                    TargetResult(
+                        target_id=target.target_id, status="green", duration=duration
+                    )
+                )
+            else:
+                error = f"{summary.recalculated_coverage:.1f}% covered"
+                if summary.tests_failed:
+                    error += " - tests failed"
+                results.append(
+                    TargetResult(
+                        target_id=target.target_id,
+                        status="failed",
+                        duration=duration,
+                        error=error,
+                    )
+                )
+        return results
+
+    def fixture_paths(self, target: BatchTarget) -> List[Path]:
+        class_fixtures = self.client.find_class_fixtures(
+            target.class_model, self.fixture_parser
+        )
+        return [fixture.module_path for fixture in class_fixtures.values()]
+
+    @staticmethod
+    def _test_file_path(target: BatchTarget) -> Path:
+        return Path(target.function_attributes.test_absolute_file_path)
@@ -0,0 +1,69 @@
+"""Historical durations of test files - to schedule the longest first."""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class PytestDurations:
+    """Seconds each test file's tests took the last time they ran.
+
+    Kept as a JSON object {test file: seconds} - by default in
+    <generated_code_logs>/test_durations.json - and written atomically.
+    Test files under root are stored relative to it, so the file can be
+    shared between checkouts.
+
+    Example
+    -------
+    >>> durations = PytestDurations.in_dir(generated_code_logs, project_root)
+    >>> durations.update({test_file_path: 4.2})
+    >>> durations.get(test_file_path)
+    4.2
+    """
+
+    def __init__(self, path: Path, root: Optional[Path] = None) -> None:
+        self.path = Path(path)
+        self.root = root
+        self.durations: Dict[str, float] = self.load()
+
+    @classmethod
+    def in_dir(
+        cls, base_log_dir: Path, root: Optional[Path] = None
+    ) -> "PytestDurations":
+        return cls(Path(base_log_dir).joinpath("test_durations.json"), root)
+
+    def load(self) -> Dict[str, float]:
+        try:
+            return json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as temp_file:
+            json.dump(self.durations, temp_file, indent=2, sort_keys=True)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+            temp_file_path = temp_file.name
+
+        os.replace(temp_file_path, self.path)
+
+    def get(self, test_file_path: Path) -> Optional[float]:
+        return self.durations.get(self._key(test_file_path))
+
+    def update(self, durations: Dict[Path, float]) -> None:
+        """Record the latest duration of each test file and save."""
+        for test_file_path, duration in durations.items():
+            self.durations[self._key(test_file_path)] = round(duration, 3)
+        self.save()
+
+    def _key(self, test_file_path: Path) -> str:
+        test_file_path = Path(test_file_path).resolve()
+        if self.root and test_file_path.is_relative_to(Path(self.root).resolve()):
+            return test_file_path.relative_to(Path(self.root).resolve()).as_posix()
+        return test_file_path.as_posix()
@@ -1,11 +1,12 @@
 import ast
+import asyncio
 import datetime
 import logging
 import os
 import subprocess
 import sys
 from pathlib import Path
-from typing import Any, Dict, Type
+from typing import Any, Dict, List, Tuple, Type
 
 import numpy as np
 import pandas as pd
@@ -19,7 +20,7 @@ from code_autoeval.llm_model.hierarchy.fixture_generation.split_and_verify_code
     SplitAndVerifyCode,
     TestCodeVerificationError,
 )
-from code_autoeval.llm_model.utils import model_response
+from code_autoeval.llm_model.utils import model, model_response
 
 IMPORT_BANK = {
     "Path": "from pathlib import Path",
@@ -42,6 +43,7 @@ class FixtureGenerator(BaseModel):
     base_output_dir: str
     project_root: str
     clean_output_dir: bool = True
+    max_concurrent_requests: int = 4
     unique_project_imports: Dict[str, str] = (
         imports.FindImportsFromDir.find_unique_imports_from_dir()
     )
@@ -341,13 +343,28 @@ class FixtureGenerator(BaseModel):
         )
 
         # Use the LLM model to generate the fixture and test code
-        response = await self.stream_response.ask_backend_model(prompt)
+        response = await self.stream_response.ask_backend_model(
+            prompt, **self._fixture_budget_kwargs(class_info, prompt)
+        )
         return self.stream_response.figure_out_model_response(response)
 
+    def _fixture_budget_kwargs(self, class_info: dict, prompt: str) -> Dict[str, Any]:
+        """The generation budget for the fixture + test pair of a class."""
+        options = self.stream_response.generation_budget.for_fixture(
+            num_methods=len(class_info["methods"]),
+            num_attributes=len(class_info["attributes"]),
+            prompt=prompt,
+        )
+        return {"options": options} if options else {}
+
     async def generate_fixtures_for_level(self, level: int) -> None:
         classes = self.class_hierarchy[level]
         previous_levels = {l: self.class_hierarchy[l] for l in range(1, level)}
 
+        # class_name -> (fixture_path, test_path) for classes still missing fixtures
+        pending_paths: Dict[str, Tuple[str, str]] = {}
+        requests: List[model.BackendRequest] = []
+
         for class_name, class_info in classes.items():
 
             if class_name == "Config":
@@ -363,22 +380,50 @@ class FixtureGenerator(BaseModel):
             if Path(fixture_path).exists() and Path(test_path).exists():
                 continue
 
-            combined_code = await self.generate_fixture_and_test(
+            pending_paths[class_name] = (fixture_path, test_path)
+            prompt = self.create_prompt_for_class(
                 class_name, class_info, level, previous_levels
             )
+            requests.append(
+                model.BackendRequest(
+                    user_content=prompt,
+                    kwargs=self._fixture_budget_kwargs(class_info, prompt),
+                )
+            )
+
+        # Classes within a level only depend on previous levels, so their
+        # fixtures can be requested from the LLM concurrently.
+        results = await self.stream_response.ask_backend_model_many(
+            requests, max_concurrency=self.max_concurrent_requests
+        )
+
+        for (class_name, (fixture_path, test_path)), result in zip(
+            pending_paths.items(), results
+        ):
+            if not result.is_success:
+                print(f"Error generating fixture and test for {class_name}:")
+                print(f"Error message: {result.error}")
+                continue
+
+            combined_code = self.stream_response.figure_out_model_response(
+                result.response
+            )
 
             # Update the unique project imports with the fixture code.
             self.unique_project_imports.update(
-                imports.FindImportsFromDir.find_unique_imports_from_dir(
-                    subdirectory_name="generated_code/fixtures"
+                await asyncio.to_thread(
+                    imports.FindImportsFromDir.find_unique_imports_from_dir,
+                    subdirectory_name="generated_code/fixtures",
                 )
             )
 
             try:
-                fixture_code, test_code = SplitAndVerifyCode.split_and_verify_code(
-                    combined_code,
-                    self.class_data_factory.find_class_info(class_name),
-                    unique_project_imports=self.unique_project_imports,
+                fixture_code, test_code = (
+                    await SplitAndVerifyCode.split_and_verify_code(
+                        combined_code,
+                        self.class_data_factory.find_class_info(class_name),
+                        unique_project_imports=self.unique_project_imports,
+                    )
                 )
             except CodeVerificationError as e:
                 print(
@@ -413,14 +458,17 @@ class FixtureGenerator(BaseModel):
             print(f"Generated fixture and test for {class_name}")
 
     async def generate_all_fixtures(self) -> None:
-        if self.clean_output_dir:
-            self.clean_output_directory_before_run()
-
-        for level in sorted(self.class_hierarchy.keys()):
-            print(f"Generating fixtures for level {level}")
-            await self.generate_fixtures_for_level(level)
-            await self.generate_fixtures_for_level(level)
-            await self.generate_fixtures_for_level(level)
+        # The model loads in the background while the output dir is cleaned,
+        # and stays loaded between the levels.
+        async with self.stream_response.batch():
+            if self.clean_output_dir:
+                self.clean_output_directory_before_run()
+
+            for level in sorted(self.class_hierarchy.keys()):
+                print(f"Generating fixtures for level {level}")
+                await self.generate_fixtures_for_level(level)
+                await self.generate_fixtures_for_level(level)
+                await self.generate_fixtures_for_level(level)
 
     def get_default_value(self, type_: Type[Any]) -> Any:
         """Return an appropriate default value for isinstance checks."""
@@ -1,6 +1,7 @@
 """Split and verify the test/fixture code."""
 
 import ast
+import asyncio
 import re
 from pprint import pprint
 from typing import Any, Dict
@@ -46,7 +47,7 @@ class EmptyTestCodeError(Exception):
 class SplitAndVerifyCode:
 
     @classmethod
-    def split_and_verify_code(
+    async def split_and_verify_code(
         cls,
         code: str,
         class_model: class_data_model.ClassDataModel,
@@ -89,13 +90,13 @@ class SplitAndVerifyCode:
         fixture_code = cls.clean_code(fixture_code)
         test_code = cls.clean_code(test_code)
 
-        original_code, original_imports = (
-            ExtractImportsFromFile.find_original_code_and_imports(class_model)
+        original_code, original_imports = await asyncio.to_thread(
+            ExtractImportsFromFile.find_original_code_and_imports, class_model
         )
 
         # Using the flake8 and the full import dict,
         fixture_code, was_modified = (
-            RunFlake8FixImports.run_flake8_pipeline_with_temp_file(
+            await RunFlake8FixImports.run_flake8_pipeline_with_temp_file(
                 fixture_code,
                 class_model=class_model,
                 func_attributes=func_attributes,
@@ -105,7 +106,7 @@ class SplitAndVerifyCode:
         )
         # Using the flake8 and the full import dict,
         test_code, was_modified = (
-            RunFlake8FixImports.run_flake8_pipeline_with_temp_file(
+            await RunFlake8FixImports.run_flake8_pipeline_with_temp_file(
                 test_code,
                 class_model=class_model,
                 func_attributes=func_attributes,
@@ -13,6 +13,10 @@ from typing import Optional, Set
 
 from pydantic import Field
 
+from code_autoeval.llm_model.utils.code_cleaning.async_subprocess import (
+    LINT_TIMEOUT,
+    run_command,
+)
 from code_autoeval.llm_model.utils.log_funcs import logging_funcs
 
 # TODO - Figure out proper methods of testing this.
@@ -23,7 +27,7 @@ class DynamicallyImportPackages(logging_funcs.LoggingFuncs):
     imported_libraries: Set[str] = Field(default_factory=set)
 
     @classmethod
-    def import_required_libraries(
+    async def import_required_libraries(
         cls, code: str, imported_libraries: Optional[Set] = None
     ) -> Set[str]:
         """Import required libraries based on the generated code.
@@ -36,17 +40,19 @@ class DynamicallyImportPackages(logging_funcs.LoggingFuncs):
         :return: A set of imported libraries.
         """
         importer = cls(imported_libraries=imported_libraries or set())
-        importer._import_required_libraries(code)
+        await importer._import_required_libraries(code)
 
         return importer.imported_libraries
 
-    def _import_required_libraries(self, code: str, dry_run: bool = False) -> None:
+    async def _import_required_libraries(
+        self, code: str, dry_run: bool = False
+    ) -> None:
         """
         Import required libraries based on the generated code.
 
         :param code: The code to analyze for imports.
         """
-        libraries = self._extract_libraries(code)
+        libraries = await self._extract_libraries(code)
 
         self._log_code(libraries, "Libraries to import:")
 
@@ -56,7 +62,7 @@ class DynamicallyImportPackages(logging_funcs.LoggingFuncs):
         self._import_libraries(libraries)
         self._log_code(self.imported_libraries, "Imported libraries:")
 
-    def _extract_libraries(self, code: str) -> Set[str]:
+    async def _extract_libraries(self, code: str) -> Set[str]:
         """
         Extract library names from the code using flake8.
 
@@ -70,12 +76,12 @@ class DynamicallyImportPackages(logging_funcs.LoggingFuncs):
             temp_file_path = temp_file.name
 
         try:
-            flake8_result = self._run_flake8(temp_file_path)
+            flake8_result = await self._run_flake8(temp_file_path)
             return self._parse_flake8_output(flake8_result)
         finally:
             os.unlink(temp_file_path)
 
-    def _run_flake8(self, file_path: str) -> str:
+    async def _run_flake8(self, file_path: str, timeout: float = LINT_TIMEOUT) -> str:
         """
         Run flake8 on the given file.
 
@@ -83,12 +89,10 @@ class DynamicallyImportPackages(logging_funcs.LoggingFuncs):
         :return: The stdout from flake8.
         """
         try:
-            result = subprocess.run(
-                ["flake8", "--select=F401", file_path],
-                capture_output=True,
-                text=True,
-                check=True,
+            result = await run_command(
+                ["flake8", "--select=F401", file_path], timeout=timeout
             )
+            result.check_returncode()
             return result.stdout
         except subprocess.CalledProcessError as e:
             print(f"Flake8 failed with error: {e}")
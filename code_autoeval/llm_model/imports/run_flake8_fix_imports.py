@@ -8,6 +8,10 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 
 from multiuse.model import class_data_model
 
+from code_autoeval.llm_model.utils.code_cleaning.async_subprocess import (
+    LINT_TIMEOUT,
+    run_command,
+)
 from code_autoeval.llm_model.utils.code_cleaning.remove_invalid_imports import (
     RemoveInvalidImports,
 )
@@ -21,7 +25,7 @@ class RunFlake8FixImports(RemoveInvalidImports):
 
     @classmethod
     @validate_code()
-    def run_flake8_pipeline_with_temp_file(
+    async def run_flake8_pipeline_with_temp_file(
         cls,
         code: str,
         class_model: class_data_model.ClassDataModel,
@@ -48,14 +52,14 @@ class RunFlake8FixImports(RemoveInvalidImports):
                 changes_made = False
 
                 # Comment out syntax errors using flake8
-                if cls.comment_out_syntax_errors(temp_file_path):
+                if await cls.comment_out_syntax_errors(temp_file_path):
                     changes_made = True
                     # If changes were made, read the updated file
                     with open(temp_file_path, "r") as file:
                         code = file.read()
 
                 # Remove invalid imports using mypy
-                if cls.remove_invalid_imports(temp_file_path):
+                if await cls.remove_invalid_imports(temp_file_path):
                     changes_made = True
                     # If changes were made, read the updated file
                     with open(temp_file_path, "r") as file:
@@ -66,7 +70,7 @@ class RunFlake8FixImports(RemoveInvalidImports):
 
             class_model.raise_if_no_test_in_code(code)
 
-            return instance.run_flake_fix_imports(
+            return await instance.run_flake_fix_imports(
                 temp_file_path,
                 code,
                 class_model=class_model,
@@ -78,7 +82,7 @@ class RunFlake8FixImports(RemoveInvalidImports):
             os.unlink(temp_file_path)
 
     @classmethod
-    def run_flake_fix_imports(
+    async def run_flake_fix_imports(
         cls,
         temp_file_path: str,
         code: str,
@@ -89,7 +93,7 @@ class RunFlake8FixImports(RemoveInvalidImports):
         """Run flake8 and fix import errors."""
         self = cls()
 
-        flake8_result = self.run_flake8_against_code(temp_file_path)
+        flake8_result = await self.run_flake8_against_code(temp_file_path)
 
         problematic_lines, undefined_names = self.parse_flake8_output(flake8_result)
 
@@ -132,14 +136,13 @@ class RunFlake8FixImports(RemoveInvalidImports):
 
         return processed_code, True
 
-    def run_flake8_against_code(
-        self, temp_file_path: str
+    async def run_flake8_against_code(
+        self, temp_file_path: str, timeout: float = LINT_TIMEOUT
     ) -> subprocess.CompletedProcess:
         """Run flake8 against the code."""
-        return subprocess.run(
+        return await run_command(
             ["flake8", "--select=E999,F401,F821,F822,F823,F841,E501", temp_file_path],
-            capture_output=True,
-            text=True,
+            timeout=timeout,
         )
 
     def parse_flake8_output(
@@ -170,11 +173,13 @@ class RunFlake8FixImports(RemoveInvalidImports):
         return problematic_lines, undefined_names
 
     @classmethod
-    def fix_syntax_errors_for_n_lines(cls, file_path: str, nlines: int = 10) -> str:
+    async def fix_syntax_errors_for_n_lines(
+        cls, file_path: str, nlines: int = 10
+    ) -> str:
         """Circle through the file and fix syntax errors for n lines."""
         line_count: int = 0
         while line_count < nlines:
-            if not cls.comment_out_syntax_errors(file_path):
+            if not await cls.comment_out_syntax_errors(file_path):
                 break
             line_count += 1
 
@@ -182,16 +187,16 @@ class RunFlake8FixImports(RemoveInvalidImports):
             return file.read()
 
     @classmethod
-    def comment_out_syntax_errors(cls, file_path: str) -> bool:
+    async def comment_out_syntax_errors(
+        cls, file_path: str, timeout: float = LINT_TIMEOUT
+    ) -> bool:
         """
         Run flake8 to find syntax errors and comment out those lines.
         Returns True if changes were made, False otherwise.
         """
         # Run flake8 to find syntax errors
-        flake8_result = subprocess.run(
-            ["flake8", "--select=E999", file_path],
-            capture_output=True,
-            text=True,
+        flake8_result = await run_command(
+            ["flake8", "--select=E999", file_path], timeout=timeout
         )
 
         changes_made = False
@@ -264,13 +269,14 @@ class RunFlake8FixImports(RemoveInvalidImports):
         self,
         import_lines_to_add: List[str],
         remaining_undefined: Set[Any],
-        unique_imports_dict: Dict[str, str],
+        unique_imports_dict: Optional[Dict[str, str]],
     ) -> Tuple[List[str], Set[Any]]:
         # If these are known modules that have import paths within the project
         # then we can add them to the import_lines_to_add
         # and remove them from the remaining_undefined
         # This is to avoid adding unnecessary imports to the code
         # and to avoid raising an error for known imports
+        unique_imports_dict = unique_imports_dict or {}
 
         for name in list(remaining_undefined):
             if name in unique_imports_dict:
@@ -1,10 +1,13 @@
 """LLM Backend Client Model."""
 
+import asyncio
+from pathlib import Path
 from pprint import pprint
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 from multiuse.model import class_data_model
+from pydantic import Field
 
 from code_autoeval.llm_model import imports
 from code_autoeval.llm_model.utils import (
@@ -12,8 +15,10 @@ from code_autoeval.llm_model.utils import (
     execute_unit_tests,
     extraction,
     generate_fake_data,
+    job_context,
     model,
 )
+from code_autoeval.llm_model.utils.skip_ledger import SkipLedger
 
 
 class LLMModelClient(
@@ -22,7 +27,26 @@ class LLMModelClient(
     extraction.ExtractContextFromException,
     generate_fake_data.GenerateFakeData,
 ):
-    """LLM Backend Client Model."""
+    """LLM Backend Client Model.
+
+    The client owns a pooled HTTP connection to the backend model, so it can
+    be used as an async context manager to close it when done:
+
+    >>> async with LLMModelClient() as client:
+    ...     await client.code_generator(query, func, class_model=class_model)
+
+    Each code_generator call keeps its state in its own JobContext, so one
+    client (and its connections and caches) can run several at once:
+
+    >>> await asyncio.gather(
+    ...     *(client.code_generator(query, func, class_model=class_model) for func in funcs)
+    ... )
+    """
+
+    # Tiers of backend models - without tiers every request uses llm_model_name.
+    model_router: model.ModelRouter = Field(default_factory=model.ModelRouter)
+    # Functions verified as fully covered - skipped while their inputs are unchanged.
+    skip_ledger: SkipLedger = Field(default_factory=SkipLedger)
 
     def __init__(self, **kwargs: model.BackendModelKwargs) -> None:
         """Initialize the LLM Backend Client Model."""
@@ -40,6 +64,10 @@ class LLMModelClient(
         skip_generate_fake_data: bool = False,
         class_model: Optional[class_data_model.ClassDataModel] = None,
         fixture_parser: Optional[extraction.fixture_parser.FixtureParser] = None,
+        num_candidates: int = 1,
+        use_conversation_context: bool = False,
+        job: Optional[job_context.JobContext] = None,
+        verify: bool = False,
     ) -> Tuple[str, Any, Dict[str, Any], str]:
         """
         Generates Python code based on the query, provided function, and optional dataframe.
@@ -52,41 +80,51 @@ class LLMModelClient(
         :param debug: Whether to print debug information
         :param max_retries: Maximum number of retries for code generation
         :param skip_generate_fake_data: Whether to skip generating fake data
+        :param num_candidates: Number of candidates to request concurrently per attempt.
+            The first candidate to reach full coverage wins and the rest are cancelled.
+        :param use_conversation_context: Continue from the model's returned context on
+            retries, sending only the error / coverage gaps instead of the full prompt.
+        :param job: A JobContext created for func - e.g. to share the project imports
+            across jobs and read job.fully_covered afterwards. Its debug / verbose
+            flags are used instead of the arguments.
+        :param verify: Run the tests even if the function, its tests and fixtures
+            are unchanged since they were last fully covered (see skip_ledger).
         """
-        self.unique_imports_dict: Dict[str, str] = (
-            imports.FindImportsFromDir.find_unique_imports_from_dir()
+        if job is None:
+            # Everything this call reads and writes - nothing is stored on the
+            # client, so concurrent calls don't interfere.
+            job = job_context.JobContext.create(
+                model.FunctionAttributesFactory.create(
+                    func, self.common.generated_base_dir, class_model
+                ),
+                class_model,
+                debug=debug,
+                verbose=verbose,
+            )
+        function_attributes = job.function_attributes
+        class_model = job.class_model
+        debug = job.debug
+
+        class_fixtures = self.find_class_fixtures(class_model, fixture_parser)
+        fixture_paths = [fixture.module_path for fixture in class_fixtures.values()]
+        if not verify and self.is_verified(function_attributes, fixture_paths):
+            print(f"{job.func_name} is unchanged since it was fully covered - skipping")
+            job.fully_covered = True
+            return "", None, {}, ""
+
+        conversation_id = (
+            function_attributes.target_id if use_conversation_context else None
         )
-        function_attributes = model.FunctionAttributesFactory.create(
-            func, self.common.generated_base_dir, class_model
+        complexity = model.FunctionComplexity.from_function_attributes(
+            function_attributes
         )
-        # Extract function attributes
-        self.init_kwargs.__dict__.update(**function_attributes.__dict__)
-        self.init_kwargs.debug = debug
-        self.init_kwargs.verbose = verbose
-
-        # Replace the self.common class_logger with the class_model class
-        self.common.class_logger = class_model.class_logger
+        tier: Optional[model.ModelTier] = None
 
-        error_formatter = extraction.ExtractContextFromException()
-        unit_test_summary: model.UnitTestSummary = model.UnitTestSummary()
-
-        # Dictionary of class_name -> import_path for base classes
+        # Dictionary of class_name -> import_path for the class and its base classes
         fixture_import_paths: Dict[str, str] = {
-            base_name: fixture_parser.get_fixtures_for_class(base_name)
-            .fixtures[0]
-            .import_statement
-            for base_name in class_model.base_classes
-            if class_model.base_classes
+            class_name: fixture.import_statement
+            for class_name, fixture in class_fixtures.items()
         }
-        # Add in the class_model import path
-        fixture_import_paths[class_model.class_name] = (
-            fixture_parser.get_fixtures_for_class(class_model.class_name)
-            .fixtures[0]
-            .import_statement
-        )
-
-        code = ""
-        pytest_tests = ""
         system_prompt = self.generate_system_prompt(
             query=query,
             goal=goal or "",
@@ -95,24 +133,44 @@ class LLMModelClient(
             base_class_fixture_import_paths=fixture_import_paths,
         )
 
-        self._log_code(system_prompt, intro_message="System prompt")
+        # Load the first model in the background while the local setup runs -
+        # with the first request's num_ctx, so that request doesn't reload it.
+        first_tier = self.model_router.tier_for_attempt(complexity, 0)
+        self.start_preload(
+            first_tier.model_name if first_tier else None,
+            num_ctx=self.generation_budget.for_function(
+                complexity, query + system_prompt
+            ).get("num_ctx"),
+        )
+
+        if not job.unique_imports_dict:
+            # Parsing every module of the project is CPU-bound - run it in a thread.
+            job.unique_imports_dict = await asyncio.to_thread(
+                imports.FindImportsFromDir.find_unique_imports_from_dir
+            )
+        error_formatter = job.error_formatter
+        unit_test_summary: model.UnitTestSummary = model.UnitTestSummary()
+
+        code = ""
+        pytest_tests = ""
+        # Number of generations aborted as runaway - each re-ask samples differently.
+        runaway_generations = 0
+
+        self._log_code(system_prompt, intro_message="System prompt", job=job)
 
         # Generate fake data if needed - if valid df then this will get skipped.
-        df = self.generate_fake_data(
+        df = await self.generate_fake_data(
             func,
             df,
-            debug=self.init_kwargs.debug,
+            job=job,
             skip_generate_fake_data=skip_generate_fake_data,
         )
 
         for attempt in range(max_retries):
+            job.attempts = attempt + 1
             try:
-                if unit_test_summary := self.parse_existing_tests_or_raise_exception(
-                    function_attributes,
-                    df,
-                    class_model,
-                    attempt,
-                    error_formatter.error_message,
+                if unit_test_summary := await self.parse_existing_tests_or_raise_exception(
+                    job, df, attempt
                 ):
                     # If the first item of the return dict is valid, then return it.
                     if (
@@ -120,77 +178,113 @@ class LLMModelClient(
                         and not unit_test_summary.tests_failed
                     ):
                         print("Fully covered - returning code before generation")
+                        job.fully_covered = True
+                        self.record_verified(
+                            function_attributes, fixture_paths, unit_test_summary
+                        )
+                        job.generation_metrics.print_summary()
                         return code, None, {}, pytest_tests
                     else:
                         unit_test_summary.print_summary()
 
+                previous_tier = tier
+                tier = self.model_router.tier_for_attempt(complexity, attempt)
+                if (
+                    previous_tier
+                    and tier
+                    and tier.model_name != previous_tier.model_name
+                ):
+                    print(
+                        f"Escalating {function_attributes.func_name} to {tier.model_name}"
+                    )
+                    # The context tokens belong to the previous model.
+                    self.reset_conversation(conversation_id)
+
                 if (
                     attempt == 0
                     or not function_attributes.test_absolute_file_path.exists()
                 ):
-                    c = await self.ask_backend_model(query, system_prompt=system_prompt)
+                    self.reset_conversation(conversation_id)
+                    prompt = query
                 else:
                     coverage_report = self.get_coverage_report(
-                        function_name=self.init_kwargs.func_name,
-                        coverage_result=self.coverage_result,
+                        function_name=job.func_name,
+                        coverage_result=job.coverage_result,
                         error_message=error_formatter.error_message,
+                        unit_test_summary=job.unit_test_summary,
                     )
 
-                    clarification_prompt = self.generate_clarification_prompt(
-                        query,
-                        error_formatter.error_message,
-                        coverage_report=coverage_report,
-                        previous_code=code,
-                        pytest_tests=pytest_tests,
-                        fixture_import_paths=fixture_import_paths,
-                        unit_test_coverage_missing=unit_test_summary.uncovered_lines,
-                        function_attributes=function_attributes,
-                    )
-                    c = await self.ask_backend_model(
-                        clarification_prompt,
-                        system_prompt=system_prompt,
-                    )
-
-                content = self.figure_out_model_response(c)
-
-                self._log_code(content, intro_message="Raw content from model")
-
-                code, pytest_tests = self.split_content_from_model(content)
-
-                if code != pytest_tests:
-                    self._log_code(code=code, intro_message="Split result - code")
-
-                self._log_code(
-                    pytest_tests, intro_message="Split result - pytest_tests"
-                )
-
-                # Execute the generated code
-                result, context = self.execute_generated_code(
-                    original_code=code,
-                    func_attributes=function_attributes,
-                    df=df,
-                    debug=debug,
-                    class_model=class_model,
+                    if self.can_continue_conversation(conversation_id):
+                        # The previous code and tests are already in the context.
+                        prompt = self.generate_continuation_prompt(
+                            error_formatter.error_message,
+                            coverage_report=coverage_report,
+                            function_attributes=function_attributes,
+                            unit_test_coverage_missing=unit_test_summary.uncovered_lines,
+                        )
+                    else:
+                        prompt = self.generate_clarification_prompt(
+                            query,
+                            error_formatter.error_message,
+                            coverage_report=coverage_report,
+                            previous_code=code,
+                            pytest_tests=pytest_tests,
+                            fixture_import_paths=fixture_import_paths,
+                            unit_test_coverage_missing=unit_test_summary.uncovered_lines,
+                            function_attributes=function_attributes,
+                        )
+
+                budget_options = self.generation_budget.for_function(
+                    complexity,
+                    prompt + system_prompt,
+                    context_tokens=len(
+                        self.conversation_contexts.get(conversation_id or "", [])
+                    ),
                 )
 
-                # Write code and tests to files
-                self.write_code_and_tests(
-                    code, pytest_tests, class_model, function_attributes
+                code, pytest_tests, candidate_summary, candidate_error = (
+                    await self.generate_and_verify_candidates(
+                        prompt,
+                        system_prompt,
+                        job,
+                        df=df,
+                        num_candidates=num_candidates,
+                        conversation_id=conversation_id,
+                        code=code,
+                        pytest_tests=pytest_tests,
+                        resample=runaway_generations,
+                        model_name=tier.model_name if tier else None,
+                        options=budget_options,
+                    )
                 )
 
-                unit_test_summary: model.UnitTestSummary = self.run_tests(
-                    function_attributes.test_absolute_file_path,
-                    class_model,
-                    df,
-                )
+                if candidate_error:
+                    raise candidate_error
 
-                unit_test_summary.return_or_raise()
+                unit_test_summary = candidate_summary
 
                 # If the first item of the return dict is valid, then return it.
                 if unit_test_summary.is_fully_covered:
                     print("Fully covered - returning code")
+                    job.fully_covered = True
+                    self.record_verified(
+                        function_attributes, fixture_paths, unit_test_summary
+                    )
+                    self.model_router.record_success(
+                        function_attributes.func_name, tier
+                    )
+                    job.generation_metrics.print_summary()
                     return code, None, {}, pytest_tests
 
+            except model.RunawayGenerationError as rge:
+                runaway_generations += 1
+                self._log_code(
+                    f"Attempt {attempt + 1} - {rge} - re-asking with different sampling",
+                    "Runaway generation: ",
+                    job=job,
+                )
+                continue
+
             # Catch alls for code - formatting errors.
             except model.FormattingError as se:
 
@@ -198,6 +292,7 @@ class LLMModelClient(
                 self._log_code(
                     f"Attempt {attempt + 1} - removing test {file_path_to_remove=} - {se}",
                     "Syntax error: ",
+                    job=job,
                 )
                 # Remove the file and try again from the beginning
                 file_path_to_remove.unlink(missing_ok=True)
@@ -208,6 +303,7 @@ class LLMModelClient(
                 self._log_code(
                     f"Attempt {attempt + 1} - {error_formatter.error_message}",
                     "Insufficient coverage: ",
+                    job=job,
                 )
                 # Pass the error message to the next iteration
                 continue
@@ -224,6 +320,223 @@ class LLMModelClient(
                 # Pass the error message to the next iteration
                 continue
 
-        self._log_max_retries(max_retries)
+        self._log_max_retries(max_retries, job=job)
+        self.skip_ledger.forget(job.target_id)
+        job.generation_metrics.print_summary()
 
         return code, None, {}, pytest_tests
+
+    @staticmethod
+    def find_class_fixtures(
+        class_model: class_data_model.ClassDataModel,
+        fixture_parser: extraction.fixture_parser.FixtureParser,
+    ) -> Dict[str, model.FixtureInfo]:
+        """The fixture of each base class, then of the class itself."""
+        class_names = [*(class_model.base_classes or []), class_model.class_name]
+        return {
+            class_name: fixture_parser.get_fixtures_for_class(class_name).fixtures[0]
+            for class_name in class_names
+        }
+
+    def is_verified(
+        self, function_attributes: model.FunctionAttributes, fixture_paths: List[Path]
+    ) -> bool:
+        """True if the function was fully covered with the same inputs."""
+        self.skip_ledger.bind_base_dir(self.common.generated_base_log_dir)
+        return self.skip_ledger.is_current(
+            function_attributes.target_id,
+            self.skip_ledger.make_key(function_attributes, fixture_paths),
+        )
+
+    def record_verified(
+        self,
+        function_attributes: model.FunctionAttributes,
+        fixture_paths: List[Path],
+        unit_test_summary: model.UnitTestSummary,
+    ) -> None:
+        """Record the inputs the function was fully covered with."""
+        self.skip_ledger.bind_base_dir(self.common.generated_base_log_dir)
+        self.skip_ledger.record(
+            function_attributes.target_id,
+            self.skip_ledger.make_key(function_attributes, fixture_paths),
+            unit_test_summary.recalculated_coverage,
+        )
+
+    async def generate_and_verify_candidates(
+        self,
+        prompt: str,
+        system_prompt: str,
+        job: job_context.JobContext,
+        df: Optional[pd.DataFrame] = None,
+        num_candidates: int = 1,
+        conversation_id: Optional[str] = None,
+        code: str = "",
+        pytest_tests: str = "",
+        resample: int = 0,
+        model_name: Optional[str] = None,
+        options: Optional[model.OllamaOptions] = None,
+    ) -> Tuple[str, str, Optional[model.UnitTestSummary], Optional[BaseException]]:
+        """
+        Request candidates from the model and verify each one as soon as it arrives.
+
+        With num_candidates > 1 every candidate is sampled with a different
+        seed / temperature. The first candidate that is fully covered wins and
+        the outstanding requests are cancelled.
+
+        :param job: The job the candidates are for.
+        :param conversation_id: Continue / store the model's context under this id.
+            Parallel candidates each continue a copy of it, and only the context
+            of the candidate whose code is returned is stored.
+        :param code: The previous code - returned unchanged if no candidate was parsed.
+        :param pytest_tests: The previous tests - returned unchanged if no candidate was parsed.
+        :param resample: How many earlier generations were aborted as runaway - shifts
+            the seeds and raises the temperature / repeat penalty so the re-ask differs.
+        :param model_name: The backend model to ask - defaults to llm_model_name.
+        :param options: Ollama options (e.g. the generation budget) for every
+            candidate, merged with the per-candidate sampling options.
+        :return: The code and tests of the winning (or last) candidate, its
+            UnitTestSummary if it passed verification, and the last error otherwise.
+        """
+        # The conversation id each request continues and stores its context under.
+        candidate_ids: List[Optional[str]] = [conversation_id]
+        if num_candidates <= 1 and not resample:
+            requests = [
+                self.ask_backend_model(
+                    prompt,
+                    system_prompt=system_prompt,
+                    # A cached response wouldn't continue the stored context.
+                    bypass_cache=self.can_continue_conversation(conversation_id),
+                    conversation_id=conversation_id,
+                    model_name=model_name,
+                    job_metrics=job.generation_metrics,
+                    **({"options": options} if options else {}),
+                )
+            ]
+        else:
+            candidate_ids = [
+                (
+                    self.fork_conversation(
+                        conversation_id, f"{conversation_id}#candidate{index}"
+                    )
+                    if conversation_id
+                    else None
+                )
+                for index in range(max(num_candidates, 1))
+            ]
+            requests = [
+                self.ask_backend_model(
+                    prompt,
+                    system_prompt=system_prompt,
+                    bypass_cache=True,
+                    conversation_id=candidate_ids[index],
+                    model_name=model_name,
+                    job_metrics=job.generation_metrics,
+                    options={
+                        **(options or {}),
+                        **self._candidate_sampling_options(
+                            index, num_candidates, resample
+                        ),
+                    },
+                )
+                for index in range(max(num_candidates, 1))
+            ]
+
+        async def indexed(index: int, request: Any) -> Tuple[int, Any]:
+            return index, await request
+
+        tasks = [
+            asyncio.ensure_future(indexed(index, request))
+            for index, request in enumerate(requests)
+        ]
+        last_error: Optional[BaseException] = None
+        # The candidate whose code and tests are returned.
+        kept_id: Optional[str] = None
+
+        try:
+            # The requests run in parallel, but each candidate is verified in
+            # turn: they all write the same generated module and test file
+            # (job.function_attributes), so verifying two at once would mix them.
+            for next_candidate in asyncio.as_completed(tasks):
+                try:
+                    index, response = await next_candidate
+                    code, pytest_tests = self._split_model_response(response, job)
+                    kept_id = candidate_ids[index]
+                    unit_test_summary = await self._verify_candidate(
+                        code, pytest_tests, job, df
+                    )
+                except (Exception, model.MissingCoverageException) as e:
+                    last_error = e
+                    continue
+
+                return code, pytest_tests, unit_test_summary, None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if conversation_id and candidate_ids != [conversation_id]:
+                self.join_conversation(
+                    conversation_id,
+                    [candidate_id for candidate_id in candidate_ids if candidate_id],
+                    kept_id,
+                )
+
+        return code, pytest_tests, None, last_error
+
+    @staticmethod
+    def _candidate_sampling_options(
+        index: int, num_candidates: int, resample: int = 0
+    ) -> Dict[str, Any]:
+        """Spread seeds and temperatures (0.2 - 0.8) across the candidates.
+
+        After runaway generations (resample > 0) the seeds move on, and the
+        temperature and repeat penalty go up to break the loop.
+        """
+        temperature = 0.2 + 0.6 * index / max(num_candidates - 1, 1)
+        options: Dict[str, Any] = {
+            "seed": index + resample * num_candidates,
+            "temperature": round(min(temperature + 0.1 * resample, 1.0), 2),
+        }
+        if resample:
+            options["repeat_penalty"] = round(1.1 + 0.1 * resample, 2)
+        return options
+
+    def _split_model_response(
+        self, response: Any, job: job_context.JobContext
+    ) -> Tuple[str, str]:
+        """Split the model response into the code and the pytest tests."""
+        content = self.figure_out_model_response(response)
+
+        self._log_code(content, intro_message="Raw content from model", job=job)
+
+        code, pytest_tests = self.split_content_from_model(content)
+
+        if code != pytest_tests:
+            self._log_code(code=code, intro_message="Split result - code", job=job)
+
+        self._log_code(
+            pytest_tests, intro_message="Split result - pytest_tests", job=job
+        )
+
+        return code, pytest_tests
+
+    async def _verify_candidate(
+        self,
+        code: str,
+        pytest_tests: str,
+        job: job_context.JobContext,
+        df: Optional[pd.DataFrame] = None,
+    ) -> model.UnitTestSummary:
+        """Execute the code, write the files and run the tests for one candidate."""
+        # Execute the generated code
+        result, context = await self.execute_generated_code(
+            original_code=code, job=job, df=df
+        )
+
+        # Write code and tests to files
+        await self.write_code_and_tests(code, pytest_tests, job)
+
+        unit_test_summary: model.UnitTestSummary = await self.run_tests(
+            job.function_attributes.test_absolute_file_path, job, df
+        )
+
+        return unit_test_summary.return_or_raise()
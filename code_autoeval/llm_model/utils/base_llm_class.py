@@ -3,7 +3,7 @@
 import logging
 import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import List, Optional
 
 from dotenv import find_dotenv, load_dotenv
 from multiuse.filepaths.find_project_root import FindProjectRoot
@@ -32,6 +32,16 @@ class LLMModelAttributes(BaseModel):
 
     llm_model_name: str = ""
     llm_model_url: str = ""
+    # Every server hosting the model - requests are routed across all of them.
+    llm_model_urls: List[str] = []
+
+    @property
+    def endpoints(self) -> List[str]:
+        """The unique endpoint urls, llm_model_url first."""
+        urls = [self.llm_model_url, *self.llm_model_urls]
+        return list(dict.fromkeys(url.rstrip("/") for url in urls if url)) or [
+            self.llm_model_url
+        ]
 
 
 class CommonAttributes(BaseModelConfig):
@@ -49,9 +59,16 @@ class ModelAttributesFactory(BaseModel):
     @staticmethod
     def create() -> LLMModelAttributes:
         load_dotenv(find_dotenv())
+        # A comma separated OPENAI_BASE_URL spreads requests across several servers.
+        urls = [
+            url.strip()
+            for url in os.getenv("OPENAI_BASE_URL", "").split(",")
+            if url.strip()
+        ]
         return LLMModelAttributes(
             llm_model_name=os.getenv("OPENAI_MODEL_NAME", "coder-lite:latest"),
-            llm_model_url=os.getenv("OPENAI_BASE_URL", ""),
+            llm_model_url=urls[0] if urls else "",
+            llm_model_urls=urls,
         )
 
 
@@ -84,15 +101,13 @@ class InitKwargs(BaseModel):
 class BaseLLMClass(BaseModelConfig):
     """Base class."""
 
-    coverage_result: Any = None  # subprocess completed process
     file_path: Optional[Path] = None
     test_file_path: Optional[Path] = None
     absolute_path_from_root: Optional[Path] = None
 
     common: CommonAttributes = Field(default_factory=CommonAttributesFactory.create)
 
-    unique_imports_dict: Dict[str, str] = {}  # Modifiable.
-
+    # Logging flags outside of a job - each job has its own (JobContext).
     init_kwargs: InitKwargs = Field(
         default_factory=lambda: InitKwargs(verbose=False, debug=False, func_name="")
     )
@@ -1,8 +1,22 @@
 from code_autoeval.llm_model.utils.code_cleaning.run_pyflakes_isort import RunPyflakesIsort
 from code_autoeval.llm_model.utils.code_cleaning.auto_function_cleaning import AutoFunctionCleaning
+from code_autoeval.llm_model.utils.code_cleaning.async_subprocess import (
+    LINT_TIMEOUT,
+    PYTEST_TIMEOUT,
+    run_command,
+)
+from code_autoeval.llm_model.utils.code_cleaning.pytest_worker_pool import (
+    PytestWorkerPool,
+    PytestWorkerPoolConfig,
+)
 
 
 __all__ = [
     "RunPyflakesIsort",
     "AutoFunctionCleaning",
+    "LINT_TIMEOUT",
+    "PYTEST_TIMEOUT",
+    "run_command",
+    "PytestWorkerPool",
+    "PytestWorkerPoolConfig",
 ]
\ No newline at end of file
@@ -0,0 +1,106 @@
+"""Run the external tools (pytest, flake8, mypy, isort, pyflakes) asynchronously."""
+
+import asyncio
+import codecs
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence, TextIO, Tuple
+
+# Seconds before a tool is killed.
+LINT_TIMEOUT: float = 60
+PYTEST_TIMEOUT: float = 600
+# Bytes read at a time when teeing a tool's output.
+STREAM_CHUNK_SIZE = 4096
+
+
+async def run_command(
+    args: Sequence[str],
+    input: Optional[str] = None,
+    timeout: Optional[float] = LINT_TIMEOUT,
+    env: Optional[Dict[str, str]] = None,
+    capture_output: bool = True,
+    tee: bool = False,
+) -> "subprocess.CompletedProcess[str]":
+    """Async counterpart of subprocess.run(args, capture_output=True, text=True).
+
+    The event loop keeps running other coroutines while the tool runs. The
+    process is killed if it outlives timeout (subprocess.TimeoutExpired is
+    raised) or if the awaiting task is cancelled.
+
+    With tee=True the output is captured and also written to this process's
+    stdout / stderr as it arrives - so one run can be both shown and parsed.
+
+    Example
+    -------
+    >>> result = await run_command(["flake8", "--select=E999", file_path])
+    >>> result.stdout
+    """
+    pipe = subprocess.PIPE if capture_output or tee else None
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=subprocess.PIPE if input is not None else None,
+        stdout=pipe,
+        stderr=pipe,
+        env=env,
+    )
+
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            (
+                _communicate_tee(process, input)
+                if tee
+                else process.communicate(input.encode() if input is not None else None)
+            ),
+            timeout,
+        )
+    except BaseException as error:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        if isinstance(error, asyncio.TimeoutError):
+            raise subprocess.TimeoutExpired(list(args), timeout) from error
+        raise
+
+    return subprocess.CompletedProcess(
+        list(args),
+        process.returncode,
+        stdout.decode() if stdout is not None else None,
+        stderr.decode() if stderr is not None else None,
+    )
+
+
+async def _copy_stream(
+    stream: Optional[asyncio.StreamReader], echo: TextIO
+) -> Optional[bytes]:
+    """Read stream to the end, echoing the output as it arrives."""
+    if stream is None:
+        return None
+
+    # Multi-byte characters can be split across chunks - the decoder keeps
+    # the partial bytes until the rest of the character arrives.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks: List[bytes] = []
+    while chunk := await stream.read(STREAM_CHUNK_SIZE):
+        chunks.append(chunk)
+        echo.write(decoder.decode(chunk))
+        echo.flush()
+    echo.write(decoder.decode(b"", final=True))
+    echo.flush()
+    return b"".join(chunks)
+
+
+async def _communicate_tee(
+    process: asyncio.subprocess.Process, input: Optional[str] = None
+) -> Tuple[Optional[bytes], Optional[bytes]]:
+    if process.stdin is not None:
+        if input is not None:
+            process.stdin.write(input.encode())
+            await process.stdin.drain()
+        process.stdin.close()
+
+    stdout, stderr = await asyncio.gather(
+        _copy_stream(process.stdout, sys.stdout),
+        _copy_stream(process.stderr, sys.stderr),
+    )
+    await process.wait()
+    return stdout, stderr
@@ -0,0 +1,309 @@
+"""Fork server for PytestWorkerPool - runs pytest with coverage in forked children.
+
+Started by PytestWorkerPool as
+    python -m code_autoeval.llm_model.utils.code_cleaning.pytest_fork_server <preload modules>
+
+It imports the preload modules once, then reads one JSON request per line
+from stdin. Each request is run in a child forked from the (warm) server,
+which writes a PytestRunResult as JSON to the request's result_path -
+its coverage is coverage.py's JSON report. The
+server reports on stdout, one JSON message per line:
+    {"ready": true}
+    {"started": <id>, "pid": <pid>}
+    {"done": <id>, "exit_code": <exit code of the child>}
+The server exits when stdin is closed - i.e. when the pool's process exits.
+"""
+
+import contextlib
+import gc
+import importlib
+import importlib.metadata
+import io
+import json
+import os
+import select
+import sys
+import tempfile
+import time
+import traceback
+from typing import IO, Any, Dict, Iterator, List, Optional
+
+# Seconds between checks for finished children while waiting for requests.
+POLL_INTERVAL = 0.02
+
+
+def serve(preload_modules: List[str]) -> None:
+    for module_name in preload_modules:
+        with contextlib.suppress(ImportError):
+            importlib.import_module(module_name)
+    _preload_pytest_plugins()
+    _warm_up_pytest()
+    # The preloaded objects are never collected - keep the children's gc
+    # passes short (and their memory pages shared).
+    gc.freeze()
+
+    _send({"ready": True})
+
+    running: Dict[int, str] = {}
+    stdin_fd = sys.stdin.fileno()
+    buffer = b""
+    stdin_open = True
+
+    while stdin_open or running:
+        readable = []
+        if stdin_open:
+            readable, _, _ = select.select([stdin_fd], [], [], POLL_INTERVAL)
+        else:
+            time.sleep(POLL_INTERVAL)
+
+        _reap_children(running)
+
+        if not readable:
+            continue
+
+        data = os.read(stdin_fd, 65536)
+        if not data:
+            # The pool's process has gone - finish the running children and stop.
+            stdin_open = False
+            continue
+
+        buffer += data
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line.strip():
+                request = json.loads(line)
+                running[_fork_request(request)] = request["id"]
+
+
+def _preload_pytest_plugins() -> None:
+    """Import the installed pytest plugins - pytest.main loads them on every run."""
+    for entry_point in importlib.metadata.entry_points(group="pytest11"):
+        with contextlib.suppress(Exception):
+            entry_point.load()
+
+
+def _warm_up_pytest() -> None:
+    """Run pytest once on an empty directory, importing what it loads lazily."""
+    import pytest
+
+    with tempfile.TemporaryDirectory() as empty_dir:
+        with tempfile.TemporaryFile(mode="w+") as output:
+            with _redirect_output(output):
+                with contextlib.suppress(Exception):
+                    pytest.main([empty_dir, "-q", "-p", "no:cacheprovider"])
+
+
+def _fork_request(request: Dict[str, Any]) -> int:
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 1
+        try:
+            exit_code = _run_request(request)
+        finally:
+            os._exit(exit_code)
+
+    _send({"started": request["id"], "pid": pid})
+    return pid
+
+
+def _reap_children(running: Dict[int, str]) -> None:
+    while running:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            return
+        if request_id := running.pop(pid, None):
+            _send({"done": request_id, "exit_code": os.waitstatus_to_exitcode(status)})
+
+
+def _send(message: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def _run_request(request: Dict[str, Any]) -> int:
+    """Run in the forked child - write the result and return the exit code."""
+    # The child must not read the server's requests.
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+
+    try:
+        result = _pytest_with_coverage(
+            request["test_file_paths"],
+            request["coverage_sources"],
+            request["cwd"],
+            branch=request.get("branch", False),
+            pytest_args=request.get("pytest_args", []),
+            data_file=request.get("data_file"),
+        )
+    except BaseException:
+        result = {"exit_code": 1, "output": traceback.format_exc()}
+
+    result_path = request["result_path"]
+    with open(f"{result_path}.tmp", "w") as result_file:
+        json.dump(result, result_file)
+    os.replace(f"{result_path}.tmp", result_path)
+    return 0
+
+
+def _pytest_with_coverage(
+    test_file_paths: List[str],
+    coverage_sources: List[str],
+    cwd: str,
+    branch: bool = False,
+    pytest_args: Optional[List[str]] = None,
+    data_file: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run pytest under coverage - with a data_file, each test's lines are
+    recorded in its own context (as pytest-cov's --cov-context=test) and saved.
+    """
+    import coverage
+    import pytest
+
+    os.chdir(cwd)
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+    for coverage_source in coverage_sources:
+        _forget_modules(coverage_source)
+
+    outcomes = _OutcomeCounter()
+    report = io.StringIO()
+    start_time = time.perf_counter()
+
+    with tempfile.TemporaryFile(mode="w+") as output:
+        with _redirect_output(output):
+            cov = coverage.Coverage(
+                data_file=data_file, source=coverage_sources, branch=branch
+            )
+            plugins: List[Any] = [outcomes]
+            if data_file:
+                plugins.append(_TestContexts(cov))
+            cov.start()
+            try:
+                exit_code = int(
+                    pytest.main(
+                        [
+                            *test_file_paths,
+                            "-v",
+                            # The plugins were imported by the server, before
+                            # pytest could rewrite their asserts.
+                            "-W",
+                            "ignore::pytest.PytestAssertRewriteWarning",
+                            *(pytest_args or []),
+                        ],
+                        plugins=plugins,
+                    )
+                )
+            finally:
+                cov.stop()
+                if data_file:
+                    cov.save()
+
+        coverage_json: Dict[str, Any] = {}
+        try:
+            cov.report(show_missing=True, file=report)
+            with tempfile.TemporaryDirectory() as json_dir:
+                json_path = os.path.join(json_dir, "coverage.json")
+                cov.json_report(outfile=json_path)
+                with open(json_path) as json_file:
+                    coverage_json = json.load(json_file)
+        except coverage.exceptions.CoverageException as e:
+            report.write(f"Coverage error: {e}\n")
+
+        output.seek(0)
+        console_output = output.read()
+
+    return {
+        "exit_code": exit_code,
+        "passed": outcomes.passed,
+        "failed": outcomes.failed,
+        "errors": outcomes.errors,
+        "skipped": outcomes.skipped,
+        "duration": round(time.perf_counter() - start_time, 3),
+        "output": f"{console_output}\n{report.getvalue()}",
+        # coverage.py's JSON report - file names are relative to cwd.
+        "coverage": coverage_json,
+    }
+
+
+def _forget_modules(coverage_source: str) -> None:
+    """Drop the modules to measure, so they're imported again under coverage.
+
+    Every preloaded module of the same top-level package is dropped too -
+    otherwise they'd keep referring to the old copy of the measured module
+    (its classes, for isinstance / issubclass, and its names, for mock.patch).
+    """
+    module_name = coverage_source.replace("/", ".").removesuffix(".py").strip(".")
+    package = module_name.split(".", 1)[0]
+    for name in list(sys.modules):
+        if name == package or name.startswith(f"{package}."):
+            del sys.modules[name]
+
+
+@contextlib.contextmanager
+def _redirect_output(output: IO[str]) -> Iterator[None]:
+    """Send everything written to stdout / stderr (fds 1 and 2) to output."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = [os.dup(1), os.dup(2)]
+    os.dup2(output.fileno(), 1)
+    os.dup2(output.fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        for fd in saved_fds:
+            os.close(fd)
+
+
+class _TestContexts:
+    """pytest plugin recording each test phase in its own coverage context."""
+
+    def __init__(self, cov: Any) -> None:
+        self.cov = cov
+
+    def pytest_runtest_setup(self, item: Any) -> None:
+        self.cov.switch_context(f"{item.nodeid}|setup")
+
+    def pytest_runtest_call(self, item: Any) -> None:
+        self.cov.switch_context(f"{item.nodeid}|run")
+
+    def pytest_runtest_teardown(self, item: Any) -> None:
+        self.cov.switch_context(f"{item.nodeid}|teardown")
+
+    def pytest_runtest_logfinish(self) -> None:
+        self.cov.switch_context("")
+
+
+class _OutcomeCounter:
+    """pytest plugin counting the test outcomes."""
+
+    def __init__(self) -> None:
+        self.passed = 0
+        self.failed = 0
+        self.errors = 0
+        self.skipped = 0
+
+    def pytest_runtest_logreport(self, report: Any) -> None:
+        if report.when == "call" and report.passed:
+            self.passed += 1
+        elif report.failed:
+            if report.when == "call":
+                self.failed += 1
+            else:
+                self.errors += 1
+        elif report.skipped:
+            self.skipped += 1
+
+    def pytest_collectreport(self, report: Any) -> None:
+        if report.failed:
+            self.errors += 1
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1:])
@@ -0,0 +1,277 @@
+"""Run pytest with coverage in processes forked from a warm server."""
+
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils import model
+from code_autoeval.llm_model.utils.code_cleaning.async_subprocess import PYTEST_TIMEOUT
+
+FORK_SERVER_MODULE = "code_autoeval.llm_model.utils.code_cleaning.pytest_fork_server"
+
+# Imported once by the fork server - every test run starts with them loaded.
+DEFAULT_PRELOAD_MODULES: List[str] = [
+    "numpy",
+    "pandas",
+    "pydantic",
+    "faker",
+    "pytest",
+    "coverage",
+    "code_autoeval.llm_model.llm_model_client",
+]
+
+
+class PytestWorkerPoolConfig(BaseModel):
+    """Settings for the warm pytest workers (opt-in)."""
+
+    enabled: bool = Field(
+        default=False,
+        description="Run the tests in warm forked workers instead of a pytest subprocess.",
+    )
+    workers: int = Field(
+        default=max(1, os.cpu_count() or 1), ge=1, description="Test runs at once."
+    )
+    preload_modules: List[str] = Field(
+        default_factory=lambda: list(DEFAULT_PRELOAD_MODULES)
+    )
+    startup_timeout: float = Field(
+        default=120, description="Seconds to wait for the fork server to import."
+    )
+
+
+class PytestWorkerPool:
+    """Run each test file in a fresh process forked from a warm fork server.
+
+    The fork server (pytest_fork_server) imports the heavy dependencies
+    (pandas, numpy, pydantic, faker, pytest, coverage) and the project
+    packages once. Each run is a child forked from it - isolated from every
+    other run, but starting without paying for those imports - which calls
+    pytest.main under the coverage API. At most config.workers runs happen
+    at once. The modules under coverage are dropped from sys.modules in the
+    child first, so they're imported (and measured) fresh.
+
+    The server is a plain subprocess read by a thread, so the pool works
+    across event loops (e.g. one asyncio.run per code_generator call).
+
+    Example
+    -------
+    >>> pool = PytestWorkerPool(PytestWorkerPoolConfig(enabled=True))
+    >>> result = await pool.run(test_file_path, "code_autoeval.llm_model.utils.my_module")
+    >>> result.coverage.for_file(Path("code_autoeval/llm_model/utils/my_module.py"))
+    """
+
+    def __init__(self, config: Optional[PytestWorkerPoolConfig] = None) -> None:
+        self.config = config or PytestWorkerPoolConfig()
+        self._server: Optional[subprocess.Popen] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        # request id -> (loop, started future, done future)
+        self._pending: Dict[
+            str, Tuple[asyncio.AbstractEventLoop, asyncio.Future, asyncio.Future]
+        ] = {}
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None and self._server.poll() is None
+
+    def start(self) -> None:
+        """Start the fork server (if needed) and wait until it has imported."""
+        with self._lock:
+            if self.running:
+                return
+
+            self._ready.clear()
+            self._server = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    FORK_SERVER_MODULE,
+                    *self.config.preload_modules,
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                # The server sees the same modules as this process.
+                env={
+                    **os.environ,
+                    "PYTHONPATH": os.pathsep.join(filter(None, sys.path)),
+                },
+            )
+            threading.Thread(
+                target=self._read_messages, args=(self._server,), daemon=True
+            ).start()
+
+        if not self._ready.wait(self.config.startup_timeout):
+            self.close()
+            raise TimeoutError("pytest fork server didn't start")
+
+    def close(self) -> None:
+        """Stop the fork server - the next run starts a new one."""
+        with self._lock:
+            if self._server and self._server.poll() is None:
+                self._server.kill()
+                self._server.wait()
+            self._server = None
+
+    async def run(
+        self,
+        test_file_path: Union[Path, Sequence[Path]],
+        coverage_source: Union[str, Sequence[str]],
+        cwd: Optional[Path] = None,
+        timeout: Optional[float] = PYTEST_TIMEOUT,
+        branch: bool = False,
+        pytest_args: Sequence[str] = (),
+        data_file: Optional[Path] = None,
+    ) -> model.PytestRunResult:
+        """Run the tests in test_file_path, measuring coverage of coverage_source.
+
+        Both can be lists - e.g. the test files of every method of a class in
+        one session. branch measures branch coverage too (the result's
+        missing_branches). pytest_args are passed on to pytest. With a
+        data_file, the coverage data is saved there with each test's lines in
+        its own context (named like pytest-cov's --cov-context=test).
+
+        The forked child is killed if it outlives timeout (raising
+        subprocess.TimeoutExpired) or if the awaiting task is cancelled.
+        """
+        if not self.running:
+            await asyncio.to_thread(self.start)
+
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.setdefault(
+            loop, asyncio.Semaphore(self.config.workers)
+        )
+
+        cwd = Path(cwd or Path.cwd())
+        async with semaphore:
+            request_id = uuid.uuid4().hex
+            result_path = Path(tempfile.gettempdir()).joinpath(
+                f"pytest_result_{request_id}.json"
+            )
+            started: asyncio.Future = loop.create_future()
+            done: asyncio.Future = loop.create_future()
+            self._pending[request_id] = (loop, started, done)
+
+            try:
+                self._send(
+                    {
+                        "id": request_id,
+                        "test_file_paths": [
+                            str(Path(path).resolve())
+                            for path in _as_list(test_file_path)
+                        ],
+                        "coverage_sources": _as_list(coverage_source),
+                        "cwd": str(cwd),
+                        "result_path": str(result_path),
+                        "branch": branch,
+                        "pytest_args": list(pytest_args),
+                        "data_file": str(data_file) if data_file else None,
+                    }
+                )
+                pid = await asyncio.wait_for(started, self.config.startup_timeout)
+                try:
+                    exit_code = await asyncio.wait_for(done, timeout)
+                except BaseException as error:
+                    _kill_child(pid)
+                    if isinstance(error, asyncio.TimeoutError):
+                        raise subprocess.TimeoutExpired(
+                            ["pytest", *map(str, _as_list(test_file_path))], timeout
+                        ) from error
+                    raise
+
+                try:
+                    result = json.loads(result_path.read_text())
+                except FileNotFoundError:
+                    # The child died without a result - e.g. os._exit in a test.
+                    return model.PytestRunResult(
+                        exit_code=exit_code or 1,
+                        output=f"pytest worker exited with {exit_code}",
+                    )
+
+                coverage_json = result.pop("coverage", None) or {}
+                return model.PytestRunResult(
+                    **result,
+                    coverage=model.CoverageReport.from_json_report(
+                        coverage_json, root=cwd
+                    ),
+                )
+            finally:
+                self._pending.pop(request_id, None)
+                result_path.unlink(missing_ok=True)
+
+    def _send(self, request: Dict[str, Any]) -> None:
+        with self._lock:
+            if not self._server or not self._server.stdin:
+                raise RuntimeError("pytest fork server isn't running")
+            self._server.stdin.write(json.dumps(request) + "\n")
+            self._server.stdin.flush()
+
+    def _read_messages(self, server: subprocess.Popen) -> None:
+        """Thread reading the server's messages and resolving the futures."""
+        assert server.stdout
+        for line in server.stdout:
+            message = json.loads(line)
+            if message.get("ready"):
+                self._ready.set()
+            elif "started" in message:
+                self._resolve(message["started"], 1, message["pid"])
+            elif "done" in message:
+                self._resolve(message["done"], 2, message["exit_code"])
+
+        # The server exited - fail whatever was still waiting on it.
+        error = RuntimeError("pytest fork server exited")
+        for request_id in list(self._pending):
+            self._resolve(request_id, 1, None, error)
+            self._resolve(request_id, 2, None, error)
+
+    def _resolve(
+        self,
+        request_id: str,
+        index: int,
+        value: Any,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """Set the started (index 1) or done (index 2) future of a request."""
+        if not (pending := self._pending.get(request_id)):
+            return
+        loop, future = pending[0], pending[index]
+
+        def set_result() -> None:
+            if future.done():
+                return
+            if error:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+        loop.call_soon_threadsafe(set_result)
+
+
+def _as_list(value: Union[Any, Sequence[Any]]) -> List[Any]:
+    if isinstance(value, (str, Path)):
+        return [value]
+    return list(value)
+
+
+def _kill_child(pid: int) -> None:
+    """Kill a forked test run - it may have finished already."""
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
@@ -1,19 +1,23 @@
 """Remove the invalid imports."""
 
 import re
-import subprocess
+
+from code_autoeval.llm_model.utils.code_cleaning.async_subprocess import (
+    LINT_TIMEOUT,
+    run_command,
+)
 
 
 class RemoveInvalidImports:
 
     @classmethod
-    def remove_invalid_imports(cls, file_path: str) -> bool:
+    async def remove_invalid_imports(cls, file_path: str) -> bool:
         """
         Run mypy to find import-not-found errors and remove those lines.
         Returns True if changes were made, False otherwise.
         """
         # Run mypy to find import-not-found errors
-        mypy_result: str = cls.run_mypy_on_file(file_path)
+        mypy_result: str = await cls.run_mypy_on_file(file_path)
 
         changes_made = False
         lines_to_remove = []
@@ -43,11 +47,7 @@ class RemoveInvalidImports:
         return changes_made
 
     @staticmethod
-    def run_mypy_on_file(file_path: str) -> str:
+    async def run_mypy_on_file(file_path: str, timeout: float = LINT_TIMEOUT) -> str:
         """Run mypy on the specified file and return the output."""
-        result = subprocess.run(
-            ["mypy", file_path],
-            capture_output=True,
-            text=True,
-        )
+        result = await run_command(["mypy", file_path], timeout=timeout)
         return result.stdout
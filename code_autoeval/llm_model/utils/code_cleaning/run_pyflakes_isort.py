@@ -1,53 +1,59 @@
+import os
 import re
-import subprocess
-from pathlib import Path
-from typing import Optional, Tuple
+import tempfile
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from multiuse.model import class_data_model
 
+from code_autoeval.llm_model.utils.code_cleaning.async_subprocess import run_command
 from code_autoeval.llm_model.utils.log_funcs import logging_funcs
 
+if TYPE_CHECKING:
+    from code_autoeval.llm_model.utils.job_context import JobContext
+
 
 class RunPyflakesIsort(logging_funcs.LoggingFuncs):
 
-    def run_pyflakes_isort_pipeline(
+    async def run_pyflakes_isort_pipeline(
         self,
         code: str,
         max_line_length: int,
         class_model: Optional[class_data_model.ClassDataModel] = None,
+        job: Optional["JobContext"] = None,
     ) -> Tuple[str, bool]:
         was_modified = False
 
         # Use isort to sort and clean up imports
-        isort_result = subprocess.run(
+        isort_result = await run_command(
             ["isort", "-", "--profile", "black", f"--line-length={max_line_length}"],
             input=code,
-            capture_output=True,
-            text=True,
         )
         if isort_result.returncode == 0:
             code = isort_result.stdout
             was_modified = code != isort_result.stdout
 
-        # Use pyflakes to detect unused imports
-        with Path("temp_file.py").open("w") as f:
-            f.write(code)
+        # Use pyflakes to detect unused imports - in a file of our own, as
+        # several pipelines may be running at once.
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".py", delete=False
+        ) as temp_file:
+            temp_file.write(code)
+            temp_file_path = temp_file.name
 
-        pyflakes_result = subprocess.run(
-            ["pyflakes", "temp_file.py"], capture_output=True, text=True
-        )
+        try:
+            pyflakes_result = await run_command(["pyflakes", temp_file_path])
+        finally:
+            os.unlink(temp_file_path)  # Remove temporary file
 
         if pyflakes_result.returncode == 0:
             unused_imports = self.parse_pyflakes_output(pyflakes_result.stdout)
 
-            self._log_code(f"{unused_imports}", "Unused imports: ")
+            self._log_code(f"{unused_imports}", "Unused imports: ", job=job)
 
             if unused_imports:
                 code = self.remove_unused_imports(code, unused_imports)
                 was_modified = True
 
-        Path("temp_file.py").unlink()  # Remove temporary file
-
         return code, was_modified
 
     def parse_pyflakes_output(self, output: str) -> list:
@@ -2,14 +2,20 @@
 
 import os
 import subprocess
+import tempfile
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from xml.etree import ElementTree
 
 import pandas as pd
 from multiuse.model import class_data_model
+from pydantic import Field
 
 from code_autoeval.llm_model.utils import (
+    code_cleaning,
     extraction,
+    job_context,
     model,
     model_response,
     preprocess_code_before_exec,
@@ -20,30 +26,35 @@ class ExecuteUnitTests(
     preprocess_code_before_exec.PreProcessCodeBeforeExec,
     extraction.ParseUnitTestCoverage,
 ):
-    coverage_result: subprocess.CompletedProcess = None
+    # Seconds before a pytest run is killed - e.g. a test stuck in a loop.
+    pytest_timeout: float = code_cleaning.PYTEST_TIMEOUT
+    # Measure branch coverage too - a branch never taken leaves its line uncovered.
+    coverage_branch: bool = False
+    # Opt-in - run the tests in processes forked from a warm server.
+    pytest_worker_pool: code_cleaning.PytestWorkerPool = Field(
+        default_factory=code_cleaning.PytestWorkerPool
+    )
 
-    def parse_existing_tests_or_raise_exception(
+    async def parse_existing_tests_or_raise_exception(
         self,
-        function_attributes: model.FunctionAttributes,
+        job: job_context.JobContext,
         df: pd.DataFrame,
-        class_model: Optional[class_data_model.ClassDataModel] = None,
         attempt: int = 0,
-        error_message: str = "",
     ) -> model.UnitTestSummary:
         """Parse the existing tests or raise an exception if tests are missing."""
+        function_attributes = job.function_attributes
         if (
             function_attributes.test_absolute_file_path
             and function_attributes.module_absolute_path
             and Path(function_attributes.test_absolute_file_path).exists()
             and Path(function_attributes.module_absolute_path).exists()
             and attempt == 0
-            and not error_message
+            and not job.error_message
         ):
             try:
-                unit_test_summary = self.run_tests(
-                    function_attributes.test_absolute_file_path,
-                    class_model,
-                    df,
+                # Already run in a session for the whole class (run_class_tests).
+                unit_test_summary = job.unit_test_summary or await self.run_tests(
+                    function_attributes.test_absolute_file_path, job, df
                 )
                 return unit_test_summary.return_or_raise()
             except model.MissingCoverageException:
@@ -54,31 +65,34 @@ class ExecuteUnitTests(
         # raise Exception("No tests found or coverage is not 100%")
         return model.UnitTestSummary.create_empty()
 
-    def write_code_and_tests(
+    async def write_code_and_tests(
         self,
         code: str,
         pytest_tests: str,
-        class_model: class_data_model.ClassDataModel,
-        func_attributes: model.FunctionAttributes,
+        job: job_context.JobContext,
     ) -> None:
+        class_model = job.class_model
+        func_attributes = job.function_attributes
 
         self.validate_test_in_pytest_code(pytest_tests)
 
         if not class_model:
-            code = self.run_preprocess_pipeline(
+            code = await self.run_preprocess_pipeline(
                 code,
                 code_type="function",
-                func_name=self.init_kwargs.func_name,
+                func_name=job.func_name,
                 class_model=class_model,
+                job=job,
             )
 
-        pytest_tests = self.run_preprocess_pipeline(
+        pytest_tests = await self.run_preprocess_pipeline(
             pytest_tests,
             code_type="pytest",
-            func_name=self.init_kwargs.func_name,
+            func_name=job.func_name,
             class_model=class_model,
             func_attributes=func_attributes,
             is_pytest_format=True,
+            job=job,
         )
 
         func_attributes.module_generated_absolute_path.unlink(missing_ok=True)
@@ -95,71 +109,60 @@ class ExecuteUnitTests(
         print(f"Main code written to {func_attributes.module_generated_absolute_path}")
         print(f"Pytest tests written to {func_attributes.test_absolute_file_path}")
 
-    def run_tests(
+    async def run_tests(
         self,
         test_file_path: Path,
-        class_model: class_data_model.ClassDataModel,
+        job: job_context.JobContext,
         df: Optional[pd.DataFrame] = None,
     ) -> model.UnitTestSummary:
+        """Run the tests with coverage, storing the output in job.coverage_result.
+
+        The coverage is read from coverage.py's JSON report (job.coverage_report)
+        and summarized for the function from its AST - the term-missing text
+        in the output is only for reading.
+        """
+        class_model = job.class_model
         # Create a temporary file to store the dataframe if provided
         df_path = model_response.SerializeDataframes.store_df_in_temp_file(df)
 
         self._log_code(
-            class_model.coverage_file_path, intro_message="code_path_to_cover: "
+            class_model.coverage_file_path,
+            intro_message="code_path_to_cover: ",
+            job=job,
         )
 
         try:
-            # Prepare the pytest command
-            pytest_command = [
-                "pytest",
-                str(test_file_path.resolve()),
-                "-v",
-                f"--cov={class_model.coverage_file_path}",
-                "--cov-report=term-missing",
-                "--cov-fail-under=100",
-            ]
-
-            # Set up the environment with the updated PYTHONPATH
-            # env = os.environ.copy()
-            # env["PYTHONPATH"] = f"{self.project_root}:{env.get('PYTHONPATH', '')}"
-
             # Add dataframe path as a command-line option if available
             # TODO: Add in this functionality so that it works with latest pytest.
             # if df_path:
             #     pytest_command.append(f"--df_path={df_path}")
 
-            tests_failed = False
-
-            try:
-                # Run pytest first time to display output
-                subprocess.run(pytest_command[:-1], check=True)
-            except subprocess.CalledProcessError as e:
-                print(f"Error running pytest: {e}")
-                print(f"Command: {pytest_command}")
-                tests_failed = True
-
-            # with contextlib.suppress(subprocess.CalledProcessError):
-            #    # Run pytest first time to display output
-            #    subprocess.run(pytest_command[:-1], check=True)
-
-            # Run pytest with coverage
-            self.coverage_result = subprocess.run(
-                pytest_command,
-                capture_output=True,
-                text=True,
+            job.coverage_result, job.coverage_report = (
+                await self._run_pytest_with_coverage(
+                    [test_file_path], [class_model.coverage_file_path]
+                )
             )
 
-            self._log_coverage_results(self.coverage_result)
+            tests_failed = job.coverage_result.returncode != 0
+            if tests_failed:
+                print(
+                    f"Error running pytest: exit status {job.coverage_result.returncode}"
+                )
+                print(f"Command: {job.coverage_result.args}")
+
+            self._log_coverage_results(job.coverage_result, job=job)
 
             unit_test_summary: model.UnitTestSummary = (
                 self.wrap_run_parse_unit_test_cov(
-                    self.coverage_result.stdout,
-                    project_root=self.common.project_root,
-                    relative_path=class_model.coverage_file_path,
-                    func_name=self.init_kwargs.func_name.split(".")[-1],
+                    job.coverage_report,
+                    module_path=self._coverage_module_path(class_model),
+                    func_name=job.func_name,
                     tests_failed=tests_failed,
+                    test_output=job.coverage_result.stdout,
+                    job=job,
                 )
             )
+            job.unit_test_summary = unit_test_summary
 
             unit_test_summary.print_summary()
 
@@ -169,3 +172,229 @@ class ExecuteUnitTests(
             # Clean up the temporary dataframe file if it was created
             if df_path:
                 os.unlink(df_path)
+
+    async def run_class_tests(
+        self, jobs: Sequence[job_context.JobContext]
+    ) -> Dict[str, model.UnitTestSummary]:
+        """Run the existing tests of jobs (e.g. every method of a class) in one session.
+
+        Collection, imports and coverage start-up are paid once instead of
+        once per method. Coverage is recorded per test (coverage dynamic
+        contexts), so each job's summary only counts the lines run by the
+        tests in its own test file - and at import time. A test file that
+        fails to collect only fails its own job.
+
+        Sets each job's coverage_result, coverage_report and unit_test_summary,
+        and returns the summaries by job.target_id. Jobs without a test file,
+        or whose coverage couldn't be summarized, are left out.
+        """
+        jobs = self.jobs_with_tests(jobs)
+        if not jobs:
+            return {}
+
+        session = await self.run_test_session(
+            list(dict.fromkeys(self._test_file_path(job) for job in jobs)),
+            list(dict.fromkeys(job.class_model.coverage_file_path for job in jobs)),
+        )
+        return self.summarize_session(jobs, session)
+
+    @staticmethod
+    def jobs_with_tests(
+        jobs: Sequence[job_context.JobContext],
+    ) -> List[job_context.JobContext]:
+        return [
+            job
+            for job in jobs
+            if job.function_attributes.test_absolute_file_path
+            and Path(job.function_attributes.test_absolute_file_path).exists()
+        ]
+
+    async def run_test_session(
+        self,
+        test_file_paths: List[Path],
+        coverage_sources: List[str],
+        data_file: Optional[Path] = None,
+        show_output: bool = True,
+    ) -> model.PytestSessionResult:
+        """Run test_file_paths in one pytest session, each test in its own context.
+
+        With data_file, the coverage data is kept there - e.g. to combine the
+        data of sessions run in parallel.
+        """
+        junit_path = Path(tempfile.gettempdir()).joinpath(
+            f"junit.{uuid.uuid4().hex}.xml"
+        )
+
+        try:
+            coverage_result, coverage_report = await self._run_pytest_with_coverage(
+                test_file_paths,
+                coverage_sources,
+                pytest_args=[
+                    "--continue-on-collection-errors",
+                    f"--junitxml={junit_path}",
+                    # xunit1 records each test's file.
+                    "-o",
+                    "junit_family=xunit1",
+                ],
+                contexts=True,
+                data_file=data_file,
+                show_output=show_output,
+            )
+            failed_files, file_durations = self._read_junit(junit_path)
+        finally:
+            junit_path.unlink(missing_ok=True)
+
+        return model.PytestSessionResult(
+            coverage_result=coverage_result,
+            coverage_report=coverage_report,
+            failed_files=failed_files,
+            file_durations=file_durations,
+        )
+
+    def summarize_session(
+        self,
+        jobs: Sequence[job_context.JobContext],
+        session: model.PytestSessionResult,
+    ) -> Dict[str, model.UnitTestSummary]:
+        """Each job's summary, from the tests in its own test file."""
+        summaries: Dict[str, model.UnitTestSummary] = {}
+        for job in jobs:
+            test_file_path = self._test_file_path(job)
+            job.coverage_result = session.coverage_result
+            job.coverage_report = session.coverage_of(test_file_path)
+            try:
+                job.unit_test_summary = self.wrap_run_parse_unit_test_cov(
+                    job.coverage_report,
+                    module_path=self._coverage_module_path(job.class_model),
+                    func_name=job.func_name,
+                    tests_failed=session.tests_failed(test_file_path),
+                    test_output=session.coverage_result.stdout,
+                    job=job,
+                )
+            except Exception as e:
+                print(f"Couldn't summarize the coverage of {job.func_name}: {e}")
+                continue
+            summaries[job.target_id] = job.unit_test_summary
+
+        return summaries
+
+    async def _run_pytest_with_coverage(
+        self,
+        test_file_paths: List[Path],
+        coverage_sources: List[str],
+        pytest_args: Sequence[str] = (),
+        contexts: bool = False,
+        data_file: Optional[Path] = None,
+        show_output: bool = True,
+    ) -> Tuple[subprocess.CompletedProcess, model.CoverageReport]:
+        """Run pytest once - in the worker pool if enabled - and read its coverage.
+
+        contexts records the lines of each test in its own coverage context.
+        The coverage data goes to a temporary file, unless data_file is given.
+        show_output prints pytest's output (it's always captured).
+        """
+        run_id = uuid.uuid4().hex
+        coverage_data_path = data_file or Path(tempfile.gettempdir()).joinpath(
+            f".coverage.{run_id}"
+        )
+        coverage_json_path = Path(tempfile.gettempdir()).joinpath(
+            f"coverage.{run_id}.json"
+        )
+
+        # Prepare the pytest command. There's no --cov-fail-under, so a
+        # non-zero exit status means the tests themselves failed - the
+        # coverage is checked from the report.
+        pytest_command = [
+            "pytest",
+            *(str(path.resolve()) for path in test_file_paths),
+            "-v",
+            *(f"--cov={coverage_source}" for coverage_source in coverage_sources),
+            "--cov-report=term-missing",
+            f"--cov-report=json:{coverage_json_path}",
+            *pytest_args,
+        ]
+        if self.coverage_branch:
+            pytest_command.append("--cov-branch")
+        if contexts:
+            pytest_command.append("--cov-context=test")
+
+        # Each run gets its own coverage data file, so concurrent runs
+        # don't overwrite each other's .coverage in the working directory.
+        env = {**os.environ, "COVERAGE_FILE": str(coverage_data_path)}
+
+        try:
+            if self.pytest_worker_pool.enabled:
+                run_result = await self.pytest_worker_pool.run(
+                    test_file_paths,
+                    coverage_sources,
+                    timeout=self.pytest_timeout,
+                    branch=self.coverage_branch,
+                    pytest_args=pytest_args,
+                    data_file=coverage_data_path if contexts else None,
+                )
+                if show_output:
+                    print(run_result.output)
+                coverage_result = subprocess.CompletedProcess(
+                    pytest_command, run_result.exit_code, run_result.output, ""
+                )
+                coverage_report = run_result.coverage
+            else:
+                # One pytest run - shown as it runs and captured for the logs.
+                coverage_result = await code_cleaning.run_command(
+                    pytest_command,
+                    timeout=self.pytest_timeout,
+                    env=env,
+                    tee=show_output,
+                )
+                coverage_report = model.CoverageReport.from_json_file(
+                    coverage_json_path, root=Path.cwd()
+                )
+
+            if contexts and coverage_data_path.exists():
+                coverage_report.add_contexts(coverage_data_path)
+
+            return coverage_result, coverage_report
+
+        finally:
+            if not data_file:
+                coverage_data_path.unlink(missing_ok=True)
+            coverage_json_path.unlink(missing_ok=True)
+
+    def _coverage_module_path(
+        self, class_model: class_data_model.ClassDataModel
+    ) -> Path:
+        """The module measured for class_model - coverage_file_path is dotted."""
+        return self.common.project_root.joinpath(
+            class_model.coverage_file_path.replace(".", "/")
+        ).with_suffix(".py")
+
+    @staticmethod
+    def _test_file_path(job: job_context.JobContext) -> Path:
+        return Path(job.function_attributes.test_absolute_file_path)
+
+    @staticmethod
+    def _read_junit(junit_path: Path) -> Tuple[Set[str], Dict[str, float]]:
+        """Files of tests that failed or errored, and seconds each file's tests took.
+
+        Files are relative to pytest's rootdir, as in the node ids. Files that
+        failed to collect have no duration - none of their tests ran.
+        """
+        try:
+            root = ElementTree.parse(junit_path).getroot()
+        except (FileNotFoundError, ElementTree.ParseError):
+            return set(), {}
+
+        failed_files: Set[str] = set()
+        file_durations: Dict[str, float] = {}
+        for testcase in root.iter("testcase"):
+            file_name = testcase.get("file", "")
+            error = testcase.find("error")
+            if testcase.find("failure") is not None or error is not None:
+                failed_files.add(file_name)
+            if error is not None and error.get("message") == "collection failure":
+                continue
+            file_durations[file_name] = file_durations.get(file_name, 0) + float(
+                testcase.get("time", 0)
+            )
+
+        return failed_files, file_durations
@@ -1,6 +1,5 @@
 """Generate Fake Data."""
 
-import asyncio
 import random
 import re
 from typing import Any, Callable, Optional
@@ -8,6 +7,7 @@ from typing import Any, Callable, Optional
 import pandas as pd
 from faker import Faker
 
+from code_autoeval.llm_model.utils import job_context
 from code_autoeval.llm_model.utils.model_response.stream_response import StreamResponse
 from code_autoeval.llm_model.utils.preprocess_code_before_exec import (
     PreProcessCodeBeforeExec,
@@ -19,25 +19,11 @@ class GenerateFakeData(StreamResponse, PreProcessCodeBeforeExec, SystemPrompts):
     """Generate the fake data."""
 
     # @persistent_cache
-    def generate_fake_data(
+    async def generate_fake_data(
         self,
         func: Callable[..., Any],
         df: Optional[pd.DataFrame] = None,
-        debug: bool = False,
-        skip_generate_fake_data: bool = False,
-    ) -> pd.DataFrame:
-        """
-        Generate fake data based on the function signature if needed.
-        """
-        return asyncio.run(
-            self.async_generate_fake_data(func, df, debug, skip_generate_fake_data)
-        )
-
-    async def async_generate_fake_data(
-        self,
-        func: Callable[..., Any],
-        df: Optional[pd.DataFrame] = None,
-        debug: bool = False,
+        job: Optional[job_context.JobContext] = None,
         skip_generate_fake_data: bool = False,
     ) -> pd.DataFrame:
         """
@@ -46,12 +32,12 @@ class GenerateFakeData(StreamResponse, PreProcessCodeBeforeExec, SystemPrompts):
         if df is not None or skip_generate_fake_data:
             return df
 
-        self.debug = debug
-
         fake_data_prompt = self.generate_fake_data_prompt(func)
 
         fake_data_response = await self.ask_backend_model(
-            fake_data_prompt, system_prompt=""
+            fake_data_prompt,
+            system_prompt="",
+            job_metrics=job.generation_metrics if job else None,
         )
 
         content = self.figure_out_model_response(fake_data_response)
@@ -62,9 +48,9 @@ class GenerateFakeData(StreamResponse, PreProcessCodeBeforeExec, SystemPrompts):
         )
 
         code = parts[0].strip()
-        code = self.run_preprocess_pipeline(code, code_type="")
+        code = await self.run_preprocess_pipeline(code, code_type="", job=job)
         # Log the code
-        self._log_code(code)
+        self._log_code(code, job=job)
 
         try:
             # Set up the execution environment
@@ -79,7 +65,7 @@ class GenerateFakeData(StreamResponse, PreProcessCodeBeforeExec, SystemPrompts):
             if not isinstance(fake_data, pd.DataFrame):
                 raise ValueError("The generated fake data is not a pandas DataFrame")
 
-            self._log_fake_gen_data(fake_data)
+            self._log_fake_gen_data(fake_data, job=job)
 
             return fake_data
 
@@ -0,0 +1,92 @@
+"""State of a single code_generator job."""
+
+import logging
+import subprocess
+from typing import Dict, Optional
+
+from multiuse.model import class_data_model
+from pydantic import Field
+
+from code_autoeval.llm_model.utils import extraction, model
+from code_autoeval.llm_model.utils.base_llm_class import BaseModelConfig, InitKwargs
+
+
+class JobContext(BaseModelConfig):
+    """Everything one code_generator call reads and writes while it runs.
+
+    The client itself only holds what's shared between jobs (HTTP pool,
+    caches, router, config). Each job gets its own JobContext, which is
+    passed through preprocessing, execution, test running and coverage
+    parsing - so one client can run many jobs at once.
+
+    Example
+    -------
+    >>> job = JobContext.create(function_attributes, class_model, debug=True)
+    >>> await client.run_tests(job.function_attributes.test_absolute_file_path, job)
+    """
+
+    init_kwargs: InitKwargs
+    function_attributes: model.FunctionAttributes
+    class_model: Optional[class_data_model.ClassDataModel] = None
+    class_logger: logging.Logger
+    # Names importable from the project -> their import statement.
+    unique_imports_dict: Dict[str, str] = Field(default_factory=dict)
+    # The last pytest run with coverage.
+    coverage_result: Optional[subprocess.CompletedProcess] = None
+    # Its coverage data, and the function's summary of it.
+    coverage_report: model.CoverageReport = Field(default_factory=model.CoverageReport)
+    unit_test_summary: Optional[model.UnitTestSummary] = None
+    # The last error, formatted for the next prompt.
+    error_formatter: extraction.ExtractContextFromException = Field(
+        default_factory=extraction.ExtractContextFromException
+    )
+    # Metrics of this job's backend model calls.
+    generation_metrics: model.GenerationMetricsSummary = Field(
+        default_factory=model.GenerationMetricsSummary
+    )
+    # Outcome - filled in by code_generator.
+    attempts: int = 0
+    fully_covered: bool = False
+
+    @classmethod
+    def create(
+        cls,
+        function_attributes: model.FunctionAttributes,
+        class_model: Optional[class_data_model.ClassDataModel] = None,
+        debug: bool = False,
+        verbose: bool = True,
+        unique_imports_dict: Optional[Dict[str, str]] = None,
+        class_logger: Optional[logging.Logger] = None,
+    ) -> "JobContext":
+        """Create the context - logging to the class_model's logger if given."""
+        return cls(
+            init_kwargs=InitKwargs(
+                verbose=verbose,
+                debug=debug,
+                func_name=function_attributes.func_name,
+            ),
+            function_attributes=function_attributes,
+            class_model=class_model,
+            class_logger=(
+                class_model.class_logger
+                if class_model
+                else class_logger or logging.getLogger(__name__)
+            ),
+            unique_imports_dict=unique_imports_dict or {},
+        )
+
+    @property
+    def func_name(self) -> str:
+        return self.init_kwargs.func_name
+
+    @property
+    def target_id(self) -> str:
+        return self.function_attributes.target_id
+
+    @property
+    def debug(self) -> bool:
+        return self.init_kwargs.debug
+
+    @property
+    def error_message(self) -> str:
+        return self.error_formatter.error_message
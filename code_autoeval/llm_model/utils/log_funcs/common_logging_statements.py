@@ -1,54 +1,82 @@
 """Common logging statements."""
 
+import logging
 import subprocess
 from pathlib import Path
 from pprint import pprint
-from typing import Any, Union
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
 
 from IPython.display import display
 
-from code_autoeval.llm_model.utils.base_llm_class import BaseLLMClass
+from code_autoeval.llm_model.utils.base_llm_class import BaseLLMClass, InitKwargs
+
+if TYPE_CHECKING:
+    from code_autoeval.llm_model.utils.job_context import JobContext
 
 
 class CommonLoggingStatements(BaseLLMClass):
 
-    def _log_max_retries(self, max_retries: int) -> None:
+    def _logging_target(
+        self, job: Optional["JobContext"] = None
+    ) -> Tuple[InitKwargs, logging.Logger]:
+        """The job's flags and logger - the client's outside of a job."""
+        if job is None:
+            return self.init_kwargs, self.common.class_logger
+        return job.init_kwargs, job.class_logger
+
+    def _log_max_retries(
+        self, max_retries: int, job: Optional["JobContext"] = None
+    ) -> None:
         """Log the max retries."""
+        init_kwargs, logger = self._logging_target(job)
         # If we've exhausted all retries
-        if self.init_kwargs.verbose:
-            self.common.class_logger.debug(
+        if init_kwargs.verbose:
+            logger.debug(
                 f"Failed to generate correct code with 100% coverage after {max_retries} attempts."
             )
 
     def _log_coverage_results(
-        self, coverage_result: subprocess.CompletedProcess
+        self,
+        coverage_result: subprocess.CompletedProcess,
+        job: Optional["JobContext"] = None,
     ) -> None:
         """Log the coverage results."""
+        init_kwargs, logger = self._logging_target(job)
         # Print the pytest output
-        if self.init_kwargs.debug:
+        if init_kwargs.debug:
             display(pprint(coverage_result))
 
-            self.common.class_logger.debug(
-                f"Coverage results: {coverage_result.stdout}"
-            )
+            logger.debug(f"Coverage results: {coverage_result.stdout}")
 
             if coverage_result.stderr:
-                self.common.class_logger.debug(
-                    f"Coverage errors: {coverage_result.stderr}"
-                )
+                logger.debug(f"Coverage errors: {coverage_result.stderr}")
                 display(pprint(coverage_result.stderr))
 
-    def _log_test_coverage_path(self, test_coverage_path: Union[str, Path]) -> None:
+    def _log_test_coverage_path(
+        self,
+        test_coverage_path: Union[str, Path],
+        job: Optional["JobContext"] = None,
+    ) -> None:
         """Log the test coverage path."""
-        if self.init_kwargs.debug:
-            self.common.class_logger.debug(f"Test coverage path: {test_coverage_path}")
+        init_kwargs, logger = self._logging_target(job)
+        if init_kwargs.debug:
+            logger.debug(f"Test coverage path: {test_coverage_path}")
 
-    def _log_fake_gen_data(self, fake_data: Any) -> None:
+    def _log_fake_gen_data(
+        self, fake_data: Any, job: Optional["JobContext"] = None
+    ) -> None:
         """Log the fake gen data path."""
-        if self.init_kwargs.debug:
-            self.common.class_logger.debug(f"Generated fake DataFrame: {fake_data}")
+        init_kwargs, logger = self._logging_target(job)
+        if init_kwargs.debug:
+            logger.debug(f"Generated fake DataFrame: {fake_data}")
 
-    def _log_code(self, code: Any, intro_message: str = "Generated Code") -> None:
+    def _log_code(
+        self,
+        code: Any,
+        intro_message: str = "Generated Code",
+        job: Optional["JobContext"] = None,
+    ) -> None:
         """Log the generated code."""
-        if self.init_kwargs.debug:
-            self.common.class_logger.debug(f"{intro_message}\n{code}")
+        init_kwargs, logger = self._logging_target(job)
+        if init_kwargs.debug:
+            logger.debug(f"{intro_message}\n{code}")
@@ -1,9 +1,15 @@
 from code_autoeval.llm_model.utils.model.function_attributes import FunctionAttributes, FunctionAttributesFactory
 from code_autoeval.llm_model.utils.model.custom_exceptions import (
+    BackendError,
+    BackendHTTPError,
+    BackendTimeoutError,
+    BackendUnavailableError,
+    CassetteMissError,
     MissingCoverageException,
     CoverageParsingError,
     FormattingError,
     NoTestsInPytestFile,
+    RunawayGenerationError,
 )
 
 from code_autoeval.llm_model.utils.model.fixture_models import (
@@ -13,17 +19,61 @@ from code_autoeval.llm_model.utils.model.fixture_models import (
 
 from code_autoeval.llm_model.utils.model.unit_test_summary import UnitTestSummary
 
-from code_autoeval.llm_model.utils.model.backend_model_kwargs import BackendModelKwargs
+from code_autoeval.llm_model.utils.model.coverage_report import (
+    CoverageReport,
+    FileCoverage,
+)
+
+from code_autoeval.llm_model.utils.model.pytest_run_result import PytestRunResult
+from code_autoeval.llm_model.utils.model.pytest_session_result import (
+    PytestSessionResult,
+)
+
+from code_autoeval.llm_model.utils.model.backend_model_kwargs import BackendModelKwargs, OllamaOptions
+
+from code_autoeval.llm_model.utils.model.backend_request import BackendRequest, BackendResult
+
+from code_autoeval.llm_model.utils.model.generation_metrics import (
+    GenerationMetrics,
+    GenerationMetricsSummary,
+)
+
+from code_autoeval.llm_model.utils.model.model_router import (
+    FunctionComplexity,
+    ModelRouter,
+    ModelTier,
+)
+
+from code_autoeval.llm_model.utils.model.generation_budget import GenerationBudgetPolicy
 
 __all__ = [
     "FunctionAttributes",
     "FunctionAttributesFactory",
+    "BackendError",
+    "BackendHTTPError",
+    "BackendTimeoutError",
+    "BackendUnavailableError",
+    "CassetteMissError",
     "MissingCoverageException",
     "CoverageParsingError",
     "FormattingError",
     "NoTestsInPytestFile",
+    "RunawayGenerationError",
     "ClassFixtures",
     "FixtureInfo",
     "UnitTestSummary",
+    "CoverageReport",
+    "FileCoverage",
+    "PytestRunResult",
+    "PytestSessionResult",
     "BackendModelKwargs",
+    "OllamaOptions",
+    "BackendRequest",
+    "BackendResult",
+    "GenerationMetrics",
+    "GenerationMetricsSummary",
+    "FunctionComplexity",
+    "ModelRouter",
+    "ModelTier",
+    "GenerationBudgetPolicy",
 ]
@@ -1,6 +1,19 @@
 """Backend model kwargs validation."""
 
-from typing import TypedDict
+from typing import List, TypedDict
+
+
+class OllamaOptions(TypedDict, total=False):
+    """Model `options` for the Ollama /api/generate endpoint."""
+
+    num_predict: int  # Maximum tokens to generate (-1 = unbounded).
+    num_ctx: int  # Context window - changing it reloads the model.
+    stop: List[str]
+    seed: int
+    temperature: float
+    top_p: float
+    top_k: int
+    repeat_penalty: float
 
 
 class BackendModelKwargs(TypedDict, total=False):
@@ -9,3 +22,4 @@ class BackendModelKwargs(TypedDict, total=False):
     top_p: float
     frequency_penalty: float
     presence_penalty: float
+    options: OllamaOptions
@@ -0,0 +1,53 @@
+"""Data models for batched backend model requests."""
+
+from typing import Any, Dict, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field, computed_field
+
+
+class BackendRequest(BaseModel):
+    """A single prompt to send to the backend model."""
+
+    user_content: str
+    system_prompt: Optional[str] = Field(
+        default=None,
+        description="Falls back to the ask_backend_model default when None.",
+    )
+    kwargs: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Extra BackendModelKwargs passed through to the API.",
+    )
+
+    @classmethod
+    def from_item(
+        cls, item: Union["BackendRequest", str, Tuple[Any, ...]]
+    ) -> "BackendRequest":
+        """Accept a BackendRequest, a prompt, or a (prompt, system_prompt, kwargs) tuple."""
+        if isinstance(item, cls):
+            return item
+        if isinstance(item, str):
+            return cls(user_content=item)
+
+        user_content, system_prompt, kwargs = (tuple(item) + (None, None))[:3]
+        return cls(
+            user_content=user_content,
+            system_prompt=system_prompt,
+            kwargs=kwargs or {},
+        )
+
+
+class BackendResult(BaseModel):
+    """The outcome of one request in a batch - either a response or an error."""
+
+    index: int = Field(description="Position of the request in the input batch.")
+    request: BackendRequest
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @computed_field
+    def is_success(self) -> bool:
+        """Flag to indicate if the request returned a response."""
+        return self.error is None
@@ -0,0 +1,213 @@
+"""Data Models for coverage.py's data - read from its JSON report."""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import coverage
+from pydantic import BaseModel, Field
+
+
+class FileCoverage(BaseModel):
+    """Coverage of one source file."""
+
+    executed_lines: List[int] = Field(default_factory=list)
+    missing_lines: List[int] = Field(default_factory=list)
+    excluded_lines: List[int] = Field(default_factory=list)
+    # (from line, to line) arcs of branches - only measured with branch coverage.
+    executed_branches: List[Tuple[int, int]] = Field(default_factory=list)
+    missing_branches: List[Tuple[int, int]] = Field(default_factory=list)
+    percent_covered: float = 0
+    # Line -> the coverage contexts (e.g. "test_x.py::test_y|run") it ran in.
+    # Only recorded with dynamic contexts - "" is import / collection time.
+    contexts: Dict[int, List[str]] = Field(default_factory=dict)
+    # Executed branch -> the coverage contexts it was taken in.
+    branch_contexts: Dict[Tuple[int, int], List[str]] = Field(default_factory=dict)
+
+    @property
+    def statements(self) -> Set[int]:
+        return set(self.executed_lines) | set(self.missing_lines)
+
+    @property
+    def partial_branch_lines(self) -> Set[int]:
+        """Lines with a branch that was never taken."""
+        return {from_line for from_line, _ in self.missing_branches}
+
+
+class CoverageReport(BaseModel):
+    """Per-file coverage of a test run, keyed by absolute file path.
+
+    Example
+    -------
+    >>> report = CoverageReport.from_json_file(Path("coverage.json"), root=Path.cwd())
+    >>> report.for_file(module_path).missing_lines
+    [12, 13]
+    """
+
+    files: Dict[Path, FileCoverage] = Field(default_factory=dict)
+    percent_covered: float = 0
+
+    @classmethod
+    def from_json_report(cls, report: Dict[str, Any], root: Path) -> "CoverageReport":
+        """From coverage.py's JSON report - relative file names are relative to root."""
+        files: Dict[Path, FileCoverage] = {}
+        for file_name, file_data in report.get("files", {}).items():
+            file_path = Path(file_name)
+            if not file_path.is_absolute():
+                file_path = Path(root).joinpath(file_path)
+
+            files[file_path.resolve()] = FileCoverage(
+                executed_lines=file_data.get("executed_lines", []),
+                missing_lines=file_data.get("missing_lines", []),
+                excluded_lines=file_data.get("excluded_lines", []),
+                executed_branches=[
+                    tuple(branch) for branch in file_data.get("executed_branches", [])
+                ],
+                missing_branches=[
+                    tuple(branch) for branch in file_data.get("missing_branches", [])
+                ],
+                percent_covered=file_data.get("summary", {}).get("percent_covered", 0),
+            )
+
+        return cls(
+            files=files,
+            percent_covered=report.get("totals", {}).get("percent_covered", 0),
+        )
+
+    @classmethod
+    def from_json_file(cls, json_path: Path, root: Path) -> "CoverageReport":
+        """Read a JSON report - an empty report if it wasn't written."""
+        try:
+            report = json.loads(Path(json_path).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls()
+        return cls.from_json_report(report, root)
+
+    @classmethod
+    def combine(
+        cls,
+        data_files: Sequence[Path],
+        combined_data_file: Path,
+        root: Path,
+    ) -> "CoverageReport":
+        """Combine coverage data files (e.g. of parallel shards) into one report.
+
+        The combined data - with the contexts of every data file - is saved
+        to combined_data_file.
+        """
+        if not data_files:
+            return cls()
+
+        cov = coverage.Coverage(data_file=str(combined_data_file))
+        cov.combine([str(data_file) for data_file in data_files], keep=True)
+        cov.save()
+
+        json_path = Path(f"{combined_data_file}.json")
+        try:
+            cov.json_report(outfile=str(json_path))
+        except coverage.exceptions.NoDataError:
+            return cls()
+
+        try:
+            report = cls.from_json_file(json_path, root)
+        finally:
+            json_path.unlink(missing_ok=True)
+        report.add_contexts(combined_data_file)
+        return report
+
+    def for_file(self, file_path: Path) -> Optional[FileCoverage]:
+        return self.files.get(Path(file_path).resolve())
+
+    def add_contexts(self, data_file: Path) -> None:
+        """Fill in the contexts of each line (and branch) from a coverage data file."""
+        coverage_data = coverage.CoverageData(basename=str(data_file))
+        coverage_data.read()
+        for file_name in coverage_data.measured_files():
+            if file_coverage := self.for_file(Path(file_name)):
+                file_coverage.contexts = {
+                    line: sorted(line_contexts)
+                    for line, line_contexts in coverage_data.contexts_by_lineno(
+                        file_name
+                    ).items()
+                }
+
+        if coverage_data.has_arcs():
+            self._add_branch_contexts(coverage_data)
+
+    def _add_branch_contexts(self, coverage_data: coverage.CoverageData) -> None:
+        """Fill in the contexts each branch was taken in - one query per context.
+
+        coverage.py only indexes lines by context, so the arcs of each
+        context are read on their own.
+        """
+        for file_coverage in self.files.values():
+            file_coverage.branch_contexts = {}
+
+        for context in sorted(coverage_data.measured_contexts()):
+            coverage_data.set_query_contexts([f"^{re.escape(context)}$"])
+            for file_name in coverage_data.measured_files():
+                file_coverage = self.for_file(Path(file_name))
+                if not file_coverage or not file_coverage.executed_branches:
+                    continue
+                branches = set(file_coverage.executed_branches)
+                for arc in coverage_data.arcs(file_name) or []:
+                    if arc in branches:
+                        file_coverage.branch_contexts.setdefault(arc, []).append(
+                            context
+                        )
+        coverage_data.set_query_contexts(None)
+
+    def for_contexts(self, include: Callable[[str], bool]) -> "CoverageReport":
+        """The coverage of only the contexts include accepts (and import time).
+
+        Lines count as executed if they ran in an accepted context, and
+        branches if they were taken in one - others are missing.
+        """
+        files: Dict[Path, FileCoverage] = {}
+        for file_path, file_coverage in self.files.items():
+            contexts = {
+                line: [
+                    context
+                    for context in line_contexts
+                    if not context or include(context)
+                ]
+                for line, line_contexts in file_coverage.contexts.items()
+            }
+            statements = file_coverage.statements
+            executed = {line for line, kept in contexts.items() if kept} & statements
+            branch_contexts = {
+                branch: [
+                    context
+                    for context in branch_contexts
+                    if not context or include(context)
+                ]
+                for branch, branch_contexts in file_coverage.branch_contexts.items()
+            }
+            taken = {branch for branch, kept in branch_contexts.items() if kept}
+            files[file_path] = FileCoverage(
+                executed_lines=sorted(executed),
+                missing_lines=sorted(statements - executed),
+                excluded_lines=file_coverage.excluded_lines,
+                executed_branches=sorted(taken),
+                missing_branches=sorted(
+                    set(file_coverage.missing_branches)
+                    | set(file_coverage.executed_branches) - taken
+                ),
+                percent_covered=(
+                    len(executed) / len(statements) * 100 if statements else 100.0
+                ),
+                contexts={line: kept for line, kept in contexts.items() if kept},
+                branch_contexts={
+                    branch: kept for branch, kept in branch_contexts.items() if kept
+                },
+            )
+
+        executed_count = sum(len(f.executed_lines) for f in files.values())
+        statement_count = sum(len(f.statements) for f in files.values())
+        return CoverageReport(
+            files=files,
+            percent_covered=(
+                executed_count / statement_count * 100 if statement_count else 100.0
+            ),
+        )
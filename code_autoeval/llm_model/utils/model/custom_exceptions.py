@@ -41,3 +41,36 @@ class UnresolvedImportError(ImportError):
 
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class BackendError(Exception):
+    """Base class for errors talking to the backend model."""
+
+
+class BackendHTTPError(BackendError):
+    """Raised when the backend model responds with a non-200 status code."""
+
+    def __init__(self, status_code: int, content: str = ""):
+        self.status_code = status_code
+        self.content = content
+        super().__init__(f"Error: {status_code}, {content}")
+
+
+class BackendTimeoutError(BackendError):
+    """Raised when the backend model stops sending tokens mid-stream."""
+
+
+class BackendUnavailableError(BackendError):
+    """Raised when the circuit breaker stays open for longer than allowed."""
+
+
+class CassetteMissError(BackendError):
+    """Raised in replay mode when the cassette has no recording for a request."""
+
+
+class RunawayGenerationError(BackendError):
+    """Raised when a streamed generation loops or exceeds its size / time limits."""
+
+    def __init__(self, message: str, tokens: int = 0):
+        self.tokens = tokens
+        super().__init__(message)
@@ -57,6 +57,13 @@ class FunctionAttributes(BaseModel):
         None, description="Absolute path to the generated test file"
     )
 
+    @property
+    def target_id(self) -> str:
+        """Unique across the project - "module/path.py:Class.method"."""
+        if self.module_relative_path is None:
+            return self.func_name
+        return f"{Path(self.module_relative_path).as_posix()}:{self.func_name}"
+
 
 class FunctionAttributesFactory:
     @staticmethod
@@ -0,0 +1,119 @@
+"""Output budgets (num_predict / num_ctx / stop) derived from the task."""
+
+import math
+from typing import List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.backend_model_kwargs import OllamaOptions
+from code_autoeval.llm_model.utils.model.model_router import FunctionComplexity
+
+
+class GenerationBudgetPolicy(BaseModel):
+    """Size each request's output budget and context window from its target.
+
+    A function's response is its implementation echoed back plus the tests,
+    so the budget grows with the body length and the number of tests its
+    branches call for. A fixture response is a fixture plus a test file, which
+    grow with the number of methods and attributes mocked. The context window
+    is rounded up to one of num_ctx_buckets - Ollama reloads the model every
+    time num_ctx changes, so it must not vary per request.
+
+    Example
+    -------
+    >>> policy = GenerationBudgetPolicy()
+    >>> policy.for_function(FunctionComplexity(body_lines=10, branches=2), prompt)
+    {'num_predict': 984, 'num_ctx': 4096, 'stop': ['### Expected Output', ...]}
+    """
+
+    enabled: bool = Field(default=True, description="Send the derived options.")
+    chars_per_token: float = Field(
+        default=3.5, description="Estimate of prompt tokens from its length."
+    )
+
+    base_tokens: int = Field(default=384, description="Imports, headers, prose.")
+    tokens_per_body_line: int = Field(
+        default=12, description="Echoing the implementation back."
+    )
+    tokens_per_test: int = Field(default=160, description="One pytest test function.")
+    min_tests: int = Field(default=3, description="Tests expected at the least.")
+
+    fixture_base_tokens: int = Field(
+        default=384, description="Both files' imports and the fixture skeleton."
+    )
+    tokens_per_member: int = Field(
+        default=64,
+        description="Mocking one method / attribute and asserting on it.",
+    )
+
+    min_num_predict: int = 512
+    max_num_predict: int = 6144
+    num_ctx_buckets: List[int] = Field(default_factory=lambda: [4096, 8192, 16384])
+
+    function_stop: List[str] = Field(
+        default_factory=lambda: ["### Expected Output", "### Explanation"],
+        description="Sections after the tests that are thrown away anyway.",
+    )
+    fixture_stop: List[str] = Field(default_factory=list)
+
+    @property
+    def default_num_ctx(self) -> Optional[int]:
+        """num_ctx to preload with when the first request isn't known yet."""
+        return self.num_ctx_buckets[0] if self.enabled else None
+
+    def expected_tests(self, complexity: FunctionComplexity) -> int:
+        """A test per branch and per couple of params, plus the happy path."""
+        return max(
+            self.min_tests, 1 + complexity.branches + math.ceil(complexity.params / 2)
+        )
+
+    def for_function(
+        self,
+        complexity: FunctionComplexity,
+        prompt: str,
+        context_tokens: int = 0,
+    ) -> OllamaOptions:
+        """Options for a code_generator request about a function.
+
+        :param prompt: Everything sent as text (prompt and system prompt).
+        :param context_tokens: Length of a conversation context being continued.
+        """
+        num_predict = (
+            self.base_tokens
+            + self.tokens_per_body_line * complexity.body_lines
+            + self.tokens_per_test * self.expected_tests(complexity)
+        )
+        return self._options(num_predict, prompt, context_tokens, self.function_stop)
+
+    def for_fixture(
+        self, num_methods: int, num_attributes: int, prompt: str
+    ) -> OllamaOptions:
+        """Options for a FixtureGenerator fixture + test file request."""
+        num_predict = self.fixture_base_tokens + self.tokens_per_member * (
+            num_methods + num_attributes
+        )
+        return self._options(num_predict, prompt, 0, self.fixture_stop)
+
+    def _options(
+        self,
+        num_predict: int,
+        prompt: str,
+        context_tokens: int,
+        stop: Sequence[str],
+    ) -> OllamaOptions:
+        if not self.enabled:
+            return OllamaOptions()
+
+        num_predict = min(max(num_predict, self.min_num_predict), self.max_num_predict)
+        needed_tokens = (
+            math.ceil(len(prompt) / self.chars_per_token) + context_tokens + num_predict
+        )
+        num_ctx = next(
+            (bucket for bucket in self.num_ctx_buckets if bucket >= needed_tokens),
+            self.num_ctx_buckets[-1],
+        )
+
+        options = OllamaOptions(num_predict=num_predict, num_ctx=num_ctx)
+        if stop:
+            options["stop"] = list(stop)
+        return options
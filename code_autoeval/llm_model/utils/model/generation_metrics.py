@@ -0,0 +1,128 @@
+"""Data Models for the backend model generation metrics."""
+
+from typing import Any, Dict
+
+from pydantic import BaseModel, Field, computed_field
+
+NANOSECONDS = 1e9
+
+
+class GenerationMetrics(BaseModel):
+    """Metrics for a single backend model call.
+
+    The *_count / *_duration fields come from the Ollama `done` chunk
+    (durations in nanoseconds). The timings in seconds are measured locally.
+    """
+
+    prompt_eval_count: int = Field(default=0, description="Prompt tokens processed.")
+    prompt_eval_duration: int = Field(default=0, description="Prefill time (ns).")
+    eval_count: int = Field(default=0, description="Tokens generated.")
+    eval_duration: int = Field(default=0, description="Decode time (ns).")
+    load_duration: int = Field(default=0, description="Model load time (ns).")
+    total_duration: int = Field(default=0, description="Server-side total (ns).")
+
+    time_to_first_token: float = Field(
+        default=0, description="Seconds until the first token was received."
+    )
+    wall_time: float = Field(
+        default=0, description="Seconds from sending the request to the last token."
+    )
+    cached: bool = Field(
+        default=False, description="True if the response came from the cache."
+    )
+    coalesced: bool = Field(
+        default=False,
+        description="True if the response was shared from an identical request in flight.",
+    )
+
+    @computed_field
+    def tokens_per_second(self) -> float:
+        """Decode speed reported by the server."""
+        if not self.eval_duration:
+            return 0.0
+        return self.eval_count / (self.eval_duration / NANOSECONDS)
+
+    @computed_field
+    def prompt_tokens_per_second(self) -> float:
+        """Prefill speed reported by the server."""
+        if not self.prompt_eval_duration:
+            return 0.0
+        return self.prompt_eval_count / (self.prompt_eval_duration / NANOSECONDS)
+
+    @classmethod
+    def from_done_chunk(
+        cls,
+        chunk: Dict[str, Any],
+        time_to_first_token: float = 0,
+        wall_time: float = 0,
+    ) -> "GenerationMetrics":
+        """Create the metrics from the final (`done`) chunk of the stream."""
+        return cls(
+            **{
+                key: chunk.get(key) or 0
+                for key in (
+                    "prompt_eval_count",
+                    "prompt_eval_duration",
+                    "eval_count",
+                    "eval_duration",
+                    "load_duration",
+                    "total_duration",
+                )
+            },
+            time_to_first_token=time_to_first_token,
+            wall_time=wall_time,
+        )
+
+
+class GenerationMetricsSummary(BaseModel):
+    """Aggregate of the GenerationMetrics for every call in a job."""
+
+    requests: int = 0
+    cached_requests: int = 0
+    coalesced_requests: int = 0
+    prompt_eval_count: int = 0
+    prompt_eval_seconds: float = 0
+    eval_count: int = 0
+    eval_seconds: float = 0
+    load_seconds: float = 0
+    time_to_first_token_seconds: float = 0
+    wall_time_seconds: float = 0
+
+    def add(self, metrics: GenerationMetrics) -> "GenerationMetricsSummary":
+        """Add the metrics of a single call to the summary."""
+        self.requests += 1
+        self.cached_requests += int(metrics.cached)
+        self.coalesced_requests += int(metrics.coalesced)
+        self.prompt_eval_count += metrics.prompt_eval_count
+        self.prompt_eval_seconds += metrics.prompt_eval_duration / NANOSECONDS
+        self.eval_count += metrics.eval_count
+        self.eval_seconds += metrics.eval_duration / NANOSECONDS
+        self.load_seconds += metrics.load_duration / NANOSECONDS
+        self.time_to_first_token_seconds += metrics.time_to_first_token
+        self.wall_time_seconds += metrics.wall_time
+
+        return self
+
+    @computed_field
+    def tokens_per_second(self) -> float:
+        """Average decode speed across the job."""
+        return self.eval_count / self.eval_seconds if self.eval_seconds else 0.0
+
+    def print_summary(self) -> "GenerationMetricsSummary":
+        """Print where the time in the backend model calls went."""
+        print(
+            f"LLM requests: {self.requests} ({self.cached_requests} cached, "
+            f"{self.coalesced_requests} coalesced)"
+        )
+        print(
+            f"Prompt prefill: {self.prompt_eval_count} tokens in {self.prompt_eval_seconds:.2f}s"
+        )
+        print(
+            f"Decode: {self.eval_count} tokens in {self.eval_seconds:.2f}s "
+            f"({self.tokens_per_second:.1f} tokens/s)"
+        )
+        print(f"Model load: {self.load_seconds:.2f}s")
+        print(f"Time to first token (total): {self.time_to_first_token_seconds:.2f}s")
+        print(f"LLM wall time (total): {self.wall_time_seconds:.2f}s")
+
+        return self
@@ -0,0 +1,153 @@
+"""Route each function to a cheap or a large backend model."""
+
+import ast
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field, computed_field
+
+from code_autoeval.llm_model.utils.model.function_attributes import FunctionAttributes
+
+# Nodes that add a path through the function.
+BRANCH_NODES = (
+    ast.If,
+    ast.IfExp,
+    ast.For,
+    ast.AsyncFor,
+    ast.While,
+    ast.Try,
+    ast.ExceptHandler,
+    ast.With,
+    ast.AsyncWith,
+    ast.BoolOp,
+    ast.comprehension,
+    ast.Match,
+)
+
+
+class FunctionComplexity(BaseModel):
+    """Rough measure of how hard a function is to implement and cover."""
+
+    body_lines: int = 0
+    branches: int = 0
+    params: int = 0
+    is_coroutine: bool = False
+
+    @computed_field
+    def score(self) -> int:
+        """Lines + 3 per branch + 1 per param, +5 for async."""
+        return (
+            self.body_lines
+            + 3 * self.branches
+            + self.params
+            + (5 if self.is_coroutine else 0)
+        )
+
+    @classmethod
+    def from_function_attributes(
+        cls, function_attributes: FunctionAttributes
+    ) -> "FunctionComplexity":
+        body = function_attributes.function_body
+        try:
+            branches = sum(
+                isinstance(node, BRANCH_NODES) for node in ast.walk(ast.parse(body))
+            )
+        except SyntaxError:
+            branches = 0
+
+        return cls(
+            body_lines=sum(
+                1
+                for line in body.splitlines()
+                if line.strip() and not line.strip().startswith("#")
+            ),
+            branches=branches,
+            params=len(
+                [
+                    name
+                    for name in function_attributes.function_params
+                    if name not in ("self", "cls")
+                ]
+            ),
+            is_coroutine=function_attributes.is_coroutine,
+        )
+
+
+class ModelTier(BaseModel):
+    """A backend model and the functions it's trusted with."""
+
+    model_name: str
+    max_body_lines: Optional[int] = Field(
+        default=None, description="Skip this tier for longer function bodies."
+    )
+    max_complexity: Optional[int] = Field(
+        default=None, description="Skip this tier above this complexity score."
+    )
+    max_failed_attempts: int = Field(
+        default=1, description="Escalate to the next tier after this many failures."
+    )
+
+    def accepts(self, complexity: FunctionComplexity) -> bool:
+        return (
+            self.max_body_lines is None or complexity.body_lines <= self.max_body_lines
+        ) and (self.max_complexity is None or complexity.score <= self.max_complexity)
+
+
+class ModelRouter(BaseModel):
+    """Start each function on the cheapest suitable model, escalate on failures.
+
+    Tiers are ordered cheapest first. A function starts on the first tier that
+    accepts its complexity, stays there for max_failed_attempts attempts, then
+    moves up a tier. The last tier takes every remaining attempt. Without
+    tiers, every request uses the default llm_model_name.
+
+    Example
+    -------
+    >>> router = ModelRouter(
+    ...     tiers=[
+    ...         ModelTier(model_name="coder-lite:latest", max_body_lines=25),
+    ...         ModelTier(model_name="coder-large:latest"),
+    ...     ]
+    ... )
+    >>> client = LLMModelClient(model_router=router)
+    """
+
+    tiers: List[ModelTier] = Field(default_factory=list)
+    # func_name -> model_name of the tier that reached full coverage.
+    successful_tiers: Dict[str, str] = Field(default_factory=dict)
+
+    def tier_for_attempt(
+        self, complexity: FunctionComplexity, failed_attempts: int
+    ) -> Optional[ModelTier]:
+        """Return the tier to use after failed_attempts, None without tiers."""
+        if not self.tiers:
+            return None
+
+        start = next(
+            (
+                index
+                for index, tier in enumerate(self.tiers)
+                if tier.accepts(complexity)
+            ),
+            len(self.tiers) - 1,
+        )
+        for tier in self.tiers[start:-1]:
+            if failed_attempts < tier.max_failed_attempts:
+                return tier
+            failed_attempts -= tier.max_failed_attempts
+
+        return self.tiers[-1]
+
+    def record_success(self, func_name: str, tier: Optional[ModelTier]) -> None:
+        if tier:
+            self.successful_tiers[func_name] = tier.model_name
+
+    def print_summary(self) -> "ModelRouter":
+        """Print how many functions each tier completed."""
+        for tier in self.tiers:
+            completed = sum(
+                model_name == tier.model_name
+                for model_name in self.successful_tiers.values()
+            )
+            print(f"Model tier {tier.model_name}: {completed} functions completed")
+
+        return self
@@ -0,0 +1,26 @@
+"""Data Models for the result of a pytest run."""
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.coverage_report import CoverageReport
+
+
+class PytestRunResult(BaseModel):
+    """Outcome of running one test file with coverage.
+
+    output holds the pytest console output followed by the coverage
+    report in the same format as --cov-report=term-missing.
+    """
+
+    exit_code: int = Field(default=0, description="pytest.main's exit code.")
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0
+    skipped: int = 0
+    duration: float = Field(default=0, description="Seconds the run took.")
+    output: str = ""
+    coverage: CoverageReport = Field(default_factory=CoverageReport)
+
+    @property
+    def tests_failed(self) -> bool:
+        return self.exit_code != 0
@@ -0,0 +1,66 @@
+"""Data Models for a pytest session over several test files."""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, Set
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.coverage_report import CoverageReport
+
+
+class PytestSessionResult(BaseModel):
+    """Outcome of one pytest session, with each test's coverage in its own context.
+
+    Failed files and durations are keyed by the pytest node path - the test
+    file's path relative to pytest's rootdir.
+    """
+
+    coverage_result: subprocess.CompletedProcess
+    coverage_report: CoverageReport = Field(default_factory=CoverageReport)
+    failed_files: Set[str] = Field(default_factory=set)
+    file_durations: Dict[str, float] = Field(default_factory=dict)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def session_failed(self) -> bool:
+        """pytest stopped early - 0 is all passed and 1 is some tests failed."""
+        return self.coverage_result.returncode not in (0, 1)
+
+    @staticmethod
+    def is_in_test_file(test_file_path: Path, node_id: str) -> bool:
+        """True if the node id (or a coverage context) belongs to test_file_path."""
+        node_path = node_id.split("::", 1)[0]
+        return bool(node_path) and (
+            Path(test_file_path).as_posix() == node_path
+            or Path(test_file_path).resolve().as_posix().endswith(f"/{node_path}")
+        )
+
+    def tests_failed(self, test_file_path: Path) -> bool:
+        return self.session_failed or any(
+            self.is_in_test_file(test_file_path, failed_file)
+            for failed_file in self.failed_files
+        )
+
+    def coverage_of(self, test_file_path: Path) -> CoverageReport:
+        """The coverage of only the tests in test_file_path (and import time)."""
+        return self.coverage_report.for_contexts(
+            lambda context: self.is_in_test_file(test_file_path, context)
+        )
+
+    def ran_tests(self, test_file_path: Path) -> bool:
+        """True if tests of test_file_path ran - so duration_of is its real time."""
+        return any(
+            self.is_in_test_file(test_file_path, node_path)
+            for node_path in self.file_durations
+        )
+
+    def duration_of(self, test_file_path: Path) -> float:
+        """Seconds the tests in test_file_path took."""
+        return sum(
+            duration
+            for node_path, duration in self.file_durations.items()
+            if self.is_in_test_file(test_file_path, node_path)
+        )
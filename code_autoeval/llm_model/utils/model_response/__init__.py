@@ -1,4 +1,49 @@
-from code_autoeval.llm_model.utils.model_response.serialize_dataframes import SerializeDataframes
+from code_autoeval.llm_model.utils.model_response.cassette import (
+    Cassette,
+    CassetteConfig,
+)
+from code_autoeval.llm_model.utils.model_response.endpoint_pool import (
+    EndpointPool,
+    EndpointPoolConfig,
+    EndpointStats,
+)
+from code_autoeval.llm_model.utils.model_response.generation_guard import (
+    GenerationGuard,
+    GenerationGuardConfig,
+)
+from code_autoeval.llm_model.utils.model_response.http_client_pool import (
+    HttpClientConfig,
+    HttpClientPool,
+)
+from code_autoeval.llm_model.utils.model_response.model_warmup import (
+    KeepAlivePolicy,
+    ModelReadiness,
+)
+from code_autoeval.llm_model.utils.model_response.response_cache import (
+    ResponseCache,
+    ResponseCacheConfig,
+)
+from code_autoeval.llm_model.utils.model_response.serialize_dataframes import (
+    SerializeDataframes,
+)
+from code_autoeval.llm_model.utils.model_response.singleflight import SingleFlight
 from code_autoeval.llm_model.utils.model_response.stream_response import StreamResponse
 
-__all__ = ["SerializeDataframes", "StreamResponse"]
+__all__ = [
+    "Cassette",
+    "CassetteConfig",
+    "EndpointPool",
+    "EndpointPoolConfig",
+    "EndpointStats",
+    "GenerationGuard",
+    "GenerationGuardConfig",
+    "HttpClientConfig",
+    "HttpClientPool",
+    "KeepAlivePolicy",
+    "ModelReadiness",
+    "ResponseCache",
+    "ResponseCacheConfig",
+    "SerializeDataframes",
+    "SingleFlight",
+    "StreamResponse",
+]
@@ -0,0 +1,175 @@
+"""Retry with backoff and a circuit breaker around the backend model."""
+
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.custom_exceptions import (
+    BackendHTTPError,
+    BackendTimeoutError,
+    BackendUnavailableError,
+)
+
+T = TypeVar("T")
+
+
+class RetryPolicy(BaseModel):
+    """Jittered exponential backoff for transient backend errors."""
+
+    max_attempts: int = Field(default=4, description="Total attempts per request.")
+    base_delay: float = Field(default=0.5, description="Delay before the 1st retry.")
+    max_delay: float = Field(default=30.0, description="Upper bound on the delay.")
+
+    def compute_delay(self, attempt: int) -> float:
+        """Full jitter: a random delay up to base_delay * 2 ** (attempt - 1)."""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+    @staticmethod
+    def is_retryable(exception: BaseException) -> bool:
+        """Connection errors, timeouts, 429 and 5xx responses are retryable."""
+        if isinstance(exception, BackendHTTPError):
+            return exception.status_code == 429 or exception.status_code >= 500
+        return isinstance(exception, (httpx.TransportError, BackendTimeoutError))
+
+
+class CircuitBreaker:
+    """Pause every caller while the backend is down instead of hammering it.
+
+    After failure_threshold consecutive failures the circuit opens and callers
+    wait in before_request(). Once recovery_timeout has passed a single probe
+    request is let through (half-open); its success closes the circuit, its
+    failure re-opens it. Callers waiting longer than max_wait give up with
+    BackendUnavailableError.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        max_wait: Optional[float] = 600.0,
+        poll_interval: float = 0.5,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+
+        self.state: str = self.CLOSED
+        self.consecutive_failures: int = 0
+        self._opened_at: float = 0.0
+
+    async def before_request(self) -> None:
+        """Wait until the circuit lets a request through."""
+        start_time = time.monotonic()
+        announced = False
+
+        while True:
+            if self.state == self.CLOSED:
+                return
+
+            if self.state == self.OPEN:
+                remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+                if remaining <= 0:
+                    # This caller becomes the probe.
+                    self.state = self.HALF_OPEN
+                    return
+            else:
+                remaining = self.poll_interval
+
+            if (
+                self.max_wait is not None
+                and time.monotonic() - start_time > self.max_wait
+            ):
+                raise BackendUnavailableError(
+                    f"Backend model unavailable for more than {self.max_wait}s"
+                )
+
+            if not announced:
+                print(f"Backend model circuit is {self.state} - pausing requests.")
+                announced = True
+
+            await asyncio.sleep(min(remaining, self.poll_interval))
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != self.OPEN:
+                print(
+                    f"Opening backend model circuit after {self.consecutive_failures} failures."
+                )
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Let the next caller probe if the probe was cancelled before finishing."""
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic() - self.recovery_timeout
+
+
+class BackendResilience:
+    """Run backend requests through the circuit breaker with retries.
+
+    Example
+    -------
+    >>> resilience = BackendResilience(RetryPolicy(max_attempts=3))
+    >>> result = await resilience.call(lambda: stream_response.ask_backend_model(prompt))
+    """
+
+    def __init__(
+        self,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.circuit_breaker: CircuitBreaker = circuit_breaker or CircuitBreaker()
+
+    async def call(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Await request(), retrying transient errors with jittered backoff."""
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.circuit_breaker.before_request()
+
+            try:
+                result = await request()
+            except asyncio.CancelledError:
+                self.circuit_breaker.release_probe()
+                raise
+            except Exception as e:
+                if not self.retry_policy.is_retryable(e):
+                    # The backend answered - it's the request / response that was bad.
+                    self.circuit_breaker.record_success()
+                    raise
+
+                self.circuit_breaker.record_failure()
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+
+                delay = self.retry_policy.compute_delay(attempt)
+                print(
+                    f"Backend request failed ({type(e).__name__}: {e}) - "
+                    f"retry {attempt}/{self.retry_policy.max_attempts - 1} in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.circuit_breaker.record_success()
+            return result
@@ -0,0 +1,174 @@
+"""Record / replay the streamed backend model traffic to a cassette file."""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.custom_exceptions import (
+    BackendHTTPError,
+    BackendTimeoutError,
+    CassetteMissError,
+)
+
+# Payload keys that don't change what the model generates.
+VOLATILE_PAYLOAD_KEYS = ("keep_alive", "stream")
+
+
+class CassetteConfig(BaseModel):
+    """Settings for recording / replaying the backend model traffic."""
+
+    mode: str = Field(default="off", description="'off', 'record' or 'replay'.")
+    cassette_path: Optional[Path] = Field(
+        default=None,
+        description="Defaults to <generated_code_logs>/llm_cassettes/cassette.jsonl.",
+    )
+    replay_speed: float = Field(
+        default=0.0,
+        description="0 replays instantly, 1.0 in real time, >1 that many times faster.",
+    )
+
+
+class CassetteInteraction(BaseModel):
+    """One request and the chunks streamed back, with their arrival offsets."""
+
+    key: str
+    payload: Dict[str, Any]
+    status_code: int = 200
+    error: Optional[str] = None
+    timed_out: bool = False
+    # The client stopped reading before the stream ended.
+    aborted: bool = False
+    # (seconds since the request was sent, decoded chunk)
+    chunks: List[Tuple[float, Dict[str, Any]]] = Field(default_factory=list)
+
+    def add_chunk(self, chunk: Dict[str, Any], start_time: float) -> None:
+        self.chunks.append((time.perf_counter() - start_time, chunk))
+
+
+class Cassette:
+    """Record every streamed generation, or serve them back without a backend.
+
+    In record mode each request is appended to a JSONL cassette together with
+    every decoded chunk and the time it arrived. In replay mode requests are
+    matched by a hash of their payload and the recorded chunks are yielded
+    again - instantly, in real time, or sped up by replay_speed. Identical
+    requests are replayed in the order they were recorded (so recorded 503s
+    followed by a retry replay the same way), repeating the last recording
+    once they run out.
+
+    Example
+    -------
+    >>> client = LLMModelClient(
+    ...     cassette=Cassette(CassetteConfig(mode="replay", replay_speed=1.0))
+    ... )
+    """
+
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+    def __init__(self, config: Optional[CassetteConfig] = None):
+        self.config: CassetteConfig = config or CassetteConfig()
+        if self.config.mode not in (self.OFF, self.RECORD, self.REPLAY):
+            raise ValueError(f"Unknown cassette mode: {self.config.mode}")
+
+        self._interactions: Optional[Dict[str, List[CassetteInteraction]]] = None
+        self._replay_counts: Dict[str, int] = defaultdict(int)
+
+    @property
+    def recording(self) -> bool:
+        return self.config.mode == self.RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.config.mode == self.REPLAY
+
+    def bind_base_dir(self, base_log_dir: Path) -> None:
+        """Default the cassette to live under the generated logs dir."""
+        if self.config.cassette_path is None:
+            self.config.cassette_path = Path(base_log_dir).joinpath(
+                "llm_cassettes", "cassette.jsonl"
+            )
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """Hash the parts of the payload that determine the generation."""
+        key_data = json.dumps(
+            {k: v for k, v in payload.items() if k not in VOLATILE_PAYLOAD_KEYS},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def start_recording(self, payload: Dict[str, Any]) -> CassetteInteraction:
+        return CassetteInteraction(key=self.make_key(payload), payload=payload)
+
+    def save(self, interaction: CassetteInteraction) -> None:
+        """Append the interaction to the cassette as a single JSON line."""
+        path = self.config.cassette_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(interaction.model_dump_json() + "\n")
+
+    def _load(self) -> Dict[str, List[CassetteInteraction]]:
+        if self._interactions is None:
+            self._interactions = defaultdict(list)
+            path = self.config.cassette_path
+            if path and path.exists():
+                with open(path) as f:
+                    for line in f:
+                        if line.strip():
+                            interaction = CassetteInteraction.model_validate_json(line)
+                            self._interactions[interaction.key].append(interaction)
+
+        return self._interactions
+
+    def _next_interaction(self, payload: Dict[str, Any]) -> CassetteInteraction:
+        key = self.make_key(payload)
+        if not (recorded := self._load().get(key)):
+            raise CassetteMissError(
+                f"No recording in {self.config.cassette_path} for request {key[:12]}"
+            )
+
+        index = min(self._replay_counts[key], len(recorded) - 1)
+        self._replay_counts[key] += 1
+        return recorded[index]
+
+    async def replay(self, payload: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the recorded chunks for this payload, re-raising recorded errors.
+
+        Raises:
+        CassetteMissError: If nothing was recorded for the payload.
+        BackendHTTPError: If the recorded response was not a 200.
+        BackendTimeoutError: If the recorded stream timed out.
+        CassetteMissError: If reading past the end of a stream the client cut off.
+        """
+        interaction = self._next_interaction(payload)
+        start_time = time.perf_counter()
+
+        for offset, chunk in interaction.chunks:
+            await self._wait_until(start_time, offset)
+            yield chunk
+
+        if interaction.status_code != 200:
+            raise BackendHTTPError(interaction.status_code, interaction.error or "")
+        if interaction.timed_out:
+            raise BackendTimeoutError(interaction.error or "Recorded stream timed out")
+        if interaction.aborted:
+            raise CassetteMissError(
+                f"Recording {interaction.key[:12]} was cut off by the client"
+            )
+
+    async def _wait_until(self, start_time: float, offset: float) -> None:
+        if self.config.replay_speed <= 0:
+            return
+
+        delay = start_time + offset / self.config.replay_speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
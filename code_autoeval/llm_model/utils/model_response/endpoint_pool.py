@@ -0,0 +1,172 @@
+"""Route backend model requests across several inference servers."""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class EndpointPoolConfig(BaseModel):
+    """Settings for routing, ejection and hedging across endpoints."""
+
+    failure_threshold: int = Field(
+        default=3, description="Consecutive failures before ejecting an endpoint."
+    )
+    ejection_seconds: float = Field(
+        default=30.0, description="How long an ejected endpoint gets no requests."
+    )
+    latency_alpha: float = Field(
+        default=0.3, description="Weight of the newest sample in the latency EWMA."
+    )
+    hedge: bool = Field(
+        default=False,
+        description="Duplicate slow requests to a second endpoint (costs capacity).",
+    )
+    hedge_percentile: float = Field(
+        default=95.0,
+        description="Hedge once no token arrived within this TTFT percentile.",
+    )
+    hedge_min_samples: int = Field(
+        default=20, description="TTFT samples needed before hedging starts."
+    )
+    hedge_min_delay: float = Field(
+        default=0.5, description="Never hedge sooner than this (seconds)."
+    )
+    latency_window: int = Field(
+        default=200, description="Recent TTFT samples kept for the percentile."
+    )
+
+
+class EndpointStats(BaseModel):
+    """Load and health of a single endpoint."""
+
+    url: str
+    in_flight: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    # Exponentially weighted time to first token, None until measured.
+    latency: Optional[float] = None
+    ejected_until: float = 0.0
+
+    def is_healthy(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) >= self.ejected_until
+
+
+class EndpointPool:
+    """Pick the endpoint expected to answer first, and eject failing ones.
+
+    Each endpoint is scored by (in_flight + 1) * latency - roughly how long a
+    new request would wait behind the outstanding ones. Endpoints without a
+    latency sample yet borrow the best known one, so they get tried early, and
+    each consecutive failure multiplies the score so retries move elsewhere.
+    After failure_threshold consecutive failures an endpoint is ejected for
+    ejection_seconds; if every endpoint is ejected, the one coming back first
+    is used.
+
+    Example
+    -------
+    >>> pool = EndpointPool()
+    >>> pool.set_endpoints(["http://gpu-1:11434", "http://gpu-2:11434"])
+    >>> url = pool.acquire()
+    >>> pool.release(url, time_to_first_token=0.8)
+    """
+
+    def __init__(self, config: Optional[EndpointPoolConfig] = None):
+        self.config: EndpointPoolConfig = config or EndpointPoolConfig()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self._recent_latencies: Deque[float] = deque(maxlen=self.config.latency_window)
+
+    @property
+    def stats(self) -> List[EndpointStats]:
+        return list(self.endpoints.values())
+
+    def set_endpoints(self, urls: Iterable[str]) -> None:
+        """Track exactly these endpoints, keeping the stats of known ones."""
+        urls = list(urls)
+        self.endpoints = {
+            url: self.endpoints.get(url) or EndpointStats(url=url) for url in urls
+        }
+
+    def healthy_endpoints(self, exclude: Iterable[str] = ()) -> List[EndpointStats]:
+        now = time.monotonic()
+        exclude = set(exclude)
+        return [
+            endpoint
+            for endpoint in self.endpoints.values()
+            if endpoint.url not in exclude and endpoint.is_healthy(now)
+        ]
+
+    def acquire(self, exclude: Iterable[str] = ()) -> str:
+        """Choose an endpoint for a new request and count it as in flight."""
+        exclude = set(exclude)
+        if candidates := self.healthy_endpoints(exclude):
+            known_latencies = [e.latency for e in candidates if e.latency is not None]
+            default_latency = min(known_latencies, default=1.0)
+            endpoint = min(
+                candidates,
+                key=lambda e: (
+                    (e.in_flight + 1)
+                    * (e.latency or default_latency)
+                    * (e.consecutive_failures + 1),
+                    e.in_flight,
+                ),
+            )
+        else:
+            endpoint = min(
+                (e for e in self.endpoints.values() if e.url not in exclude),
+                key=lambda e: e.ejected_until,
+                default=None,
+            ) or min(self.endpoints.values(), key=lambda e: e.ejected_until)
+
+        endpoint.in_flight += 1
+        endpoint.requests += 1
+        return endpoint.url
+
+    def release(
+        self,
+        url: str,
+        time_to_first_token: Optional[float] = None,
+        failed: bool = False,
+    ) -> None:
+        """Finish a request - record its latency, or the failure."""
+        if not (endpoint := self.endpoints.get(url)):
+            return
+
+        endpoint.in_flight = max(endpoint.in_flight - 1, 0)
+
+        if failed:
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.config.failure_threshold:
+                if endpoint.is_healthy():
+                    print(
+                        f"Ejecting endpoint {url} for {self.config.ejection_seconds}s "
+                        f"after {endpoint.consecutive_failures} failures."
+                    )
+                endpoint.ejected_until = time.monotonic() + self.config.ejection_seconds
+            return
+
+        endpoint.consecutive_failures = 0
+        endpoint.ejected_until = 0.0
+        if time_to_first_token:
+            alpha = self.config.latency_alpha
+            endpoint.latency = (
+                time_to_first_token
+                if endpoint.latency is None
+                else alpha * time_to_first_token + (1 - alpha) * endpoint.latency
+            )
+            self._recent_latencies.append(time_to_first_token)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait for a first token before hedging, None to not hedge."""
+        config = self.config
+        if not config.hedge or len(self._recent_latencies) < config.hedge_min_samples:
+            return None
+
+        latencies = sorted(self._recent_latencies)
+        index = min(
+            int(len(latencies) * config.hedge_percentile / 100), len(latencies) - 1
+        )
+        return max(latencies[index], config.hedge_min_delay)
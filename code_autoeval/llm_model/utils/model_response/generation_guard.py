@@ -0,0 +1,131 @@
+"""Abort degenerate (looping / runaway) generations while they stream."""
+
+import time
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.custom_exceptions import (
+    RunawayGenerationError,
+)
+
+
+class GenerationGuardConfig(BaseModel):
+    """Limits for a single streamed generation. None disables a limit."""
+
+    max_response_chars: Optional[int] = Field(
+        default=60_000, description="Abort once the response grows past this."
+    )
+    max_tokens: Optional[int] = Field(
+        default=16_000, description="Abort after this many streamed tokens."
+    )
+    max_wall_time: Optional[float] = Field(
+        default=900.0, description="Abort responses streaming for longer (seconds)."
+    )
+    max_line_chars: Optional[int] = Field(
+        default=4_000, description="Abort on a single line longer than this."
+    )
+    min_repeats: int = Field(
+        default=4, description="Consecutive repeats of a block of lines that trip."
+    )
+    max_repeat_period: int = Field(
+        default=40, description="Longest block of lines checked for repeats."
+    )
+    min_repeated_chars: int = Field(
+        default=200,
+        description="Ignore repeats covering fewer characters (e.g. blank lines).",
+    )
+
+
+class GenerationGuard:
+    """Check every streamed token of one generation against the limits.
+
+    Besides the size / time caps, each completed line is compared with the
+    preceding ones: if the last `min_repeats * period` lines are the same
+    block of `period` lines over and over (period 1 .. max_repeat_period),
+    the model is looping and the generation is aborted.
+
+    Example
+    -------
+    >>> guard = GenerationGuard(GenerationGuardConfig(max_tokens=2))
+    >>> guard.check("def ")
+    >>> guard.check("foo")
+    >>> guard.check("():")
+    Traceback (most recent call last):
+    RunawayGenerationError: Aborted generation after 3 tokens (max_tokens=2)
+    """
+
+    def __init__(self, config: Optional[GenerationGuardConfig] = None):
+        self.config: GenerationGuardConfig = config or GenerationGuardConfig()
+        self.start_time: float = time.perf_counter()
+        self.tokens: int = 0
+        self.chars: int = 0
+        self.lines: List[str] = []
+        self._current_line: List[str] = []
+        self._current_line_chars: int = 0
+
+    def check(self, token: str) -> None:
+        """Account for the next token, raising RunawayGenerationError on a trip."""
+        config = self.config
+        self.tokens += 1
+        self.chars += len(token)
+
+        if config.max_tokens is not None and self.tokens > config.max_tokens:
+            self._trip(f"{self.tokens} tokens (max_tokens={config.max_tokens})")
+        if config.max_response_chars is not None and (
+            self.chars > config.max_response_chars
+        ):
+            self._trip(
+                f"{self.chars} characters (max_response_chars={config.max_response_chars})"
+            )
+        if config.max_wall_time is not None:
+            elapsed = time.perf_counter() - self.start_time
+            if elapsed > config.max_wall_time:
+                self._trip(f"{elapsed:.0f}s (max_wall_time={config.max_wall_time})")
+
+        *completed, remainder = token.split("\n")
+        for part in completed:
+            self._current_line.append(part)
+            self._add_line("".join(self._current_line))
+            self._current_line = []
+            self._current_line_chars = 0
+
+        self._current_line.append(remainder)
+        self._current_line_chars += len(remainder)
+        if config.max_line_chars is not None and (
+            self._current_line_chars > config.max_line_chars
+        ):
+            self._trip(
+                f"a {self._current_line_chars} character line "
+                f"(max_line_chars={config.max_line_chars})"
+            )
+
+    def _add_line(self, line: str) -> None:
+        self.lines.append(line.rstrip())
+        if period := self._repeating_period():
+            self._trip(
+                f"the last {period} line(s) repeated {self.config.min_repeats} times"
+            )
+
+    def _repeating_period(self) -> int:
+        """Return the length of a block of lines repeated at the end, else 0."""
+        lines = self.lines
+        min_repeats = self.config.min_repeats
+
+        for period in range(1, self.config.max_repeat_period + 1):
+            span = period * min_repeats
+            if span > len(lines):
+                break
+            if all(
+                lines[-i] == lines[-i - period] for i in range(1, span - period + 1)
+            ):
+                block_chars = sum(len(line.strip()) for line in lines[-period:])
+                if block_chars * min_repeats >= self.config.min_repeated_chars:
+                    return period
+
+        return 0
+
+    def _trip(self, reason: str) -> None:
+        raise RunawayGenerationError(
+            f"Aborted generation after {reason}", tokens=self.tokens
+        )
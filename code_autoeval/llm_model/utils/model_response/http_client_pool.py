@@ -0,0 +1,100 @@
+"""Shared, long-lived HTTP client for the backend model."""
+
+import asyncio
+import importlib.util
+from typing import Optional
+
+import httpx
+from pydantic import BaseModel, Field
+
+
+class HttpClientConfig(BaseModel):
+    """Connection pool settings for the backend model client."""
+
+    max_connections: int = Field(
+        default=10, description="Maximum number of concurrent connections."
+    )
+    max_keepalive_connections: int = Field(
+        default=5, description="Maximum number of idle connections kept alive."
+    )
+    keepalive_expiry: float = Field(
+        default=30.0, description="Seconds an idle connection is kept alive."
+    )
+    http2: bool = Field(
+        default=False, description="Use HTTP/2 if the h2 package is installed."
+    )
+    timeout: float = Field(default=60.0, description="Default write / pool timeout.")
+    connect_timeout: float = Field(
+        default=10.0, description="Seconds to establish a connection."
+    )
+    read_timeout: float = Field(
+        default=300.0,
+        description="Seconds to wait for a read - including prefill before the first token.",
+    )
+    idle_timeout: Optional[float] = Field(
+        default=60.0,
+        description="Seconds allowed between chunks once tokens are streaming.",
+    )
+
+
+class HttpClientPool:
+    """Own a single httpx.AsyncClient that is reused across requests.
+
+    The client is created lazily on first use. httpx binds its connections to
+    the running event loop, so if a new loop is detected (e.g. after an
+    asyncio.run call) a fresh client is created for it.
+    """
+
+    def __init__(self, config: Optional[HttpClientConfig] = None):
+        self.config: HttpClientConfig = config or HttpClientConfig()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        """Return the shared client, creating it for the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = self._create_client()
+            self._loop = loop
+
+        return self._client
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        """The connect / read / write / pool timeouts for a request."""
+        return httpx.Timeout(
+            self.config.timeout,
+            connect=self.config.connect_timeout,
+            read=self.config.read_timeout,
+        )
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the client from the pool configuration."""
+        http2 = self.config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            print(
+                "HTTP/2 requested but the h2 package is not installed - using HTTP/1.1"
+            )
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.config.max_connections,
+                max_keepalive_connections=self.config.max_keepalive_connections,
+                keepalive_expiry=self.config.keepalive_expiry,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """Close the shared client, if it was created on the running loop."""
+        client, loop = self._client, self._loop
+        self._client = None
+        self._loop = None
+
+        if client is None or client.is_closed:
+            return
+
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
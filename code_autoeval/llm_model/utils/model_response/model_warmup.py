@@ -0,0 +1,69 @@
+"""Keep-alive policy and readiness of the backend model."""
+
+from typing import Optional, Union
+
+from pydantic import BaseModel, Field
+
+from code_autoeval.llm_model.utils.model.generation_metrics import NANOSECONDS
+
+
+class KeepAlivePolicy(BaseModel):
+    """How long the backend keeps the model loaded after each request.
+
+    Values are Ollama keep_alive durations ("10m", "1h", -1 = forever, 0 =
+    unload right away). A batch (StreamResponse.batch()) switches to
+    batch_keep_alive, so the model survives slow local steps such as pytest
+    runs between requests, and can unload it at the end.
+    """
+
+    keep_alive: Union[str, int] = Field(
+        default="10m", description="keep_alive sent outside of a batch."
+    )
+    batch_keep_alive: Union[str, int] = Field(
+        default="1h", description="keep_alive sent while a batch is running."
+    )
+    unload_after_batch: bool = Field(
+        default=False, description="Unload the model once the last batch ends."
+    )
+    preload_on_enter: bool = Field(
+        default=True,
+        description="Start loading the model when entering `async with client`.",
+    )
+
+
+class ModelReadiness(BaseModel):
+    """Outcome of preloading a model on one endpoint."""
+
+    model_name: str
+    url: str
+    ready: bool = False
+    load_time: float = Field(
+        default=0, description="Seconds the server spent loading the model."
+    )
+    wall_time: float = Field(
+        default=0, description="Seconds until the preload request returned."
+    )
+    error: Optional[str] = None
+
+    @classmethod
+    def from_response(
+        cls, model_name: str, url: str, response: dict, wall_time: float
+    ) -> "ModelReadiness":
+        return cls(
+            model_name=model_name,
+            url=url,
+            ready=bool(response.get("done")),
+            load_time=(response.get("load_duration") or 0) / NANOSECONDS,
+            wall_time=wall_time,
+        )
+
+    def print_summary(self) -> "ModelReadiness":
+        if self.ready:
+            print(
+                f"Model {self.model_name} ready on {self.url} after {self.wall_time:.2f}s "
+                f"(load {self.load_time:.2f}s)"
+            )
+        else:
+            print(f"Model {self.model_name} failed to load on {self.url}: {self.error}")
+
+        return self
@@ -0,0 +1,88 @@
+"""Incremental decoder for newline-delimited JSON streams."""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast backend
+    orjson = None
+
+
+def _default_loads() -> Callable[[Any], Any]:
+    """Use orjson when it's installed, else the stdlib json module."""
+    if orjson is not None:
+        return orjson.loads
+    return lambda line: json.loads(bytes(line))
+
+
+class NDJSONDecoder:
+    """Decode an NDJSON byte stream chunk by chunk without re-copying the buffer.
+
+    Bytes are appended to a single bytearray. A scan offset remembers how far
+    we've already searched for a newline, and a start offset marks the first
+    unconsumed byte, so each byte is scanned once. The consumed prefix is only
+    dropped once it's at least half of the buffer, keeping compaction amortized.
+
+    Example
+    -------
+    >>> decoder = NDJSONDecoder()
+    >>> decoder.feed(b'{"response": "a"}\\n{"resp')
+    [{'response': 'a'}]
+    >>> decoder.feed(b'onse": "b"}\\n')
+    [{'response': 'b'}]
+    >>> decoder.flush()
+    []
+    """
+
+    def __init__(self, loads: Optional[Callable[[Any], Any]] = None):
+        self._loads: Callable[[Any], Any] = loads or _default_loads()
+        self._buffer = bytearray()
+        self._start = 0
+        self._scan = 0
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        """Add a chunk of bytes and return every complete JSON line in it."""
+        self._buffer += chunk
+        decoded: List[Dict[str, Any]] = []
+
+        with memoryview(self._buffer) as view:
+            while (end := self._buffer.find(b"\n", self._scan)) != -1:
+                if end > self._start:
+                    self._decode_line(view[self._start : end], decoded)
+                self._start = self._scan = end + 1
+
+        # Nothing else to find in the tail until more bytes arrive.
+        self._scan = len(self._buffer)
+        self._compact()
+
+        return decoded
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Decode whatever remains in the buffer once the stream has ended."""
+        decoded: List[Dict[str, Any]] = []
+        if len(self._buffer) > self._start:
+            with memoryview(self._buffer) as view:
+                self._decode_line(view[self._start :], decoded)
+
+        self._buffer.clear()
+        self._start = self._scan = 0
+
+        return decoded
+
+    def _decode_line(self, line: memoryview, decoded: List[Dict[str, Any]]) -> None:
+        try:
+            decoded.append(self._loads(line))
+        except ValueError as jde:
+            # Blank (whitespace) lines are fine - anything else gets reported.
+            if raw := bytes(line).strip():
+                print(f"Error decoding JSON: {jde}", raw.decode(errors="replace"))
+        finally:
+            line.release()
+
+    def _compact(self) -> None:
+        """Drop the consumed prefix once it's at least half the buffer."""
+        if self._start and self._start * 2 >= len(self._buffer):
+            del self._buffer[: self._start]
+            self._scan -= self._start
+            self._start = 0
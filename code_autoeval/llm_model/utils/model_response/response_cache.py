@@ -0,0 +1,162 @@
+"""Content-addressed on-disk cache for backend model responses."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ResponseCacheConfig(BaseModel):
+    """Settings for the on-disk response cache (opt-in)."""
+
+    enabled: bool = Field(default=False, description="Turn the cache on.")
+    cache_dir: Optional[Path] = Field(
+        default=None,
+        description="Defaults to <generated_code_logs>/llm_response_cache.",
+    )
+    max_entries: int = Field(default=2000, description="Maximum cached responses.")
+    max_bytes: int = Field(
+        default=256 * 1024 * 1024, description="Maximum total size of the cache."
+    )
+    max_age_seconds: float = Field(
+        default=7 * 24 * 60 * 60, description="Entries older than this are evicted."
+    )
+
+
+class ResponseCache:
+    """Store backend model responses keyed by a hash of the request.
+
+    Each entry is a JSON file named after the sha256 of the model name, prompt,
+    system prompt and request kwargs. Files are written atomically, and the
+    oldest entries are evicted once the size / count / age limits are reached.
+
+    Example
+    -------
+    >>> cache = ResponseCache(ResponseCacheConfig(enabled=True, cache_dir=Path("/tmp/c")))
+    >>> key = cache.make_key("coder-lite:latest", "prompt", "system", {})
+    >>> cache.set(key, {"response": "def foo(): ..."})
+    >>> cache.get(key)
+    {'response': 'def foo(): ...'}
+    >>> cache.stats
+    {'hits': 1, 'misses': 0, 'hit_rate': 1.0}
+    """
+
+    def __init__(self, config: Optional[ResponseCacheConfig] = None):
+        self.config: ResponseCacheConfig = config or ResponseCacheConfig()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit / miss counters."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def bind_base_dir(self, base_log_dir: Path) -> None:
+        """Default the cache directory to live under the generated logs dir."""
+        if self.config.cache_dir is None:
+            self.config.cache_dir = Path(base_log_dir).joinpath("llm_response_cache")
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        prompt: str,
+        system_prompt: str,
+        kwargs: Dict[str, Any],
+    ) -> str:
+        """Hash the request into a stable cache key."""
+        key_data = json.dumps(
+            {
+                "model": model_name,
+                "prompt": prompt,
+                "system": system_prompt,
+                "kwargs": kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key_data.encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.config.cache_dir.joinpath(key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response, or None on a miss / expired entry."""
+        path = self._entry_path(key)
+        try:
+            if time.time() - path.stat().st_mtime > self.config.max_age_seconds:
+                path.unlink(missing_ok=True)
+                raise FileNotFoundError(path)
+
+            response = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        # Refresh the mtime so eviction drops the least recently used entries.
+        os.utime(path)
+        self.hits += 1
+        return response
+
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """Atomically write the response to the cache, then evict if needed."""
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=path.parent, suffix=".tmp", delete=False
+        ) as temp_file:
+            json.dump(response, temp_file, default=str)
+            temp_file_path = temp_file.name
+
+        os.replace(temp_file_path, path)
+
+        self.evict()
+
+    def evict(self) -> List[Path]:
+        """Remove expired entries, then the oldest until within the limits."""
+        if not self.config.cache_dir or not self.config.cache_dir.exists():
+            return []
+
+        now = time.time()
+        entries = []
+        removed = []
+        for path in self.config.cache_dir.rglob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            if now - stat.st_mtime > self.config.max_age_seconds:
+                path.unlink(missing_ok=True)
+                removed.append(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Oldest first
+        entries.sort()
+        total_bytes = sum(size for _, size, _ in entries)
+
+        while entries and (
+            len(entries) > self.config.max_entries
+            or total_bytes > self.config.max_bytes
+        ):
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            removed.append(path)
+
+        return removed
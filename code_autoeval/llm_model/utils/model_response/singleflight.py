@@ -0,0 +1,64 @@
+"""Share one in-flight call between concurrent callers asking the same thing."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self, task: "asyncio.Future[T]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into a single call.
+
+    The first caller starts the call as a task; later callers with the same
+    key await that task instead of starting their own. Every caller gets the
+    result (or the exception). A caller being cancelled doesn't cancel the
+    shared call unless it was the last one waiting on it.
+
+    Example
+    -------
+    >>> singleflight = SingleFlight()
+    >>> result, shared = await singleflight.do(key, lambda: fetch(payload))
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call] = {}
+        self.coalesced: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Await call() - or the identical call already in flight.
+
+        Returns:
+        Tuple[T, bool]: The result, and True if it came from another caller's call.
+        """
+        shared = key in self._calls
+        if shared:
+            in_flight = self._calls[key]
+            self.coalesced += 1
+        else:
+            in_flight = _Call(asyncio.ensure_future(call()))
+            self._calls[key] = in_flight
+            in_flight.task.add_done_callback(lambda _: self._forget(key, in_flight))
+
+        in_flight.waiters += 1
+        try:
+            return await asyncio.shield(in_flight.task), shared
+        finally:
+            in_flight.waiters -= 1
+            if not in_flight.waiters and not in_flight.task.done():
+                # Every caller gave up - stop the call.
+                in_flight.task.cancel()
+                self._forget(key, in_flight)
+
+    def _forget(self, key: str, in_flight: _Call) -> None:
+        if self._calls.get(key) is in_flight:
+            del self._calls[key]
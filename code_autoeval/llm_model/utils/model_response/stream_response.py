@@ -1,13 +1,51 @@
 """Stream the response from the backend model."""
 
-import json
+import asyncio
+import contextlib
 import re
-from typing import Any, AsyncIterator, Dict, Tuple
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 
 import httpx
+from pydantic import Field
 
 from code_autoeval.llm_model.utils.base_llm_class import BaseLLMClass
-from code_autoeval.llm_model.utils.model.custom_exceptions import NoTestsFoundError
+from code_autoeval.llm_model.utils.model.backend_request import (
+    BackendRequest,
+    BackendResult,
+)
+from code_autoeval.llm_model.utils.model.custom_exceptions import (
+    BackendHTTPError,
+    BackendTimeoutError,
+    NoTestsFoundError,
+)
+from code_autoeval.llm_model.utils.model.generation_budget import (
+    GenerationBudgetPolicy,
+)
+from code_autoeval.llm_model.utils.model.generation_metrics import (
+    GenerationMetrics,
+    GenerationMetricsSummary,
+)
+from code_autoeval.llm_model.utils.model_response.backend_resilience import (
+    BackendResilience,
+    RetryPolicy,
+)
+from code_autoeval.llm_model.utils.model_response.cassette import Cassette
+from code_autoeval.llm_model.utils.model_response.endpoint_pool import EndpointPool
+from code_autoeval.llm_model.utils.model_response.generation_guard import (
+    GenerationGuard,
+    GenerationGuardConfig,
+)
+from code_autoeval.llm_model.utils.model_response.http_client_pool import (
+    HttpClientPool,
+)
+from code_autoeval.llm_model.utils.model_response.model_warmup import (
+    KeepAlivePolicy,
+    ModelReadiness,
+)
+from code_autoeval.llm_model.utils.model_response.ndjson_decoder import NDJSONDecoder
+from code_autoeval.llm_model.utils.model_response.response_cache import ResponseCache
+from code_autoeval.llm_model.utils.model_response.singleflight import SingleFlight
 
 
 class StreamResponse(BaseLLMClass):
@@ -15,93 +53,651 @@ class StreamResponse(BaseLLMClass):
 
     # No need for __init__ method anymore, as ModelAttributes are initialized by default
 
+    # Shared across every ask_backend_model call to keep connections alive.
+    http_client_pool: HttpClientPool = Field(default_factory=HttpClientPool)
+    # Load / latency / health of every endpoint in llm_model_attributes.
+    endpoint_pool: EndpointPool = Field(default_factory=EndpointPool)
+    # Retries with backoff + a circuit breaker shared by every request.
+    backend_resilience: BackendResilience = Field(default_factory=BackendResilience)
+    # Opt-in persistent cache - enable with ResponseCacheConfig(enabled=True).
+    response_cache: ResponseCache = Field(default_factory=ResponseCache)
+    # Identical payloads in flight at the same time share one backend stream.
+    singleflight: SingleFlight = Field(default_factory=SingleFlight)
+    coalesce_requests: bool = True
+    # Record / replay the streamed traffic - off unless configured.
+    cassette: Cassette = Field(default_factory=Cassette)
+    # num_predict / num_ctx / stop options sized from each request's target.
+    generation_budget: GenerationBudgetPolicy = Field(
+        default_factory=GenerationBudgetPolicy
+    )
+    # Limits that abort looping / runaway generations mid-stream.
+    generation_guard_config: GenerationGuardConfig = Field(
+        default_factory=GenerationGuardConfig
+    )
+    # Aggregated metrics of every ask_backend_model call of this client - a
+    # job's own calls are also added to the summary it passes as job_metrics.
+    generation_metrics: GenerationMetricsSummary = Field(
+        default_factory=GenerationMetricsSummary
+    )
+    # Ollama `context` tokens per conversation, sent back to skip re-prefill.
+    conversation_contexts: Dict[str, List[int]] = Field(default_factory=dict)
+    max_conversation_context_tokens: int = 8192
+    # How long the backend keeps the model loaded between requests.
+    keep_alive_policy: KeepAlivePolicy = Field(default_factory=KeepAlivePolicy)
+    # (model_name, num_ctx) -> background preload of that model on every
+    # endpoint - the futures belong to preload_loop.
+    preload_tasks: Dict[Tuple[str, Optional[int]], asyncio.Future] = Field(
+        default_factory=dict
+    )
+    preload_loop: Optional[asyncio.AbstractEventLoop] = None
+    active_batches: int = 0
+
+    async def __aenter__(self) -> "StreamResponse":
+        if self.keep_alive_policy.preload_on_enter:
+            self.start_preload()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP connections to the backend model."""
+        preload_tasks = self._loop_preload_tasks()
+        for task in preload_tasks.values():
+            task.cancel()
+        await asyncio.gather(*preload_tasks.values(), return_exceptions=True)
+        preload_tasks.clear()
+        await self.http_client_pool.aclose()
+
+    @property
+    def keep_alive(self) -> Union[str, int]:
+        """The keep_alive to send with requests right now."""
+        if self.active_batches:
+            return self.keep_alive_policy.batch_keep_alive
+        return self.keep_alive_policy.keep_alive
+
+    def start_preload(
+        self, model_name: Optional[str] = None, num_ctx: Optional[int] = None
+    ) -> "asyncio.Future[Any]":
+        """Start loading the model on every endpoint in the background.
+
+        Call this before slow local setup work (class hierarchy, import
+        discovery, fixture parsing) so the model load overlaps it. The
+        requests are sent from the default executor right away - that setup
+        work is synchronous, so a coroutine wouldn't start until it's done.
+
+        num_ctx should be that of the first real request - Ollama reloads the
+        model when num_ctx changes - and defaults to the generation budget's
+        smallest bucket. Repeated calls for the same model and num_ctx on the
+        same event loop return the same future.
+        """
+        model_name = model_name or self.llm_model_attributes.llm_model_name
+        if num_ctx is None:
+            num_ctx = self.generation_budget.default_num_ctx
+        preload_tasks = self._loop_preload_tasks()
+        if (model_name, num_ctx) not in preload_tasks:
+            preload_tasks[(model_name, num_ctx)] = self._submit_preload(
+                model_name, self.keep_alive, num_ctx
+            )
+        return preload_tasks[(model_name, num_ctx)]
+
+    def _loop_preload_tasks(
+        self,
+    ) -> Dict[Tuple[str, Optional[int]], asyncio.Future]:
+        """The preloads of the running loop - those of an earlier loop are dropped."""
+        loop = asyncio.get_running_loop()
+        if self.preload_loop is not loop:
+            self.preload_tasks.clear()
+            self.preload_loop = loop
+        return self.preload_tasks
+
+    async def wait_until_ready(
+        self, model_name: Optional[str] = None, num_ctx: Optional[int] = None
+    ) -> List[ModelReadiness]:
+        """Readiness check - wait for the preload and report the load times."""
+        readiness = await self.start_preload(model_name, num_ctx)
+        for endpoint_readiness in readiness:
+            endpoint_readiness.print_summary()
+        return readiness
+
+    async def preload_model(
+        self,
+        model_name: Optional[str] = None,
+        keep_alive: Optional[Union[str, int]] = None,
+        num_ctx: Optional[int] = None,
+    ) -> List[ModelReadiness]:
+        """Load the model on every endpoint with an empty-prompt generate.
+
+        Failures are reported in the ModelReadiness instead of raised - the
+        real requests still retry on their own. keep_alive=0 unloads it.
+        """
+        return await self._submit_preload(
+            model_name or self.llm_model_attributes.llm_model_name,
+            self.keep_alive if keep_alive is None else keep_alive,
+            num_ctx,
+        )
+
+    def _submit_preload(
+        self,
+        model_name: str,
+        keep_alive: Union[str, int],
+        num_ctx: Optional[int] = None,
+    ) -> "asyncio.Future[List[ModelReadiness]]":
+        loop = asyncio.get_running_loop()
+        return asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    None, self._preload_endpoint, url, model_name, keep_alive, num_ctx
+                )
+                for url in self.llm_model_attributes.endpoints
+            )
+        )
+
+    def _preload_endpoint(
+        self,
+        url: str,
+        model_name: str,
+        keep_alive: Union[str, int],
+        num_ctx: Optional[int] = None,
+    ) -> ModelReadiness:
+        if self.cassette.replaying:
+            return ModelReadiness(model_name=model_name, url=url, ready=True)
+
+        payload: Dict[str, Any] = {
+            "model": model_name,
+            "prompt": "",
+            "stream": False,
+            "keep_alive": keep_alive,
+        }
+        if num_ctx is not None:
+            # Loaded with the real requests' context size, so they don't reload it.
+            payload["options"] = {"num_ctx": num_ctx}
+
+        start_time = time.perf_counter()
+        try:
+            response = httpx.post(
+                f"{url}/api/generate",
+                json=payload,
+                timeout=self.http_client_pool.timeout,
+            )
+            if response.status_code != 200:
+                raise BackendHTTPError(response.status_code, response.text)
+            return ModelReadiness.from_response(
+                model_name,
+                url,
+                response.json(),
+                wall_time=time.perf_counter() - start_time,
+            )
+        except Exception as e:
+            return ModelReadiness(
+                model_name=model_name,
+                url=url,
+                wall_time=time.perf_counter() - start_time,
+                error=f"{type(e).__name__}: {e}",
+            )
+
+    @contextlib.asynccontextmanager
+    async def batch(
+        self, model_name: Optional[str] = None, num_ctx: Optional[int] = None
+    ) -> AsyncIterator[None]:
+        """Keep the model loaded for a long run of requests.
+
+        Preloads the model in the background (with num_ctx, see
+        start_preload), sends the policy's batch_keep_alive while inside,
+        and optionally unloads the model when the last batch ends.
+
+        >>> async with client.batch():
+        ...     await fixture_generator.generate_all_fixtures()
+        """
+        self.active_batches += 1
+        self.start_preload(model_name, num_ctx)
+        try:
+            yield
+        finally:
+            self.active_batches -= 1
+            if not self.active_batches and self.keep_alive_policy.unload_after_batch:
+                unloaded = model_name or self.llm_model_attributes.llm_model_name
+                preload_tasks = self._loop_preload_tasks()
+                for preload_key in [k for k in preload_tasks if k[0] == unloaded]:
+                    preload_tasks.pop(preload_key)
+                await self.preload_model(model_name, keep_alive=0)
+
+    def can_continue_conversation(self, conversation_id: Optional[str]) -> bool:
+        """True if a usable context exists to continue the conversation from."""
+        context = self.conversation_contexts.get(conversation_id or "")
+        return bool(context) and len(context) <= self.max_conversation_context_tokens
+
+    def reset_conversation(self, conversation_id: Optional[str]) -> None:
+        """Forget the context so the next request sends the full prompt."""
+        self.conversation_contexts.pop(conversation_id or "", None)
+
+    def fork_conversation(self, conversation_id: Optional[str], fork_id: str) -> str:
+        """Continue conversation_id's context under fork_id too - e.g. per candidate."""
+        self.reset_conversation(fork_id)
+        if context := self.conversation_contexts.get(conversation_id or ""):
+            self.conversation_contexts[fork_id] = context
+        return fork_id
+
+    def join_conversation(
+        self,
+        conversation_id: str,
+        fork_ids: Sequence[str],
+        kept_fork_id: Optional[str] = None,
+    ) -> None:
+        """Continue conversation_id from kept_fork_id's context, and drop the forks.
+
+        Without a kept_fork_id the context of conversation_id is left as it was.
+        """
+        if kept_fork_id is not None:
+            if context := self.conversation_contexts.get(kept_fork_id):
+                self.conversation_contexts[conversation_id] = context
+            else:
+                self.reset_conversation(conversation_id)
+        for fork_id in fork_ids:
+            self.reset_conversation(fork_id)
+
     async def ask_backend_model(
         self,
         user_content: str,
         system_prompt: str = "You are a helpful AI assistant. Provide clear and concise responses.",
+        bypass_cache: bool = False,
+        conversation_id: Optional[str] = None,
+        model_name: Optional[str] = None,
+        job_metrics: Optional[GenerationMetricsSummary] = None,
         **kwargs: Dict[str, Any],
-    ) -> Dict[str, str]:
+    ) -> Dict[str, Any]:
         """
         Queries the DeepSeek Coder model using the chat completion endpoint.
 
         Args:
         user_content (str): The user's input query.
         system_prompt (str): The system prompt to guide the model's behavior.
+        bypass_cache (bool): Skip the response cache (e.g. for sampling runs).
+        conversation_id (Optional[str]): Store the returned context under this id,
+            and continue from it (only sending user_content) if one is stored.
+        model_name (Optional[str]): Overrides llm_model_name (e.g. a ModelRouter tier).
+        job_metrics (Optional[GenerationMetricsSummary]): Also add the call's
+            metrics here (e.g. JobContext.generation_metrics).
         **kwargs: Additional keyword arguments to pass to the API.
 
         Returns:
-        Dict[str, str]: A dictionary containing the full response from the model.
+        Dict[str, Any]: A dictionary containing the full response from the model
+            under "response", and the GenerationMetrics of the call under "metrics".
         """
+        if self.can_continue_conversation(conversation_id):
+            kwargs = {**kwargs, "context": self.conversation_contexts[conversation_id]}
+            # The system prompt is already part of the conversation context.
+            system_prompt = ""
+
+        model_name = model_name or self.llm_model_attributes.llm_model_name
+
+        cache_key = ""
+        if self.response_cache.enabled and not bypass_cache:
+            self.response_cache.bind_base_dir(self.common.generated_base_log_dir)
+            cache_key = self.response_cache.make_key(
+                model_name,
+                user_content,
+                system_prompt,
+                kwargs,
+            )
+            if cached_response := self.response_cache.get(cache_key):
+                print("Returning cached response from the backend model.")
+                # The model never saw this request - there's no context to continue.
+                self.reset_conversation(conversation_id)
+                metrics = GenerationMetrics(cached=True)
+                self._add_metrics(metrics, job_metrics)
+                return {**cached_response, "metrics": metrics}
+
         payload = {
-            "model": self.llm_model_attributes.llm_model_name,
+            "model": model_name,
             "prompt": user_content,
             "system": system_prompt,
             "stream": True,
-            "keep_alive": "10m",
+            "keep_alive": self.keep_alive,
             **kwargs,
         }
 
-        url: str = f"{self.llm_model_attributes.llm_model_url}/api/generate"
-        full_response = ""
+        start_time = time.perf_counter()
+
+        async def _generate() -> Tuple[List[str], Dict[str, Any], float]:
+            # Transient connection / 5xx errors retry the whole request.
+            return await self.backend_resilience.call(
+                lambda: self._routed_generation(payload)
+            )
+
+        coalesced = False
+        if self.coalesce_requests:
+            # Keyed like the cassette - payloads that generate the same thing.
+            generation, coalesced = await self.singleflight.do(
+                Cassette.make_key(payload), _generate
+            )
+        else:
+            generation = await _generate()
+
+        response_parts, done_chunk, time_to_first_token = generation
+
+        if coalesced:
+            # The tokens were counted once already, by the request that ran.
+            metrics = GenerationMetrics(
+                coalesced=True, wall_time=time.perf_counter() - start_time
+            )
+        else:
+            metrics = GenerationMetrics.from_done_chunk(
+                done_chunk,
+                time_to_first_token=time_to_first_token,
+                wall_time=time.perf_counter() - start_time,
+            )
+        self._add_metrics(metrics, job_metrics)
+
+        if conversation_id and done_chunk.get("context"):
+            self.conversation_contexts[conversation_id] = done_chunk["context"]
+        else:
+            self.reset_conversation(conversation_id)
 
-        async for chunk in self.stream_response(url, payload):
-            if not chunk:
-                raise ValueError(f"Error: {chunk=}")
-            elif chunk.get("done", ""):
-                print("Reached done. Breaking response chain.")
-                break
-            elif not chunk.get("response", ""):
-                raise KeyError(f"Error: {chunk=}")
+        full_response = "".join(response_parts)
 
-            full_response += chunk["response"]
+        if cache_key:
+            self.response_cache.set(cache_key, {"response": full_response})
+
+        return {"response": full_response, "metrics": metrics}
+
+    def _add_metrics(
+        self,
+        metrics: GenerationMetrics,
+        job_metrics: Optional[GenerationMetricsSummary] = None,
+    ) -> None:
+        self.generation_metrics.add(metrics)
+        if job_metrics is not None:
+            job_metrics.add(metrics)
 
-        return {"response": full_response}
+    async def _routed_generation(
+        self, payload: Dict[str, Any]
+    ) -> Tuple[List[str], Dict[str, Any], float]:
+        """Stream from the best endpoint, hedging to a 2nd one if it's slow to start."""
+        pool = self.endpoint_pool
+        pool.set_endpoints(self.llm_model_attributes.endpoints)
+        url = pool.acquire()
+
+        hedge_delay = pool.hedge_delay()
+        if (
+            hedge_delay is None
+            or self.cassette.config.mode != Cassette.OFF
+            or not pool.healthy_endpoints(exclude=[url])
+        ):
+            return await self._endpoint_generation(url, payload)
+
+        first_tokens = [asyncio.Event(), asyncio.Event()]
+        tasks = [
+            asyncio.ensure_future(
+                self._endpoint_generation(url, payload, first_tokens[0])
+            )
+        ]
+        try:
+            first_token = asyncio.ensure_future(first_tokens[0].wait())
+            await asyncio.wait(
+                [tasks[0], first_token],
+                timeout=hedge_delay,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            first_token.cancel()
+
+            if not (tasks[0].done() or first_tokens[0].is_set()):
+                hedge_url = pool.acquire(exclude=[url])
+                print(
+                    f"No token from {url} after {hedge_delay:.2f}s - hedging to {hedge_url}"
+                )
+                tasks.append(
+                    asyncio.ensure_future(
+                        self._endpoint_generation(hedge_url, payload, first_tokens[1])
+                    )
+                )
+
+            winner = await self._first_to_stream(tasks, first_tokens)
+            for task in tasks:
+                if task is not winner:
+                    task.cancel()
+            return await winner
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    async def _first_to_stream(
+        tasks: List["asyncio.Future[Any]"], first_tokens: List[asyncio.Event]
+    ) -> "asyncio.Future[Any]":
+        """Return the first task to stream a token or succeed - else the last to fail."""
+        pending = list(tasks)
+        while True:
+            waiters = [
+                asyncio.ensure_future(event.wait())
+                for task, event in zip(tasks, first_tokens)
+                if task in pending
+            ]
+            await asyncio.wait(
+                [*pending, *waiters], return_when=asyncio.FIRST_COMPLETED
+            )
+            for waiter in waiters:
+                waiter.cancel()
+
+            for task, event in zip(tasks, first_tokens):
+                if task not in pending:
+                    continue
+                if event.is_set() or (task.done() and task.exception() is None):
+                    return task
+                if task.done():
+                    pending.remove(task)
+                    if not pending:
+                        return task
+
+    async def _endpoint_generation(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        first_token: Optional[asyncio.Event] = None,
+    ) -> Tuple[List[str], Dict[str, Any], float]:
+        """Stream from an acquired endpoint, then release it with the outcome."""
+        try:
+            result = await self._stream_generation(
+                f"{url}/api/generate", payload, first_token
+            )
+        except asyncio.CancelledError:
+            self.endpoint_pool.release(url)
+            raise
+        except Exception as e:
+            # Only count errors that say something about the endpoint's health.
+            self.endpoint_pool.release(url, failed=RetryPolicy.is_retryable(e))
+            raise
+
+        self.endpoint_pool.release(url, time_to_first_token=result[2])
+        return result
+
+    async def _stream_generation(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        first_token: Optional[asyncio.Event] = None,
+    ) -> Tuple[List[str], Dict[str, Any], float]:
+        """Stream one generation - returns the tokens, the done chunk and the TTFT.
+
+        Args:
+        first_token (Optional[asyncio.Event]): Set once the first token arrives.
+
+        Raises:
+        RunawayGenerationError: If the generation guard trips. Leaving the
+            stream closes the connection, which stops the generation server-side.
+        """
+        response_parts: List[str] = []
+        done_chunk: Dict[str, Any] = {}
+        time_to_first_token = 0.0
+        start_time = time.perf_counter()
+        guard = GenerationGuard(self.generation_guard_config)
+
+        # aclosing releases the pooled connection as soon as we break on `done`.
+        async with contextlib.aclosing(self.stream_response(url, payload)) as chunks:
+            async for chunk in chunks:
+                if not chunk:
+                    raise ValueError(f"Error: {chunk=}")
+                elif chunk.get("done", ""):
+                    print("Reached done. Breaking response chain.")
+                    done_chunk = chunk
+                    break
+                elif not chunk.get("response", ""):
+                    raise KeyError(f"Error: {chunk=}")
+
+                if not response_parts:
+                    time_to_first_token = time.perf_counter() - start_time
+                    if first_token:
+                        first_token.set()
+
+                guard.check(chunk["response"])
+                response_parts.append(chunk["response"])
+
+        return response_parts, done_chunk, time_to_first_token
+
+    async def ask_backend_model_many(
+        self,
+        requests: Sequence[Union[BackendRequest, str, Tuple[Any, ...]]],
+        max_concurrency: int = 4,
+    ) -> List[BackendResult]:
+        """
+        Queries the backend model for many prompts concurrently.
+
+        Args:
+        requests (Sequence): BackendRequest objects, prompts, or
+            (prompt, system_prompt, kwargs) tuples.
+        max_concurrency (int): Maximum number of requests in flight at once.
+
+        Returns:
+        List[BackendResult]: One result per request, in input order. A failed
+            request carries its exception in .error instead of cancelling the batch.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _ask(index: int, request: BackendRequest) -> BackendResult:
+            system_prompt_kwargs = (
+                {"system_prompt": request.system_prompt}
+                if request.system_prompt is not None
+                else {}
+            )
+            async with semaphore:
+                try:
+                    response = await self.ask_backend_model(
+                        request.user_content, **system_prompt_kwargs, **request.kwargs
+                    )
+                except Exception as e:
+                    print(f"Request {index} in batch failed: {e}")
+                    return BackendResult(index=index, request=request, error=e)
+
+            return BackendResult(index=index, request=request, response=response)
+
+        return await asyncio.gather(
+            *(
+                _ask(index, BackendRequest.from_item(item))
+                for index, item in enumerate(requests)
+            )
+        )
 
     async def stream_response(
         self,
         url: str,
         payload: Dict[str, Any],
-        timeout: int = 60,
+        timeout: Optional[float] = None,
     ) -> AsyncIterator[Dict[str, Any]]:
         """Streams the response from the API, yielding each chunk as it's received.
 
         Args:
         url (str): The API endpoint URL.
         payload (Dict[str, Any]): The payload to send with the POST request.
+        timeout (Optional[float]): Overrides the pool's default timeout.
 
         Yields:
         Dict[str, Any]: Each chunk of the response.
 
         Raises:
-        Exception: If the HTTP status code is not 200.
+        BackendHTTPError: If the HTTP status code is not 200.
+        BackendTimeoutError: If no chunk arrives within the idle timeout once streaming.
+        CassetteMissError: If replaying and the cassette has no matching recording.
         """
-        async with httpx.AsyncClient() as client:
-            async with client.stream(
-                "POST", url, json=payload, timeout=timeout
-            ) as response:
-                if response.status_code != 200:
-                    error_content = await response.aread()  # Read the entire response
-                    raise Exception(
-                        f"Error: {response.status_code}, {error_content.decode()}"
+        if self.cassette.config.mode != Cassette.OFF:
+            self.cassette.bind_base_dir(self.common.generated_base_log_dir)
+
+        if self.cassette.replaying:
+            async for chunk in self.cassette.replay(payload):
+                yield chunk
+            return
+
+        recording = (
+            self.cassette.start_recording(payload) if self.cassette.recording else None
+        )
+        start_time = time.perf_counter()
+
+        client = self.http_client_pool.get_client()
+        timeout = timeout or self.http_client_pool.timeout
+        idle_timeout = self.http_client_pool.config.idle_timeout
+
+        async with client.stream(
+            "POST", url, json=payload, timeout=timeout
+        ) as response:
+            if response.status_code != 200:
+                error_content = await response.aread()  # Read the entire response
+                error = BackendHTTPError(
+                    response.status_code, error_content.decode(errors="replace")
+                )
+                if recording:
+                    recording.status_code = error.status_code
+                    recording.error = error.content
+                    self.cassette.save(recording)
+                raise error
+
+            decoder = NDJSONDecoder()
+            byte_chunks = response.aiter_bytes()
+            # The first chunk waits on prefill (read timeout) - after that the
+            # idle timeout catches a server that stops mid-stream.
+            chunk_timeout = None
+
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(
+                        anext(byte_chunks), timeout=chunk_timeout
+                    )
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError as te:
+                    error = BackendTimeoutError(
+                        f"No tokens received from the backend model for {idle_timeout}s"
                     )
+                    if recording:
+                        recording.timed_out = True
+                        recording.error = str(error)
+                        self.cassette.save(recording)
+                    raise error from te
 
-                buffer = b""
-                async for chunk in response.aiter_bytes():
-                    buffer += chunk
-                    while b"\n" in buffer:
-                        line, buffer = buffer.split(b"\n", 1)
-                        if line:
-                            try:
-                                yield json.loads(line.decode())
-                            except json.JSONDecodeError as jde:
-                                print(f"Error decoding JSON: {jde}", line.decode())
-                                continue
-
-                if buffer:
+                chunk_timeout = idle_timeout
+
+                for decoded in decoder.feed(chunk):
+                    if recording:
+                        recording.add_chunk(decoded, start_time)
+                        # The consumer stops reading at `done` - save before yielding.
+                        if decoded.get("done"):
+                            self.cassette.save(recording)
+                            recording = None
                     try:
-                        yield json.loads(buffer.decode())
-                    except json.JSONDecodeError as jde:
-                        print(f"Error decoding JSON: {jde}", buffer.decode())
+                        yield decoded
+                    except GeneratorExit:
+                        # e.g. the generation guard tripped - replay the same cut.
+                        if recording:
+                            recording.aborted = True
+                            self.cassette.save(recording)
+                        raise
+
+            for decoded in decoder.flush():
+                if recording:
+                    recording.add_chunk(decoded, start_time)
+                yield decoded
+
+            if recording:
+                self.cassette.save(recording)
 
     def figure_out_model_response(self, response: Any) -> str:
         """Extract the content from the model's response."""
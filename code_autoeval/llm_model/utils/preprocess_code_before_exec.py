@@ -1,11 +1,18 @@
 """Class for preprocessing code before execution."""
 
+import asyncio
 from typing import Optional, Tuple
 
 from multiuse.model import class_data_model
 
 from code_autoeval.llm_model import imports
-from code_autoeval.llm_model.utils import code_cleaning, extraction, model, validation
+from code_autoeval.llm_model.utils import (
+    code_cleaning,
+    extraction,
+    job_context,
+    model,
+    validation,
+)
 
 # import flake8
 
@@ -18,45 +25,59 @@ class PreProcessCodeBeforeExec(
 ):
 
     @validation.validate_code()
-    def run_preprocess_pipeline(
+    async def run_preprocess_pipeline(
         self,
         code: str,
         max_line_length: int = 120,
         class_model: Optional[class_data_model.ClassDataModel] = None,
         func_attributes: model.FunctionAttributes = None,
         is_pytest_format: bool = False,
+        job: Optional[job_context.JobContext] = None,
         **kwargs,
     ) -> str:
+        """Clean up generated code - syntax errors, imports and formatting.
+
+        :param job: The job the code belongs to - its project imports are
+            used to resolve undefined names, and its logger for logging.
+        """
         code = self.remove_non_code_patterns(code, is_pytest_format)
 
-        code, was_modified = self.preprocess_code(
+        code, was_modified = await self.preprocess_code(
             code,
             max_line_length=max_line_length,
             class_model=class_model,
             func_attributes=func_attributes,
             is_pytest_format=is_pytest_format,
+            job=job,
             **kwargs,
         )
 
         if was_modified:
             class_model.raise_if_no_test_in_code(code)
-            self._log_code(code, "Code before 2nd modification: ")
+            self._log_code(code, "Code before 2nd modification: ", job=job)
 
-            code, was_modified = self.preprocess_code(
+            code, was_modified = await self.preprocess_code(
                 code,
                 max_line_length=max_line_length,
                 class_model=class_model,
                 func_attributes=func_attributes,
+                job=job,
                 **kwargs,
             )
 
-        self._log_code(code, "Code before pyflakes + isort: ")
+        self._log_code(code, "Code before pyflakes + isort: ", job=job)
 
-        code, was_modified = self.run_pyflakes_isort_pipeline(
-            code, max_line_length=max_line_length, class_model=class_model, **kwargs
+        code, was_modified = await self.run_pyflakes_isort_pipeline(
+            code,
+            max_line_length=max_line_length,
+            class_model=class_model,
+            job=job,
+            **kwargs,
         )
 
-        code = extraction.PythonClassManager.extract_remove_class_from_file(
+        # The AST work runs in a thread so other pipelines keep going.
+        code = await asyncio.to_thread(
+            extraction.PythonClassManager.extract_remove_class_from_file,
             class_model.class_name,
             # file_path=str(func_attributes.test_absolute_file_path),
             content=code,
@@ -69,17 +90,18 @@ class PreProcessCodeBeforeExec(
         return code
 
     @validation.validate_code()
-    def preprocess_code(
+    async def preprocess_code(
         self,
         code: str,
         class_model: Optional[class_data_model.ClassDataModel] = None,
         func_attributes: model.FunctionAttributes = None,
         is_pytest_format: bool = False,
+        job: Optional[job_context.JobContext] = None,
         **kwargs,
     ) -> Tuple[str, bool]:
         """Preprocess the code before running it."""
-        original_code, original_imports = self.find_original_code_and_imports(
-            func_attributes
+        original_code, original_imports = await asyncio.to_thread(
+            self.find_original_code_and_imports, func_attributes
         )
 
         if is_pytest_format:
@@ -88,24 +110,25 @@ class PreProcessCodeBeforeExec(
                 with open(func_attributes.test_absolute_file_path, "w") as file:
                     file.write(code)
 
-            code = self.fix_syntax_errors_for_n_lines(
+            code = await self.fix_syntax_errors_for_n_lines(
                 file_path=str(func_attributes.test_absolute_file_path), nlines=10
             )
             # Then verify that we don't have the class definition in the test file.
             # the class definition would be provided by the class_model
-            code = extraction.PythonClassManager.extract_remove_class_from_file(
+            code = await asyncio.to_thread(
+                extraction.PythonClassManager.extract_remove_class_from_file,
                 class_model.class_name,
                 file_path=str(func_attributes.test_absolute_file_path),
                 content=code,
             )
             class_model.raise_if_no_test_in_code(code)
 
-        return self.run_flake8_pipeline_with_temp_file(
+        return await self.run_flake8_pipeline_with_temp_file(
             code,
             class_model=class_model,
             func_attributes=func_attributes,
             original_imports=original_imports,
-            unique_project_imports=self.unique_imports_dict,
+            unique_project_imports=job.unique_imports_dict if job else {},
             **kwargs,
         )
 
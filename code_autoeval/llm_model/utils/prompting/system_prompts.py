@@ -355,6 +355,43 @@ class SystemPrompts(DynamicExamplePrompt):
 
         return base_prompt
 
+    def generate_continuation_prompt(
+        self,
+        error_message: str,
+        coverage_report: Dict[str, Any],
+        function_attributes: model.FunctionAttributes,
+        unit_test_coverage_missing: Dict[Tuple[int, int], str],
+    ) -> str:
+        """Only the delta since the previous response - the model already has the
+        task, the previous code and the previous tests in its conversation context."""
+        if "coverage is not 100%" in error_message:
+            delta_prompt = f"""
+        The tests in your previous response do not fully cover {function_attributes.func_name}.
+        Current code coverage: {coverage_report['total_coverage']}%
+
+        The following lines are not covered by tests. Please write additional tests that target these lines:
+        """
+            for range_tuple, code_snippet in unit_test_coverage_missing.items():
+                delta_prompt += f"""
+        Lines {range_tuple[0]}-{range_tuple[1]}:
+        {code_snippet}
+        """
+        else:
+            delta_prompt = f"""
+        Your previous response resulted in an error:
+        {error_message}
+
+        Please fix the implementation and the tests to address this error.
+        """
+
+        delta_prompt += """
+        Please provide the complete updated implementation and the complete set of pytest tests,
+        divided by a line with only:
+            ### START OF TESTS
+        """
+
+        return delta_prompt
+
     def generate_fake_data_prompt(
         self, func: Callable, num_rows: int = 100, num_columns: int = 5
     ) -> str:
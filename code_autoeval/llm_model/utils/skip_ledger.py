@@ -0,0 +1,138 @@
+"""Ledger of functions verified as fully covered, keyed by a hash of their inputs."""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from pydantic import BaseModel, ValidationError
+
+from code_autoeval.llm_model.utils import model
+
+
+class SkipLedgerEntry(BaseModel):
+    """The last verified run of one function."""
+
+    target_id: str
+    source_hash: str
+    coverage: float
+    verified_at: float
+
+
+class SkipLedger:
+    """Skip re-running pytest for functions whose inputs haven't changed.
+
+    When a function's tests pass with full coverage, the sha256 of its
+    source, test file, generated module and fixture files is recorded with
+    the coverage. Next time, if the hash is the same, the earlier result
+    still holds and the function can be skipped without running pytest.
+
+    The ledger is a JSON lines file written atomically (fsynced temp file +
+    os.replace), by default <generated_code_logs>/skip_ledger.jsonl.
+
+    Example
+    -------
+    >>> ledger = SkipLedger(Path("/tmp/skip_ledger.jsonl"))
+    >>> key = ledger.make_key(function_attributes, fixture_paths)
+    >>> ledger.record(function_attributes.target_id, key, coverage=100)
+    >>> ledger.is_current(function_attributes.target_id, key)
+    True
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._entries: Optional[Dict[str, SkipLedgerEntry]] = None
+
+    def bind_base_dir(self, base_log_dir: Path) -> None:
+        """Default the ledger to live under the generated logs dir."""
+        if self.path is None:
+            self.path = Path(base_log_dir).joinpath("skip_ledger.jsonl")
+
+    @property
+    def entries(self) -> Dict[str, SkipLedgerEntry]:
+        if self._entries is None:
+            self._entries = self.load()
+        return self._entries
+
+    def load(self) -> Dict[str, SkipLedgerEntry]:
+        if self.path is None or not self.path.exists():
+            return {}
+
+        entries: Dict[str, SkipLedgerEntry] = {}
+        for line in self.path.read_text().splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = SkipLedgerEntry.model_validate_json(line)
+            except ValidationError:
+                # Written by an older version - the function is verified again.
+                continue
+            entries[entry.target_id] = entry
+        return entries
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", dir=self.path.parent, suffix=".tmp", delete=False
+        ) as temp_file:
+            for entry in self.entries.values():
+                temp_file.write(entry.model_dump_json() + "\n")
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+            temp_file_path = temp_file.name
+
+        os.replace(temp_file_path, self.path)
+
+    @staticmethod
+    def make_key(
+        function_attributes: model.FunctionAttributes,
+        fixture_paths: Iterable[Path] = (),
+    ) -> str:
+        """Hash everything a verified result depends on."""
+        digest = hashlib.sha256()
+        for part in (
+            function_attributes.target_id,
+            function_attributes.function_signature,
+            function_attributes.function_docstring,
+            function_attributes.function_body,
+        ):
+            digest.update(part.encode())
+            digest.update(b"\0")
+
+        file_paths = [
+            function_attributes.test_absolute_file_path,
+            function_attributes.module_generated_absolute_path,
+            *sorted(set(fixture_paths)),
+        ]
+        for file_path in file_paths:
+            digest.update(str(file_path).encode())
+            try:
+                digest.update(Path(file_path).read_bytes())
+            except (FileNotFoundError, TypeError):
+                digest.update(b"<missing>")
+            digest.update(b"\0")
+
+        return digest.hexdigest()
+
+    def is_current(self, target_id: str, key: str) -> bool:
+        """True if target_id was fully covered with exactly these inputs."""
+        entry = self.entries.get(target_id)
+        return entry is not None and entry.source_hash == key and entry.coverage >= 100
+
+    def record(self, target_id: str, key: str, coverage: float) -> None:
+        self.entries[target_id] = SkipLedgerEntry(
+            target_id=target_id,
+            source_hash=key,
+            coverage=coverage,
+            verified_at=time.time(),
+        )
+        self.save()
+
+    def forget(self, target_id: str) -> None:
+        if self.entries.pop(target_id, None):
+            self.save()
@@ -1,6 +1,7 @@
 """Validate regexes - that something isn't missing."""
 
 import functools
+import inspect
 from pprint import pprint
 from typing import Any, Callable
 
@@ -53,21 +54,9 @@ class ValidateRegexes:
 
 def validate_code() -> Callable:
     def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        def wrapper(
-            *args: Any, code_type: str = "", func_name: str = "", **kwargs: Any
-        ) -> Any:
-            """Validate the code.
-
-            Kwargs
-            ------
-            code_type (str, default = "")
-                The type of code to validate. Must be 'function' or 'pytest'
-            """
+        def validate(result: Any, code_type: str, func_name: str) -> Any:
             validator = ValidateRegexes()
 
-            result = func(*args, **kwargs)
-
             if isinstance(result, tuple) and len(result) == 2:
                 code, pytest_code = result
             elif isinstance(result, str):
@@ -89,6 +78,30 @@ def validate_code() -> Callable:
 
             return result
 
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(
+                *args: Any, code_type: str = "", func_name: str = "", **kwargs: Any
+            ) -> Any:
+                """Validate the code - see wrapper."""
+                return validate(await func(*args, **kwargs), code_type, func_name)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(
+            *args: Any, code_type: str = "", func_name: str = "", **kwargs: Any
+        ) -> Any:
+            """Validate the code.
+
+            Kwargs
+            ------
+            code_type (str, default = "")
+                The type of code to validate. Must be 'function' or 'pytest'
+            """
+            return validate(func(*args, **kwargs), code_type, func_name)
+
         return wrapper
 
     return decorator
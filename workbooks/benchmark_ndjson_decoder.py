@@ -0,0 +1,104 @@
+"""Microbenchmark for decoding a streamed NDJSON response."""
+
+# %%
+
+import json
+import random
+import time
+from typing import Any, Callable, Dict, Iterator, List
+
+from code_autoeval.llm_model.utils.model_response.ndjson_decoder import NDJSONDecoder
+
+N_TOKENS = 50_000
+# Small chunks mimic a token-by-token server; large ones a buffered proxy,
+# where many lines arrive per chunk and buffer.split re-copies the remainder.
+CHUNK_SIZES = (64, 1024 * 1024)
+
+
+def make_synthetic_stream(n_tokens: int = N_TOKENS) -> bytes:
+    """Build an Ollama-style /api/generate response with n_tokens chunks."""
+    rng = random.Random(0)
+    words = ["def", "test_", "assert", "return", "self", "(", ")", ":", "\n", "    "]
+    lines = [
+        json.dumps(
+            {"model": "coder-lite:latest", "response": rng.choice(words), "done": False}
+        )
+        for _ in range(n_tokens)
+    ]
+    lines.append(
+        json.dumps({"model": "coder-lite:latest", "response": "", "done": True})
+    )
+    return ("\n".join(lines) + "\n").encode()
+
+
+def iter_chunks(data: bytes, chunk_size: int) -> Iterator[bytes]:
+    for i in range(0, len(data), chunk_size):
+        yield data[i : i + chunk_size]
+
+
+def decode_with_split(data: bytes, chunk_size: int) -> List[Dict[str, Any]]:
+    """The previous approach: buffer += chunk, then buffer.split per line."""
+    decoded = []
+    buffer = b""
+    for chunk in iter_chunks(data, chunk_size):
+        buffer += chunk
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line:
+                decoded.append(json.loads(line.decode()))
+    return decoded
+
+
+def decode_with_decoder(data: bytes, chunk_size: int) -> List[Dict[str, Any]]:
+    decoder = NDJSONDecoder()
+    decoded = []
+    for chunk in iter_chunks(data, chunk_size):
+        decoded.extend(decoder.feed(chunk))
+    decoded.extend(decoder.flush())
+    return decoded
+
+
+def accumulate_with_str(decoded: List[Dict[str, Any]]) -> str:
+    full_response = ""
+    for chunk in decoded:
+        full_response += chunk["response"]
+    return full_response
+
+
+def accumulate_with_list(decoded: List[Dict[str, Any]]) -> str:
+    return "".join([chunk["response"] for chunk in decoded])
+
+
+def time_it(func: Callable[..., Any], *args: Any, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# %%
+
+if __name__ == "__main__":
+    data = make_synthetic_stream()
+    print(f"Streaming {N_TOKENS} tokens ({len(data) / 1e6:.1f} MB)")
+
+    for chunk_size in CHUNK_SIZES:
+        assert decode_with_split(data, chunk_size) == decode_with_decoder(
+            data, chunk_size
+        )
+
+        split_time = time_it(decode_with_split, data, chunk_size)
+        decoder_time = time_it(decode_with_decoder, data, chunk_size)
+        print(f"{chunk_size:>8}-byte chunks:")
+        print(f"  buffer.split decode:  {split_time * 1000:8.1f} ms")
+        print(f"  NDJSONDecoder decode: {decoder_time * 1000:8.1f} ms")
+
+    decoded = decode_with_decoder(data, CHUNK_SIZES[0])
+    print(
+        f"str += accumulate:    {time_it(accumulate_with_str, decoded) * 1000:8.1f} ms"
+    )
+    print(
+        f"list join accumulate: {time_it(accumulate_with_list, decoded) * 1000:8.1f} ms"
+    )
@@ -0,0 +1,163 @@
+"""Local stub of the Ollama /api/generate endpoint for exercising StreamResponse."""
+
+# %%
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+class StubBackendServer:
+    """Serve canned streamed generations, with optional failure modes.
+
+    fail_first_n: respond with `fail_status` to the first n requests.
+    stall_after_tokens: stop sending (without closing) after this many tokens.
+    token_delay: seconds between tokens.
+    load_seconds: how long an empty-prompt (preload) request takes.
+
+    Example
+    -------
+    >>> with StubBackendServer(fail_first_n=2) as server:
+    ...     client = StreamResponse(llm_model_attributes=LLMModelAttributes(
+    ...         llm_model_name="stub", llm_model_url=server.url))
+    ...     asyncio.run(client.ask_backend_model("prompt"))
+    """
+
+    def __init__(
+        self,
+        tokens: Optional[List[str]] = None,
+        fail_first_n: int = 0,
+        fail_status: int = 503,
+        stall_after_tokens: Optional[int] = None,
+        stall_seconds: float = 30.0,
+        token_delay: float = 0.0,
+        load_seconds: float = 0.0,
+    ):
+        self.tokens = tokens or ["def ", "test_", "example", "():", "\n", "    pass"]
+        self.fail_first_n = fail_first_n
+        self.fail_status = fail_status
+        self.stall_after_tokens = stall_after_tokens
+        self.stall_seconds = stall_seconds
+        self.token_delay = token_delay
+        self.load_seconds = load_seconds
+
+        self.requests: List[Dict[str, Any]] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubBackendServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self) -> type:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                try:
+                    self._serve_generation()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client aborted the generation.
+
+            def _serve_generation(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                stub.requests.append(json.loads(body or b"{}"))
+
+                if len(stub.requests) <= stub.fail_first_n:
+                    message = b"model is loading"
+                    self.send_response(stub.fail_status)
+                    self.send_header("Content-Length", str(len(message)))
+                    self.end_headers()
+                    self.wfile.write(message)
+                    return
+
+                if not stub.requests[-1].get("prompt"):
+                    # Ollama loads the model and returns a single object.
+                    time.sleep(stub.load_seconds)
+                    message = json.dumps(
+                        {
+                            "done": True,
+                            "done_reason": "load",
+                            "load_duration": int(stub.load_seconds * 1e9),
+                        }
+                    ).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Length", str(len(message)))
+                    self.end_headers()
+                    self.wfile.write(message)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                for i, token in enumerate(stub.tokens):
+                    if (
+                        stub.stall_after_tokens is not None
+                        and i >= stub.stall_after_tokens
+                    ):
+                        time.sleep(stub.stall_seconds)
+                        return
+                    self._write_chunk({"response": token, "done": False})
+                    time.sleep(stub.token_delay)
+
+                self._write_chunk(
+                    {
+                        "response": "",
+                        "done": True,
+                        "context": [1, 2, 3],
+                        "prompt_eval_count": 10,
+                        "prompt_eval_duration": 1_000_000,
+                        "eval_count": len(stub.tokens),
+                        "eval_duration": 2_000_000,
+                        "total_duration": 3_000_000,
+                    }
+                )
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _write_chunk(self, data: Dict[str, Any]) -> None:
+                line = json.dumps(data).encode() + b"\n"
+                self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+# %%
+
+if __name__ == "__main__":
+    from code_autoeval.llm_model.utils.base_llm_class import LLMModelAttributes
+    from code_autoeval.llm_model.utils.model_response.stream_response import (
+        StreamResponse,
+    )
+
+    async def main() -> None:
+        with StubBackendServer(fail_first_n=2) as server:
+            async with StreamResponse(
+                llm_model_attributes=LLMModelAttributes(
+                    llm_model_name="stub", llm_model_url=server.url
+                )
+            ) as client:
+                response = await client.ask_backend_model("Write a test")
+                print(response["response"])
+                print(f"Requests served: {len(server.requests)}")
+
+    asyncio.run(main())
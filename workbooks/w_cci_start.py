@@ -379,6 +379,6 @@ pprint(str(flake8_result))
 
 from code_autoeval.llm_model.imports.run_flake8_fix_imports import RunFlake8FixImports
 
-RunFlake8FixImports.comment_out_syntax_errors(file_path)
+asyncio.run(RunFlake8FixImports.comment_out_syntax_errors(file_path))
 
 # %%